@@ -0,0 +1,193 @@
+# benchmarks/hot_paths.py
+#
+# Hot-path benchmarks across node-count scales.
+#
+#   python -m benchmarks.hot_paths --out baseline.json
+#   python -m benchmarks.hot_paths --compare baseline.json --threshold 0.2
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from core.simulation_controller import SimulationController
+
+DEFAULT_DN_COUNTS = (10, 100, 1000, 10000, 100000)
+DEFAULT_PMN_COUNTS = (1, 3, 30)
+DEFAULT_SEED = 1234
+
+
+def build_scenario(dns, pmns, seed):
+    # 🎲 Same seed, same scenario: every case starts from an identical state
+    return SimulationController(num_dns=dns, num_pmns=pmns, seed=seed)
+
+
+def _apply_forces(controller):
+    controller.force_calculator.apply_forces(controller.nodes)
+
+
+def _resolve_dn_collisions(controller):
+    controller.collision_handler.resolve_dn_collisions(controller.nodes)
+
+
+def _resolve_pmn_collisions(controller):
+    controller.collision_handler.resolve_pmn_collisions(controller.nodes)
+
+
+def _update_positions(controller):
+    controller.motion_integrator.update_positions(controller.nodes)
+
+
+def _check_proximity_and_merge(controller):
+    controller.check_proximity_and_merge()
+
+
+def _update(controller):
+    controller.update()
+
+
+CASES = {
+    "apply_forces": _apply_forces,
+    "resolve_dn_collisions": _resolve_dn_collisions,
+    "resolve_pmn_collisions": _resolve_pmn_collisions,
+    "update_positions": _update_positions,
+    "check_proximity_and_merge": _check_proximity_and_merge,
+    "update": _update,
+}
+
+
+def time_case(case, dns, pmns, seed, repeats, min_time):
+    # ⏱️ Fresh scenario per repeat (setup excluded), calls batched until min_time elapses
+    operation = CASES[case]
+    samples = []
+    number = 1
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        # Size the batch on a throwaway scenario, so every timed repeat starts from the same state
+        controller = build_scenario(dns, pmns, seed)
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                operation(controller)
+            if time.perf_counter() - start >= min_time or number >= 1 << 16:
+                break
+            number *= 2
+
+        for _ in range(repeats):
+            controller = build_scenario(dns, pmns, seed)
+            start = time.perf_counter()
+            for _ in range(number):
+                operation(controller)
+            samples.append((time.perf_counter() - start) / number)
+
+    return {
+        "case": case,
+        "dns": dns,
+        "pmns": pmns,
+        "repeats": repeats,
+        "calls_per_repeat": number,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+    }
+
+
+def run_suite(cases, dn_counts, pmn_counts, seed, repeats, min_time, budget, log=sys.stderr):
+    results = []
+    for case in cases:
+        for pmns in pmn_counts:
+            for dns in sorted(dn_counts):
+                result = time_case(case, dns, pmns, seed, repeats, min_time)
+                results.append(result)
+                log.write(f"{case:<28} dns={dns:<7} pmns={pmns:<4} median={result['median'] * 1e3:10.3f} ms\n")
+
+                # Larger scales only get slower: stop once a single call blows the budget
+                if result["median"] > budget:
+                    log.write(f"{case:<28} skipping larger scales (> {budget}s per call)\n")
+                    break
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, baseline, threshold):
+    # 📈 Flag every case whose median grew by more than `threshold` against the baseline
+    previous = {(r["case"], r["dns"], r["pmns"]): r for r in baseline["results"]}
+    report = []
+    for result in results:
+        key = (result["case"], result["dns"], result["pmns"])
+        if key not in previous:
+            continue
+        ratio = result["median"] / previous[key]["median"]
+        report.append({
+            "case": result["case"],
+            "dns": result["dns"],
+            "pmns": result["pmns"],
+            "baseline_median": previous[key]["median"],
+            "median": result["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths.")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--dns", nargs="+", type=int, default=list(DEFAULT_DN_COUNTS))
+    parser.add_argument("--pmns", nargs="+", type=int, default=list(DEFAULT_PMN_COUNTS))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds the batch of calls timed per repeat is sized to take")
+    parser.add_argument("--budget", type=float, default=5.0, help="per-call seconds above which larger scales are skipped")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown ratio before flagging (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_suite(args.cases, args.dns, args.pmns, args.seed, args.repeats, args.min_time, args.budget)
+    document = {
+        "environment": environment(),
+        "config": {"seed": args.seed, "repeats": args.repeats, "min_time": args.min_time},
+        "results": results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as handle:
+            json.dump(document, handle, indent=2)
+
+    if not args.compare:
+        if not args.out:
+            json.dump(document, sys.stdout, indent=2)
+        return 0
+
+    with open(args.compare) as handle:
+        report = compare(results, json.load(handle), args.threshold)
+
+    regressions = [row for row in report if row["regression"]]
+    for row in report:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['case']:<28} dns={row['dns']:<7} pmns={row['pmns']:<4} x{row['ratio']:6.2f}  {flag}")
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} out of {len(report)} compared case(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# core/barnes_hut.py
+
+import numpy as np
+from core.node_store import KIND_DN
+from core.force_calculator import ForceCalculator, FORCE_SCALE
+from core.spatial_hash import expand_ranges
+
+# Morton codes interleave two coordinates into one int64, so at most 31 levels
+MAX_TREE_DEPTH = 31
+
+
+def _spread_bits(values):
+    # Insert a zero bit between each of the lower 31 bits
+    values = values.astype(np.int64)
+    values = (values | (values << 16)) & 0x0000FFFF0000FFFF
+    values = (values | (values << 8)) & 0x00FF00FF00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F0F0F0F0F
+    values = (values | (values << 2)) & 0x3333333333333333
+    values = (values | (values << 1)) & 0x5555555555555555
+    return values
+
+
+class QuadTree:
+    # 🌳 Linear quadtree: bodies sorted by Morton code, each cell is a contiguous [start, end) run
+    def __init__(self, positions, masses, leaf_size=8, max_depth=16):
+        self.depth = min(max_depth, MAX_TREE_DEPTH)
+        count = len(positions)
+
+        lower = positions.min(axis=0)
+        span = float((positions.max(axis=0) - lower).max())
+        span = span * (1 + 1e-9) if span > 0 else 1.0
+
+        grid = np.floor((positions - lower) / span * (1 << self.depth))
+        grid = np.clip(grid, 0, (1 << self.depth) - 1).astype(np.int64)
+        codes = _spread_bits(grid[:, 0]) | (_spread_bits(grid[:, 1]) << 1)
+
+        self.order = np.argsort(codes, kind="stable")
+        self.codes = codes[self.order]
+        self.positions = positions[self.order]
+        self.masses = masses[self.order]
+
+        # Prefix sums give any cell's mass and centre of mass in O(1)
+        cumulative_mass = np.concatenate(([0.0], np.cumsum(self.masses)))
+        cumulative_moment = np.vstack((np.zeros(2), np.cumsum(self.positions * self.masses[:, None], axis=0)))
+
+        # Root cell holds every body; split level by level until cells hold <= leaf_size bodies
+        level_starts = np.zeros(1, dtype=np.int64)
+        level_ends = np.array([count], dtype=np.int64)
+        level_ids = np.zeros(1, dtype=np.int64)
+        starts, ends = [level_starts], [level_ends]
+        levels, parents = [np.zeros(1, dtype=np.int64)], [np.array([-1])]
+        next_id = 1
+
+        for level in range(self.depth):
+            split = (level_ends - level_starts) > leaf_size
+            if not split.any():
+                break
+
+            split_ids = level_ids[split]
+            owner, bodies = expand_ranges(level_starts[split], level_ends[split])
+            prefix = self.codes[bodies] >> (2 * (self.depth - level - 1))
+
+            boundary = np.ones(len(bodies), dtype=bool)
+            boundary[1:] = (prefix[1:] != prefix[:-1]) | (owner[1:] != owner[:-1])
+            first = np.flatnonzero(boundary)
+            last = np.append(first[1:], len(bodies)) - 1
+
+            level_starts = bodies[first]
+            level_ends = bodies[last] + 1
+            level_ids = np.arange(next_id, next_id + len(first))
+            next_id += len(first)
+
+            starts.append(level_starts)
+            ends.append(level_ends)
+            levels.append(np.full(len(first), level + 1))
+            parents.append(split_ids[owner[first]])
+
+        self.start = np.concatenate(starts)
+        self.end = np.concatenate(ends)
+        self.level = np.concatenate(levels)
+        parent = np.concatenate(parents)
+
+        # Children of a cell are contiguous ids, so store (first_child, child_count)
+        self.child_count = np.bincount(parent[1:], minlength=len(parent))
+        self.first_child = np.zeros(len(parent), dtype=np.int64)
+        with_children, first_index = np.unique(parent[1:], return_index=True)
+        self.first_child[with_children] = first_index + 1
+
+        self.mass = cumulative_mass[self.end] - cumulative_mass[self.start]
+        moment = cumulative_moment[self.end] - cumulative_moment[self.start]
+        safe_mass = np.where(self.mass > 0, self.mass, 1.0)
+        self.center_of_mass = np.where(
+            (self.mass > 0)[:, None],
+            moment / safe_mass[:, None],
+            (self.positions[self.start] + self.positions[self.end - 1]) / 2,
+        )
+        self.size = span / (2.0 ** self.level)
+
+
+class BarnesHutGravity:
+    # 🌀 DN↔DN gravity with the GA rule of the DN→PMN pass: the summed pull is averaged by the
+    # Σ m / d weight before the clamp, so a dense swarm pulls like its neighbourhood, not like its total mass
+    def __init__(self, force_calculator=None, theta=0.5, leaf_size=8, max_depth=16):
+        self.force_calculator = force_calculator or ForceCalculator()  # G, softening and max_force come from here
+        self.theta = theta  # Opening angle: 0 is exact, larger is faster and coarser
+        self.leaf_size = leaf_size
+        self.max_depth = max_depth
+
+    @property
+    def G(self):
+        return self.force_calculator.G
+
+    @property
+    def softening(self):
+        return self.force_calculator.softening
+
+    @property
+    def max_force(self):
+        return self.force_calculator.max_force
+
+    def forces(self, positions, masses):
+        # ✅ Summed pull and Σ m / d weight on every body, same softened `distance ** 1.9` kernel as ga_forces
+        count = len(positions)
+        if count < 2:
+            return np.zeros((count, 2)), np.zeros(count)
+
+        tree = QuadTree(positions, masses, self.leaf_size, self.max_depth)
+        totals = np.zeros((3, count))  # force x, force y, weight
+
+        # Breadth-first walk of all (body, cell) pairs at once, one tree level per pass
+        bodies = np.arange(count)
+        cells = np.zeros(count, dtype=np.int64)
+        while len(bodies):
+            r_vector = tree.center_of_mass[cells] - tree.positions[bodies]
+            distance = np.hypot(r_vector[:, 0], r_vector[:, 1])
+
+            contains_body = (bodies >= tree.start[cells]) & (bodies < tree.end[cells])
+            far = ~contains_body & (tree.size[cells] < self.theta * distance)
+            leaf = tree.child_count[cells] == 0
+
+            # 🌌 Far cells act as a single mass at their centre of mass
+            self._accumulate(totals, tree, bodies[far], r_vector[far], distance[far], tree.mass[cells[far]])
+
+            # Near leaves: direct sums against each body inside, skipping self
+            near_leaf = leaf & ~far
+            owner, others = expand_ranges(tree.start[cells[near_leaf]], tree.end[cells[near_leaf]])
+            source = bodies[near_leaf][owner]
+            distinct = source != others
+            source, others = source[distinct], others[distinct]
+            direct = tree.positions[others] - tree.positions[source]
+            self._accumulate(totals, tree, source, direct, np.hypot(direct[:, 0], direct[:, 1]), tree.masses[others])
+
+            # Everything else opens into its children for the next pass
+            opened = ~leaf & ~far
+            owner, cells = expand_ranges(
+                tree.first_child[cells[opened]],
+                tree.first_child[cells[opened]] + tree.child_count[cells[opened]],
+            )
+            bodies = bodies[opened][owner]
+
+        forces = np.empty((count, 2))
+        weights = np.empty(count)
+        forces[tree.order] = totals[:2].T
+        weights[tree.order] = totals[2]
+        return forces, weights
+
+    def _accumulate(self, totals, tree, bodies, r_vector, distance, other_mass):
+        if len(bodies) == 0:
+            return
+        distance = distance + self.softening
+        strength = (self.G * tree.masses[bodies] * other_mass) / (distance ** 1.9)
+        count = totals.shape[1]
+        totals[0] += np.bincount(bodies, weights=strength * r_vector[:, 0], minlength=count)
+        totals[1] += np.bincount(bodies, weights=strength * r_vector[:, 1], minlength=count)
+        totals[2] += np.bincount(bodies, weights=other_mass / distance, minlength=count)
+
+    def accelerations(self, nodes):
+        # DN↔DN acceleration of every DN row, averaged and clamped like GA: (dn_rows, (N_dn, 2))
+        dn_rows = nodes.rows_of_kind(KIND_DN)
+        acceleration = np.zeros((len(dn_rows), 2))
+        if len(dn_rows) < 2:
+            return dn_rows, acceleration
+
+        dn_mass = nodes.mass[dn_rows]
+        force, weight = self.forces(nodes.position[dn_rows], dn_mass)
+        weighted = weight > 0
+        averaged = force[weighted] / weight[weighted, None]
+
+        force_magnitude = np.hypot(averaged[:, 0], averaged[:, 1])
+        too_strong = force_magnitude > self.max_force
+        averaged[too_strong] *= (self.max_force / force_magnitude[too_strong])[:, None]
+        acceleration[weighted] = (averaged / dn_mass[weighted, None]) * FORCE_SCALE
+        return dn_rows, acceleration
+
+    def apply(self, nodes, dt=1.0):
+        # DN↔DN attraction as a velocity kick over one step of `dt`
+        dn_rows, acceleration = self.accelerations(nodes)
+        if len(dn_rows) >= 2:
+            nodes.velocity[dn_rows] += acceleration * dt
@@ -1,4 +1,129 @@
 # core/collision_handler.py
+
+import numpy as np
+from core.node_store import KIND_DN, KIND_PMN
+from core.spatial_hash import SpatialHash
+from core.rng import resolve_rng
+from core.events import EVENT_DN_COLLISION, EVENT_PMN_COLLISION
+
+# Contact radius multipliers: DNs touch at 1.5 * (m_a^(1/3) + m_b^(1/3)), PMNs at 1.0 * (...)
+DN_CONTACT_SCALE = 1.5
+PMN_CONTACT_SCALE = 1.0
+
+
 class CollisionHandler:
-    def resolve(self, nodes):
-        pass  # Placeholder for collision logic
+    def __init__(self, restitution=0.9, damping=0.98, rng=None, events=None):
+        self.restitution = restitution  # Elasticity: 1.0 is perfectly elastic, <1.0 is inelastic
+        self.damping = damping
+        self.rng = resolve_rng(rng)
+        self.events = events  # 📣 Optional EventBus for contact events
+
+    def resolve(self, nodes, dn_collisions=True):
+        # ✅ PMN collisions always, DN collisions only if enabled
+        self.resolve_pmn_collisions(nodes)
+        if dn_collisions:
+            self.resolve_dn_collisions(nodes)
+
+    def resolve_dn_collisions(self, nodes):
+        rows = nodes.rows_of_kind(KIND_DN)
+        first, second = self.find_contacts(nodes, rows, DN_CONTACT_SCALE)
+        self.report_contacts(EVENT_DN_COLLISION, nodes, first, second)
+        self.elastic_collisions(nodes, first, second)
+
+    def resolve_pmn_collisions(self, nodes):
+        rows = nodes.rows_of_kind(KIND_PMN)
+        first, second = self.find_contacts(nodes, rows, PMN_CONTACT_SCALE)
+        self.report_contacts(EVENT_PMN_COLLISION, nodes, first, second)
+        self.elastic_collisions(nodes, first, second)
+
+    def report_contacts(self, kind, nodes, first, second):
+        # 📣 One event per contact pair, by node ID
+        if self.events is None or len(first) == 0:
+            return
+        self.events.emit(kind, nodes.node_id[first], nodes.node_id[second], nodes.mass[first], nodes.mass[second])
+
+    def find_contacts(self, nodes, rows, contact_scale):
+        # 🗺️ Broadphase: grid cells as wide as the largest possible contact distance
+        positions = nodes.position[rows]
+        finite = np.isfinite(positions).all(axis=1)
+        rows, positions = rows[finite], positions[finite]
+        radius = nodes.mass[rows] ** (1 / 3)
+        if len(rows) < 2 or radius.max() <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        grid = SpatialHash(positions, contact_scale * 2 * radius.max())
+        i, j = grid.candidate_pairs()
+
+        # ✅ Narrowphase: keep only pairs closer than their own contact distance
+        r_vector = positions[j] - positions[i]
+        distance = np.hypot(r_vector[:, 0], r_vector[:, 1])
+        touching = distance < contact_scale * (radius[i] + radius[j])
+        i, j = i[touching], j[touching]
+
+        # Report pairs in store order, lower row first
+        first, second = np.minimum(rows[i], rows[j]), np.maximum(rows[i], rows[j])
+        order = np.lexsort((second, first))
+        return first[order], second[order]
+
+    def elastic_collisions(self, nodes, first, second):
+        # 💥 Impulse and overlap correction for every contact pair at once
+        if len(first) == 0:
+            return
+
+        count = nodes.count
+        mass_a, mass_b = nodes.mass[first], nodes.mass[second]
+
+        # ✅ Compute the normal vector between the nodes
+        normal_vector = nodes.position[second] - nodes.position[first]
+        distance = np.hypot(normal_vector[:, 0], normal_vector[:, 1])
+
+        coincident = distance == 0
+        if coincident.any():
+            # Prevent division by zero by adding a small random nudge
+            normal_vector[coincident] = self.rng.random((int(coincident.sum()), 2)) - 0.5
+            distance[coincident] = np.hypot(normal_vector[coincident, 0], normal_vector[coincident, 1])
+
+        normal_vector /= distance[:, None]
+
+        # ✅ Push overlapping nodes apart slightly
+        overlap = 0.5 * ((mass_a ** (1 / 3)) + (mass_b ** (1 / 3))) - distance
+        overlapping = overlap > 0
+        correction = normal_vector * np.where(overlapping, overlap, 0)[:, None]
+        total_mass = mass_a + mass_b
+        position_shift = (
+            _scatter(second, correction * (mass_a / total_mass)[:, None], count)
+            - _scatter(first, correction * (mass_b / total_mass)[:, None], count)
+        )
+
+        # ✅ Relative velocity; pairs already moving apart need no impulse
+        relative_velocity = nodes.velocity[first] - nodes.velocity[second]
+        velocity_along_normal = np.einsum("pk,pk->p", relative_velocity, normal_vector)
+        approaching = velocity_along_normal <= 0
+
+        # ✅ Compute impulse scalar
+        impulse_magnitude = -(1 + self.restitution) * velocity_along_normal
+        impulse_magnitude /= (1 / mass_a) + (1 / mass_b)
+        impulse = np.where(approaching, impulse_magnitude, 0)[:, None] * normal_vector
+
+        velocity_change = (
+            _scatter(first, impulse / mass_a[:, None], count)
+            - _scatter(second, impulse / mass_b[:, None], count)
+        )
+
+        # ✅ Slight damping per resolved contact to stabilize bouncing
+        contacts = (
+            np.bincount(first[approaching], minlength=count)
+            + np.bincount(second[approaching], minlength=count)
+        )
+
+        nodes.position[:count] += position_shift
+        nodes.velocity[:count] += velocity_change
+        nodes.velocity[:count] *= (self.damping ** contacts)[:, None]
+
+
+def _scatter(rows, values, count):
+    # Sum per-pair 2-vectors into per-row totals
+    return np.column_stack((
+        np.bincount(rows, weights=values[:, 0], minlength=count),
+        np.bincount(rows, weights=values[:, 1], minlength=count),
+    ))
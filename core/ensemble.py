@@ -0,0 +1,327 @@
+# core/ensemble.py
+#
+# Batched ensembles: K independent universes stepped together in (K × N) array passes,
+# each with its own parameter vector entry and its own random stream.
+#
+#   python -m core.ensemble --universes 512 --dns 50 --steps 2000 --sweep G=0.8:1.6 --workers 4
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from core.force_calculator import ForceCalculator, FORCE_SCALE, PAIR_CHUNK_ELEMENTS
+from core.motion_integrator import DEFAULT_DT, WORLD_SIZE
+from core.simulation_controller import DEFAULT_PMN_LAYOUT, PROXIMITY_THRESHOLD, MERGE_TIME_THRESHOLD, spawn_bounds
+
+# Per-universe parameters; anything not given takes the ForceCalculator default
+PARAMETERS = ("G", "softening", "max_force", "max_velocity", "damping", "dt")
+
+# Noise values pre-drawn per universe in one call (several steps' worth for small universes)
+NOISE_BLOCK_ELEMENTS = 1 << 14
+
+
+def default_parameters():
+    parameters = ForceCalculator().params()
+    parameters["dt"] = DEFAULT_DT
+    return parameters
+
+
+class Ensemble:
+    # 🌌🌌🌌 K universes of N DNs and M PMNs as (K, N, ...) arrays; merged DNs stay as dead slots
+    def __init__(self, universes, num_dns=50, num_pmns=len(DEFAULT_PMN_LAYOUT), parameters=None,
+                 seed=None, seeds=None, world_size=WORLD_SIZE):
+        self.universes = universes
+        self.num_dns = num_dns
+        self.num_pmns = num_pmns
+        self.world_size = tuple(world_size)
+
+        values = default_parameters()
+        values.update(parameters or {})
+        self.params = {
+            name: np.broadcast_to(np.asarray(values[name], dtype=float), (universes,)).copy()
+            for name in PARAMETERS
+        }
+
+        # 🎲 One Generator per universe, so a universe's run does not depend on K or on sharding
+        sequences = seeds if seeds is not None else np.random.SeedSequence(seed).spawn(universes)
+        self.rngs = [np.random.default_rng(sequence) for sequence in sequences]
+
+        K, N, M = universes, num_dns, num_pmns
+        self.position = np.zeros((K, N, 2))
+        self.velocity = np.zeros((K, N, 2))
+        self.mass = np.zeros((K, N))
+        self.alive = np.ones((K, N), dtype=bool)
+        self.proximity_timer = np.zeros((K, N), dtype=np.int64)
+        self.pmn_position = np.zeros((K, M, 2))
+        self.pmn_mass = np.zeros((K, M))
+        self.merge_count = np.zeros(K, dtype=np.int64)
+        self.frame = 0
+        self.time = np.zeros(K)
+
+        self.noise_steps = max(1, NOISE_BLOCK_ELEMENTS // max(1, N * 3))
+        self.noise = np.zeros((K, self.noise_steps, N, 3))
+
+        for k, rng in enumerate(self.rngs):
+            self._setup_universe(k, rng)
+
+    def _setup_universe(self, k, rng):
+        # ✅ Same layout and draw order as SimulationController.setup_simulation
+        width, height = self.world_size
+        for i in range(self.num_pmns):
+            if i < len(DEFAULT_PMN_LAYOUT):
+                x, y, mass = DEFAULT_PMN_LAYOUT[i]
+                self.pmn_position[k, i] = (x * width / WORLD_SIZE[0], y * height / WORLD_SIZE[1])
+                self.pmn_mass[k, i] = mass
+            else:
+                self.pmn_position[k, i] = rng.uniform(*spawn_bounds(self.world_size))
+                self.pmn_mass[k, i] = 50
+
+        self.position[k] = rng.uniform(*spawn_bounds(self.world_size), size=(self.num_dns, 2))
+        self.mass[k] = rng.uniform(2.0, 8.0, size=self.num_dns)
+        self.velocity[k] = rng.uniform(-0.5, 0.5, size=(self.num_dns, 2))
+
+    def _draw_noise(self):
+        # One call per universe for the next `noise_steps` steps
+        for k, rng in enumerate(self.rngs):
+            self.noise[k] = rng.random((self.noise_steps, self.num_dns, 3))
+
+    def accelerations(self):
+        # 🧭 GA acceleration of every DN in every universe, chunked over universes to bound the (k, N, M) temporaries
+        K, N, M = self.universes, self.num_dns, self.num_pmns
+        acceleration = np.zeros((K, N, 2))
+        if M == 0:
+            return acceleration
+
+        G, softening, max_force = self.params["G"], self.params["softening"], self.params["max_force"]
+        chunk = max(1, PAIR_CHUNK_ELEMENTS // max(1, N * M))
+        for start in range(0, K, chunk):
+            ks = slice(start, start + chunk)
+            r_vector = self.pmn_position[ks, None, :, :] - self.position[ks, :, None, :]
+            distance = np.sqrt(np.einsum("knmd,knmd->knm", r_vector, r_vector)) + softening[ks, None, None]
+
+            pmn_mass = self.pmn_mass[ks, None, :]
+            strength = (G[ks, None, None] * self.mass[ks, :, None] * pmn_mass) / (distance ** 1.9)
+            total_force = np.einsum("knm,knmd->knd", strength, r_vector)
+            total_mass_weight = (pmn_mass / distance).sum(axis=2)
+
+            weighted = total_mass_weight > 0
+            averaged = np.zeros_like(total_force)
+            averaged[weighted] = total_force[weighted] / total_mass_weight[weighted, None]
+
+            magnitude = np.hypot(averaged[..., 0], averaged[..., 1])
+            limit = np.broadcast_to(max_force[ks, None], magnitude.shape)
+            too_strong = magnitude > limit
+            averaged[too_strong] *= (limit[too_strong] / magnitude[too_strong])[:, None]
+
+            acceleration[ks] = averaged / self.mass[ks, :, None] * FORCE_SCALE
+        acceleration[~self.alive] = 0
+        return acceleration
+
+    def step(self):
+        # ▶️ One Euler step of every universe: GA kick, nudge, noise, clamp, damping, drift, walls, merges
+        params = self.params
+        slot = self.frame % self.noise_steps
+        if slot == 0:
+            self._draw_noise()
+        noise = self.noise[:, slot]
+        dt = params["dt"][:, None]
+
+        velocity = self.velocity
+        velocity += self.accelerations() * dt[..., None]
+
+        # 🔄 Tangential motion
+        speed = np.hypot(velocity[..., 0], velocity[..., 1])
+        moving = speed != 0
+        tangent = np.stack((-velocity[..., 1], velocity[..., 0]), axis=-1) / np.where(moving, speed, 1)[..., None]
+        nudge = (0.005 + 0.005 * noise[..., 0]) * dt * moving
+        velocity += tangent * nudge[..., None]
+
+        # Random micro-perturbation
+        velocity += (noise[..., 1:] - 0.5) * (0.2 * dt)[..., None]
+
+        # Clamp velocity, then damping (per unit of time)
+        speed = np.hypot(velocity[..., 0], velocity[..., 1])
+        max_velocity = np.broadcast_to(params["max_velocity"][:, None], speed.shape)
+        too_fast = speed > max_velocity
+        velocity[too_fast] *= (max_velocity[too_fast] / speed[too_fast])[:, None]
+        velocity *= (params["damping"][:, None] ** dt)[..., None]
+        velocity[~self.alive] = 0
+
+        # Drift and walls
+        self.position += velocity * dt[..., None]
+        size = np.where(self.mass == 1, 10, 30)
+        for axis, limit in enumerate(self.world_size):
+            coordinate = self.position[..., axis]
+            hit = (coordinate - size / 2 <= 0) | (coordinate + size / 2 >= limit)
+            velocity[..., axis][hit] *= -1
+
+        self.merge()
+        self.frame += 1
+        self.time += params["dt"]
+
+    def nearest_pmn(self):
+        # Nearest PMN index and distance for every DN slot: (K, N) each
+        r_vector = self.pmn_position[:, None, :, :] - self.position[:, :, None, :]
+        squared = np.einsum("knmd,knmd->knm", r_vector, r_vector)
+        nearest = squared.argmin(axis=2)
+        return nearest, np.sqrt(np.take_along_axis(squared, nearest[..., None], axis=2)[..., 0])
+
+    def merge(self):
+        # 💥 Same rule as check_proximity_and_merge: close for MERGE_TIME_THRESHOLD frames, then absorbed
+        if self.num_pmns == 0:
+            return
+        nearest, distance = self.nearest_pmn()
+        close = self.alive & (distance < PROXIMITY_THRESHOLD)
+        self.proximity_timer[close] += 1
+        self.proximity_timer[self.alive & ~close] = 0
+
+        merging = close & (self.proximity_timer >= MERGE_TIME_THRESHOLD)
+        if not merging.any():
+            return
+        universe, dn = np.nonzero(merging)
+        np.add.at(self.pmn_mass, (universe, nearest[universe, dn]), self.mass[universe, dn])
+        self.merge_count += np.bincount(universe, minlength=self.universes)
+        self.alive[merging] = False
+        self.velocity[merging] = 0
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.step()
+        return self
+
+    def summary(self, offset=0):
+        # 📊 One record per universe: its parameters and end-of-run metrics
+        _, distance = self.nearest_pmn() if self.num_pmns else (None, np.full(self.alive.shape, np.nan))
+        speed = np.hypot(self.velocity[..., 0], self.velocity[..., 1])
+        alive_count = self.alive.sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            mean_speed = np.where(alive_count > 0, (speed * self.alive).sum(axis=1) / alive_count, np.nan)
+            mean_distance = np.where(alive_count > 0, (distance * self.alive).sum(axis=1) / alive_count, np.nan)
+
+        records = []
+        for k in range(self.universes):
+            records.append({
+                "universe": offset + k,
+                "params": {name: float(self.params[name][k]) for name in PARAMETERS},
+                "frame": self.frame,
+                "time": round(float(self.time[k]), 6),
+                "dn_count": int(alive_count[k]),
+                "merges": int(self.merge_count[k]),
+                "pmn_masses": self.pmn_mass[k].round(3).tolist(),
+                "mean_speed": None if np.isnan(mean_speed[k]) else round(float(mean_speed[k]), 6),
+                "mean_pmn_distance": None if np.isnan(mean_distance[k]) else round(float(mean_distance[k]), 6),
+            })
+        return records
+
+
+# --- Sharding across processes ----------------------------------------------
+
+def _run_shard(task):
+    offset, sequences, parameters, num_dns, num_pmns, world_size, steps = task
+    ensemble = Ensemble(
+        len(sequences), num_dns, num_pmns, parameters, seeds=sequences, world_size=world_size,
+    )
+    return ensemble.run(steps).summary(offset)
+
+
+def run_ensemble(universes, steps, num_dns=50, num_pmns=len(DEFAULT_PMN_LAYOUT), parameters=None, seed=None,
+                 workers=1, shard_size=None, world_size=WORLD_SIZE):
+    # ⚡ Split the universes into shards, step each shard as one Ensemble (in a process pool if workers > 1)
+    sequences = np.random.SeedSequence(seed).spawn(universes)
+    values = default_parameters()
+    values.update(parameters or {})
+    table = {name: np.broadcast_to(np.asarray(values[name], dtype=float), (universes,)) for name in PARAMETERS}
+
+    shard_size = shard_size or -(-universes // max(1, workers))
+    tasks = [
+        (lo, sequences[lo:lo + shard_size], {name: table[name][lo:lo + shard_size] for name in PARAMETERS},
+         num_dns, num_pmns, tuple(world_size), steps)
+        for lo in range(0, universes, shard_size)
+    ]
+
+    if workers > 1 and len(tasks) > 1:
+        with multiprocessing.get_context("spawn").Pool(min(workers, len(tasks))) as pool:
+            shards = pool.map(_run_shard, tasks)
+    else:
+        shards = [_run_shard(task) for task in tasks]
+    return [record for shard in shards for record in shard]
+
+
+def parse_sweep(spec):
+    # NAME=LO:HI (or NAME=VALUE) -> (name, low, high)
+    name, _, bounds = spec.partition("=")
+    if name not in PARAMETERS:
+        raise ValueError(f"unknown parameter {name!r}; expected one of {', '.join(PARAMETERS)}")
+    low, _, high = bounds.partition(":")
+    try:
+        return name, float(low), float(high or low)
+    except ValueError:
+        raise ValueError(f"bounds must be numbers as in {name}=LO:HI, not {bounds!r}") from None
+
+
+def sample_sweeps(sweeps, universes, seed=None):
+    # NAME=LO:HI specs -> per-universe values drawn uniformly from [LO, HI]
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(universes + 1)[-1])
+    parameters = {}
+    for spec in sweeps:
+        name, low, high = parse_sweep(spec)
+        parameters[name] = rng.uniform(low, high, size=universes)
+    return parameters
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Step many independent universes together and summarise each.")
+    parser.add_argument("--universes", type=int, default=256, help="number of universes (K)")
+    parser.add_argument("--dns", type=int, default=50, help="DNs per universe")
+    parser.add_argument("--pmns", type=int, default=3, help="PMNs per universe")
+    parser.add_argument("--steps", type=int, default=1000, help="steps per universe")
+    parser.add_argument("--seed", type=int, default=None, help="ensemble seed (universe and sweep streams derive from it)")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME=LO:HI",
+                        help=f"sample a parameter per universe; NAME is one of {', '.join(PARAMETERS)}")
+    parser.add_argument("--world", type=float, nargs=2, default=WORLD_SIZE, metavar=("W", "H"), help="world size")
+    parser.add_argument("--workers", type=int, default=1, help="processes to shard the universes over")
+    parser.add_argument("--shard-size", type=int, default=None, help="universes per shard (default: K / workers)")
+    parser.add_argument("--out", default="-", help="per-universe JSON-lines file, '-' for stdout")
+    args = parser.parse_args(argv)
+    for spec in args.sweep:
+        try:
+            parse_sweep(spec)
+        except ValueError as error:
+            parser.error(f"--sweep {spec}: {error}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    parameters = sample_sweeps(args.sweep, args.universes, args.seed)
+
+    start = time.perf_counter()
+    records = run_ensemble(
+        args.universes, args.steps, args.dns, args.pmns, parameters, args.seed,
+        args.workers, args.shard_size, args.world,
+    )
+    elapsed = time.perf_counter() - start
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    try:
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(json.dumps({"summary": {
+        "universes": args.universes,
+        "steps": args.steps,
+        "seconds": round(elapsed, 6),
+        "universe_steps_per_sec": round(args.universes * args.steps / elapsed, 3) if elapsed > 0 else None,
+    }}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
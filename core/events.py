@@ -0,0 +1,119 @@
+# core/events.py
+#
+# Simulation events (collisions, merges, particle bursts and expiries) as compact typed
+# records in a preallocated ring buffer, with per-frame counters and batched subscribers.
+
+import json
+
+import numpy as np
+
+# Event kinds
+EVENT_DN_COLLISION = 0
+EVENT_PMN_COLLISION = 1
+EVENT_MERGE = 2  # a = DN id, b = PMN id, mass_a = DN mass, mass_b = PMN mass afterwards
+EVENT_BURST = 3  # a = first particle slot of the burst, b = particles spawned
+EVENT_EXPIRY = 4  # a = particle slot
+EVENT_NAMES = ("dn_collision", "pmn_collision", "merge", "burst", "expiry")
+
+# One record per event; a / b are node IDs for node events (stable across compaction)
+EVENT_DTYPE = np.dtype([
+    ("frame", "<i8"), ("kind", "i1"), ("a", "<i8"), ("b", "<i8"), ("mass_a", "<f8"), ("mass_b", "<f8"),
+])
+
+DEFAULT_EVENT_CAPACITY = 1 << 16  # Records kept between two publishes before the oldest are overwritten
+
+
+class EventBus:
+    # 📣 Events are always counted; records are only written while someone is subscribed,
+    # so with no subscribers an emit is a counter add
+    def __init__(self, capacity=DEFAULT_EVENT_CAPACITY):
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.written = 0  # Records ever written
+        self.delivered = 0  # Records already handed to subscribers
+        self.dropped = 0  # Records overwritten before they could be delivered
+        self.frame = 0  # Stamped on every record: the frame the current step produces
+        self.frame_counts = np.zeros(len(EVENT_NAMES), dtype=np.int64)  # This step so far
+        self.last_counts = np.zeros(len(EVENT_NAMES), dtype=np.int64)  # The last completed step
+        self.totals = np.zeros(len(EVENT_NAMES), dtype=np.int64)
+        self.subscribers = []  # (callback, kinds or None)
+
+    @property
+    def active(self):
+        return bool(self.subscribers)
+
+    def subscribe(self, callback, kinds=None):
+        # callback(records, bus) after every step with that step's records (only `kinds`, if given)
+        self.subscribers.append((callback, None if kinds is None else np.asarray(kinds, dtype=np.int8)))
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers = [entry for entry in self.subscribers if entry[0] is not callback]
+
+    def begin_frame(self, frame):
+        self.frame = frame
+        self.frame_counts[:] = 0
+
+    def emit(self, kind, a, b=-1, mass_a=0.0, mass_b=0.0):
+        # ✅ One event per element of `a`; the other fields broadcast against it
+        a = np.asarray(a).reshape(-1)
+        count = len(a)
+        if count == 0:
+            return
+        self.frame_counts[kind] += count
+        if not self.subscribers:
+            return
+
+        slots = (self.written + np.arange(count)) % self.capacity
+        records = self.records
+        records["frame"][slots] = self.frame
+        records["kind"][slots] = kind
+        records["a"][slots] = a
+        records["b"][slots] = b
+        records["mass_a"][slots] = mass_a
+        records["mass_b"][slots] = mass_b
+        self.written += count
+
+    def pending(self):
+        # Records written since the last publish, oldest first (a copy, safe to keep)
+        start = max(self.delivered, self.written - self.capacity)
+        self.dropped += start - self.delivered
+        return self.records[np.arange(start, self.written) % self.capacity]
+
+    def publish(self):
+        # 📦 End of step: roll the counters and hand every subscriber its batch
+        self.last_counts[:] = self.frame_counts
+        self.totals += self.frame_counts
+        if not self.subscribers:
+            self.delivered = self.written
+            return
+
+        batch = self.pending()
+        self.delivered = self.written
+        for callback, kinds in list(self.subscribers):
+            callback(batch if kinds is None else batch[np.isin(batch["kind"], kinds)], self)
+
+    def counts(self, totals=False):
+        values = self.totals if totals else self.last_counts
+        return {name: int(value) for name, value in zip(EVENT_NAMES, values)}
+
+
+class EventLogSink:
+    # 📝 Subscriber writing one JSON line per event
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, records, bus):
+        lines = [
+            json.dumps({
+                "frame": int(record["frame"]),
+                "event": EVENT_NAMES[record["kind"]],
+                "a": int(record["a"]),
+                "b": int(record["b"]),
+                "mass_a": round(float(record["mass_a"]), 6),
+                "mass_b": round(float(record["mass_b"]), 6),
+            })
+            for record in records
+        ]
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
@@ -1,131 +1,165 @@
 import numpy as np
-from core.node import DynamicNode, PrimaryMassNode
+from core.node_store import KIND_DN, KIND_PMN
+from core.rng import resolve_rng
 
-class ForceCalculator:
-    def apply_forces(self, nodes):
-        G = 1.2
-        softening = 5
-        max_force = 15
-        max_velocity = 20
-
-        for node in nodes:
-            if isinstance(node, DynamicNode):
-                total_force = np.zeros(2)
-                total_mass_weight = 0
-
-                for other in nodes:
-                    if isinstance(other, PrimaryMassNode):
-                        r_vector = other.position - node.position
-                        distance = np.linalg.norm(r_vector) + softening
-
-                        # ✅ Gravitational Pull
-                        force = (G * node.mass * other.mass) * r_vector / (distance ** 1.9)
-                        total_force += force
-                        total_mass_weight += other.mass / distance
-
-                if total_mass_weight > 0:
-                    averaged_force = total_force / total_mass_weight
-                    force_magnitude = np.linalg.norm(averaged_force)
-                    if force_magnitude > max_force:
-                        averaged_force = (averaged_force / force_magnitude) * max_force
-
-                    node.velocity += (averaged_force / node.mass) * 0.5
-
-                # 🔄 Tangential motion
-                tangent_vector = np.array([-node.velocity[1], node.velocity[0]])
-                tangent_norm = np.linalg.norm(tangent_vector)
-                if tangent_norm != 0:
-                    tangent_vector /= tangent_norm
-                    node.velocity += tangent_vector * np.random.uniform(0.005, 0.01)
-
-                # Random micro-perturbation
-                random_nudge = (np.random.rand(2) - 0.5) * 0.2
-                node.velocity += random_nudge
-
-                # Clamp velocity
-                speed = np.linalg.norm(node.velocity)
-                if speed > max_velocity:
-                    node.velocity = (node.velocity / speed) * max_velocity
-
-                # Damping
-                node.velocity *= 0.998
-                
-    def resolve_dn_collisions(self, nodes):
-        for i, node_a in enumerate(nodes):
-            if isinstance(node_a, DynamicNode):
-                for j, node_b in enumerate(nodes):
-                    if i >= j or not isinstance(node_b, DynamicNode):
-                        continue  # Avoid double checks and self-collision
-
-                    # ✅ Check for collision
-                    r_vector = node_b.position - node_a.position
-                    distance = np.linalg.norm(r_vector)
-                    min_distance = 1.5 * ((node_a.mass ** (1/3)) + (node_b.mass ** (1/3)))
-                    if distance < min_distance:
-                        print(f"Collision detected between DN {i} and DN {j}")
-                        self.elastic_collision(node_a, node_b)
-
-
-
-                    if distance < min_distance:
-                        # ✅ Apply elastic collision response
-                        self.elastic_collision(node_a, node_b)
-
-
-    def resolve_pmn_collisions(self, nodes):
-        for i, node_a in enumerate(nodes):
-            if isinstance(node_a, PrimaryMassNode):
-                for j, node_b in enumerate(nodes):
-                    if i >= j or not isinstance(node_b, PrimaryMassNode):
-                        continue
-
-                    # ✅ Check for collision
-                    r_vector = node_b.position - node_a.position
-                    distance = np.linalg.norm(r_vector)
-                    min_distance = (node_a.mass ** (1/3)) + (node_b.mass ** (1/3))
-
-                    if distance < min_distance:
-                        # ✅ Elastic collision response
-                        self.elastic_collision(node_a, node_b)
-
-    def elastic_collision(self, node_a, node_b):
-        # ✅ Compute the normal vector between the nodes
-        normal_vector = node_b.position - node_a.position
-        distance = np.linalg.norm(normal_vector)
-
-        if distance == 0:
-            # Prevent division by zero by adding a small random nudge
-            normal_vector = np.random.rand(2) - 0.5
-            distance = np.linalg.norm(normal_vector)
-
-        normal_vector /= distance
-
-        # ✅ Push overlapping nodes apart slightly
-        overlap = 0.5 * ((node_a.mass ** (1/3)) + (node_b.mass ** (1/3))) - distance
-        if overlap > 0:
-            correction = normal_vector * overlap
-            node_a.position -= correction * (node_b.mass / (node_a.mass + node_b.mass))
-            node_b.position += correction * (node_a.mass / (node_a.mass + node_b.mass))
-
-        # ✅ Relative velocity
-        relative_velocity = node_a.velocity - node_b.velocity
-        velocity_along_normal = np.dot(relative_velocity, normal_vector)
-
-        if velocity_along_normal > 0:
-            return  # Nodes are moving apart, no need to resolve
-
-        # ✅ Compute impulse scalar
-        restitution = 0.9  # Elasticity: 1.0 is perfectly elastic, <1.0 is inelastic
-        impulse_magnitude = -(1 + restitution) * velocity_along_normal
-        impulse_magnitude /= (1 / node_a.mass) + (1 / node_b.mass)
-
-        # ✅ Apply the impulse to the velocities
-        impulse = impulse_magnitude * normal_vector
-        node_a.velocity += impulse / node_a.mass
-        node_b.velocity -= impulse / node_b.mass
-
-        # ✅ Optional: Slight damping to stabilize bouncing
-        node_a.velocity *= 0.98
-        node_b.velocity *= 0.98
+
+# Number of DN×PMN pair elements processed per chunk (bounds the temporary arrays)
+PAIR_CHUNK_ELEMENTS = 1 << 20
+
+# Acceleration per unit of force / mass (the long-standing `F / m * 0.5` kick)
+FORCE_SCALE = 0.5
+
+
+def ga_forces(dn_pos, dn_mass, pmn_pos, pmn_mass, G, softening):
+    # ✅ Gravitational pull of every PMN on every DN, summed per DN: (N, M) pair arrays
+    r_vector = pmn_pos[None, :, :] - dn_pos[:, None, :]
+    distance = np.sqrt(np.einsum("nmk,nmk->nm", r_vector, r_vector)) + softening
+
+    strength = (G * dn_mass[:, None] * pmn_mass[None, :]) / (distance ** 1.9)
+    total_force = np.einsum("nm,nmk->nk", strength, r_vector)
+    total_mass_weight = (pmn_mass[None, :] / distance).sum(axis=1)
+    return total_force, total_mass_weight
+
+
+def averaged_forces(dn_pos, dn_mass, pmn_pos, pmn_mass, G, softening, max_force):
+    # ⚖️ GA: average the summed force by the mass/distance weight, then clamp it
+    averaged = np.zeros_like(dn_pos)
+    has_weight = np.zeros(len(dn_pos), dtype=bool)
+    if len(pmn_pos) == 0:
+        return averaged, has_weight
+
+    chunk = max(1, PAIR_CHUNK_ELEMENTS // len(pmn_pos))
+    for start in range(0, len(dn_pos), chunk):
+        rows = slice(start, start + chunk)
+        total_force, total_mass_weight = ga_forces(
+            dn_pos[rows], dn_mass[rows], pmn_pos, pmn_mass, G, softening
+        )
+        weighted = total_mass_weight > 0
+        averaged[rows][weighted] = total_force[weighted] / total_mass_weight[weighted, None]
+        has_weight[rows] = weighted
+
+    force_magnitude = np.hypot(averaged[:, 0], averaged[:, 1])
+    too_strong = force_magnitude > max_force
+    averaged[too_strong] *= (max_force / force_magnitude[too_strong])[:, None]
+    return averaged, has_weight
 
 
+def ga_accelerations(position, mass, dn_rows, pmn_pos, pmn_mass, G, softening, max_force):
+    # 🧭 GA acceleration of the given DN rows (zero where no PMN pulls at all)
+    dn_mass = mass[dn_rows]
+    averaged_force, has_weight = averaged_forces(
+        position[dn_rows], dn_mass, pmn_pos, pmn_mass, G, softening, max_force,
+    )
+    acceleration = np.zeros_like(averaged_force)
+    acceleration[has_weight] = (averaged_force[has_weight] / dn_mass[has_weight, None]) * FORCE_SCALE
+    return acceleration
+
+
+def update_dn_velocities(position, velocity, mass, dn_rows, pmn_pos, pmn_mass, tangent_nudge, perturbation,
+                         G, softening, max_force, max_velocity, damping, dt=1.0, acceleration=None):
+    # 🧱 Velocity update for the given DN rows over one step of `dt`, written back in place
+    # (`acceleration` skips the GA evaluation, e.g. for an integrator that already has it)
+    if acceleration is None:
+        acceleration = ga_accelerations(position, mass, dn_rows, pmn_pos, pmn_mass, G, softening, max_force)
+
+    dn_velocity = velocity[dn_rows]
+    dn_velocity += acceleration * dt
+
+    # 🔄 Tangential motion
+    tangent_vector = np.column_stack((-dn_velocity[:, 1], dn_velocity[:, 0]))
+    tangent_norm = np.hypot(tangent_vector[:, 0], tangent_vector[:, 1])
+    moving = tangent_norm != 0
+    dn_velocity[moving] += (tangent_vector[moving] / tangent_norm[moving, None]) * (tangent_nudge[moving, None] * dt)
+
+    # Random micro-perturbation
+    dn_velocity += (perturbation - 0.5) * (0.2 * dt)
+
+    # Clamp velocity
+    speed = np.hypot(dn_velocity[:, 0], dn_velocity[:, 1])
+    too_fast = speed > max_velocity
+    dn_velocity[too_fast] *= (max_velocity / speed[too_fast])[:, None]
+
+    # Damping (per unit of time)
+    dn_velocity *= damping if dt == 1.0 else damping ** dt
+    velocity[dn_rows] = dn_velocity
+
+
+class ForceCalculator:
+    def __init__(self, G=1.2, softening=5, max_force=15, max_velocity=20, damping=0.998, rng=None):
+        self.G = G
+        self.softening = softening
+        self.max_force = max_force
+        self.max_velocity = max_velocity
+        self.damping = damping
+        self.backend = None  # Optional parallel backend (see core/parallel_forces.py)
+        self.field = None  # Optional cached PMN field (see core/force_field.py)
+        self.rng = resolve_rng(rng)  # 🎲 Injected by the simulation so runs are reproducible
+
+    def params(self):
+        return {
+            "G": self.G,
+            "softening": self.softening,
+            "max_force": self.max_force,
+            "max_velocity": self.max_velocity,
+            "damping": self.damping,
+        }
+
+    def draw_noise(self, count):
+        # 🎲 The whole frame's noise in one draw: column 0 is the tangential nudge, 1-2 the perturbation
+        noise = self.rng.random((count, 3))
+        tangent_nudge = 0.005 + 0.005 * noise[:, 0]
+        return tangent_nudge, noise[:, 1:]
+
+    def use_backend(self, backend, nodes):
+        # ⚡ Route large force passes through `backend`; None returns to the in-process path
+        if self.backend is not None:
+            self.backend.release(nodes)
+        self.backend = backend
+        if backend is not None:
+            backend.attach(nodes)
+
+    def use_field(self, field):
+        # 🗺️ Sample GA from a cached ForceField instead of the exact kernel; None returns to exact
+        self.field = field
+
+    def ga_accelerations(self, nodes, dn_rows, pmn_rows):
+        kernel = ga_accelerations if self.field is None else self.field.accelerations
+        return kernel(
+            nodes.position, nodes.mass, dn_rows, nodes.position[pmn_rows], nodes.mass[pmn_rows],
+            self.G, self.softening, self.max_force,
+        )
+
+    def accelerations(self, nodes):
+        # GA acceleration of every DN, without touching velocities: (dn_rows, (N_dn, 2))
+        kind = nodes.kind[:nodes.count]
+        dn_rows = np.flatnonzero(kind == KIND_DN)
+        pmn_rows = np.flatnonzero(kind == KIND_PMN)
+        return dn_rows, self.ga_accelerations(nodes, dn_rows, pmn_rows)
+
+    def apply_forces(self, nodes, dt=1.0, acceleration=None):
+        # 🧱 All DNs at once over the node store arrays; `acceleration` (per DN row) skips the GA pass
+        count = nodes.count
+        kind = nodes.kind[:count]
+        dn_rows = np.flatnonzero(kind == KIND_DN)
+        if len(dn_rows) == 0:
+            return
+
+        tangent_nudge, perturbation = self.draw_noise(len(dn_rows))
+        params = self.params()
+        params["dt"] = dt
+
+        if (
+            acceleration is None and self.field is None
+            and self.backend is not None and self.backend.handles(len(dn_rows))
+        ):
+            self.backend.apply_forces(nodes, dn_rows, tangent_nudge, perturbation, params)
+            return
+
+        pmn_rows = np.flatnonzero(kind == KIND_PMN)
+        if acceleration is None and self.field is not None:
+            acceleration = self.ga_accelerations(nodes, dn_rows, pmn_rows)
+        update_dn_velocities(
+            nodes.position, nodes.velocity, nodes.mass, dn_rows,
+            nodes.position[pmn_rows], nodes.mass[pmn_rows],
+            tangent_nudge, perturbation, acceleration=acceleration, **params,
+        )
@@ -0,0 +1,234 @@
+# core/force_field.py
+#
+# Cached GA field of the PMNs: the summed force and mass-weight terms precomputed on a
+# lattice over the world and sampled per DN, rebuilt only when a PMN moves or changes mass.
+#
+#   python -m core.force_field --dns 20000 --pmns 64 --cell-size 2 4 8
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from core.force_calculator import ga_forces, ga_accelerations, FORCE_SCALE, PAIR_CHUNK_ELEMENTS
+from core.motion_integrator import WORLD_SIZE
+from core.node_store import KIND_DN, KIND_PMN
+
+DEFAULT_CELL_SIZE = 4.0  # World units between lattice points
+
+# DNs this many cells or fewer from a PMN get the exact kernel: the field is too steep there to interpolate
+DEFAULT_EXACT_CELLS = 2
+
+
+class ForceField:
+    # 🗺️ GA is linear in the DN mass, so per point it is G · m · F(x) / W(x) with
+    # F = Σ M·r / d^1.9 and W = Σ M / d over the PMNs; both are stored on the lattice
+    def __init__(self, world_size=WORLD_SIZE, cell_size=DEFAULT_CELL_SIZE, exact_cells=DEFAULT_EXACT_CELLS):
+        self.world_size = tuple(world_size)
+        self.cell_size = float(cell_size)
+        self.exact_cells = exact_cells
+        self.shape = tuple(int(np.ceil(size / self.cell_size)) for size in self.world_size)  # Cells along x, y
+        self.force = None  # (ny + 1, nx + 1, 2) F at the lattice points
+        self.weight = None  # (ny + 1, nx + 1) W at the lattice points
+        self.near = None  # (ny, nx) cells close enough to a PMN to need the exact kernel
+        self._key = None  # (PMN positions, PMN masses, softening) the lattice holds
+        self._moved = None  # PMN positions last seen while they differed from the lattice's
+        self.active = False  # Whether the last accelerations() call sampled the lattice
+        self.builds = 0
+        self.updates = 0
+
+    def refresh(self, pmn_pos, pmn_mass, softening):
+        # ✅ Bring the lattice up to date with the PMNs; False means use the exact kernel this step
+        key = self._key
+        if key is not None and key[2] == softening and np.array_equal(key[0], pmn_pos):
+            if not np.array_equal(key[1], pmn_mass):
+                self.update_masses(pmn_pos, pmn_mass)  # A merge or a mass edit: PMNs stayed put
+            return True
+
+        # A PMN was added, removed or moved: rebuild once positions hold still for one step, so
+        # PMNs set drifting by a collision fall back to the exact kernel instead of rebuilding every frame
+        if self._moved is not None and np.array_equal(self._moved, pmn_pos):
+            self.build(pmn_pos, pmn_mass, softening)
+            return True
+        self._moved = np.array(pmn_pos, dtype=float)
+        return False
+
+    def _accumulate(self, pmn_pos, pmn_mass, softening, force, weight):
+        # F and W summed over the given PMNs at every lattice point, added into force / weight
+        nx, ny = self.shape
+        xs = np.arange(nx + 1) * self.cell_size
+        ys = np.arange(ny + 1) * self.cell_size
+        points = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+        force, weight = force.reshape(-1, 2), weight.reshape(-1)
+
+        chunk = max(1, PAIR_CHUNK_ELEMENTS // max(1, len(pmn_pos)))
+        unit_mass = np.ones(min(chunk, len(points)))
+        for start in range(0, len(points), chunk):
+            rows = slice(start, start + chunk)
+            block = points[rows]
+            block_force, block_weight = ga_forces(block, unit_mass[:len(block)], pmn_pos, pmn_mass, 1.0, softening)
+            force[rows] += block_force
+            weight[rows] += block_weight
+
+    def build(self, pmn_pos, pmn_mass, softening):
+        nx, ny = self.shape
+        self.force = np.zeros((ny + 1, nx + 1, 2))
+        self.weight = np.zeros((ny + 1, nx + 1))
+        if len(pmn_pos):
+            self._accumulate(pmn_pos, pmn_mass, softening, self.force, self.weight)
+
+        # 🎯 Cells around every PMN, widened by exact_cells on each side
+        near = np.zeros((ny, nx), dtype=bool)
+        cells = np.floor(np.asarray(pmn_pos, dtype=float).reshape(-1, 2) / self.cell_size).astype(np.int64)
+        reach = self.exact_cells
+        for cx, cy in cells:
+            near[max(cy - reach, 0):max(cy + reach + 1, 0), max(cx - reach, 0):max(cx + reach + 1, 0)] = True
+        self.near = near
+
+        self._key = (np.array(pmn_pos, dtype=float), np.array(pmn_mass, dtype=float), softening)
+        self._moved = None
+        self.builds += 1
+
+    def update_masses(self, pmn_pos, pmn_mass):
+        # ➕ F and W are linear in each PMN's mass: add only the changed PMNs' mass deltas
+        old_pos, old_mass, softening = self._key
+        changed = np.flatnonzero(old_mass != pmn_mass)
+        delta = np.asarray(pmn_mass, dtype=float)[changed] - old_mass[changed]
+        self._accumulate(old_pos[changed], delta, softening, self.force, self.weight)
+        self._key = (old_pos, np.array(pmn_mass, dtype=float), softening)
+        self.updates += 1
+
+    def sample(self, points):
+        # Bilinear F and W at `points`, plus which points must use the exact kernel instead
+        # (outside the lattice, non-finite, or next to a PMN)
+        nx, ny = self.shape
+        scaled = np.asarray(points, dtype=float) / self.cell_size
+        with np.errstate(invalid="ignore"):
+            inside = (scaled[:, 0] >= 0) & (scaled[:, 0] <= nx) & (scaled[:, 1] >= 0) & (scaled[:, 1] <= ny)
+        scaled = np.where(inside[:, None], scaled, 0.0)
+
+        i = np.minimum(scaled[:, 0].astype(np.int64), nx - 1)
+        j = np.minimum(scaled[:, 1].astype(np.int64), ny - 1)
+        tx = (scaled[:, 0] - i)[:, None]
+        ty = (scaled[:, 1] - j)[:, None]
+
+        def bilinear(grid):
+            grid = grid if grid.ndim == 3 else grid[..., None]
+            top = grid[j, i] * (1 - tx) + grid[j, i + 1] * tx
+            bottom = grid[j + 1, i] * (1 - tx) + grid[j + 1, i + 1] * tx
+            return top * (1 - ty) + bottom * ty
+
+        force = bilinear(self.force)
+        weight = bilinear(self.weight)[:, 0]
+        exact = ~inside | self.near[j, i]
+        return force, weight, exact
+
+    def accelerations(self, position, mass, dn_rows, pmn_pos, pmn_mass, G, softening, max_force):
+        # 🧭 Same contract as ga_accelerations, from the lattice wherever it is accurate enough
+        acceleration = np.zeros((len(dn_rows), 2))
+        if len(dn_rows) == 0 or len(pmn_pos) == 0:
+            return acceleration
+        self.active = self.refresh(pmn_pos, pmn_mass, softening)
+        if not self.active:
+            return ga_accelerations(position, mass, dn_rows, pmn_pos, pmn_mass, G, softening, max_force)
+
+        dn_mass = mass[dn_rows]
+        force, weight, exact = self.sample(position[dn_rows])
+        sampled = ~exact & (weight > 0)
+
+        # ⚖️ Average and clamp exactly as averaged_forces does
+        averaged = G * dn_mass[sampled, None] * force[sampled] / weight[sampled, None]
+        force_magnitude = np.hypot(averaged[:, 0], averaged[:, 1])
+        too_strong = force_magnitude > max_force
+        averaged[too_strong] *= (max_force / force_magnitude[too_strong])[:, None]
+        acceleration[sampled] = averaged / dn_mass[sampled, None] * FORCE_SCALE
+
+        if exact.any():
+            acceleration[exact] = ga_accelerations(
+                position, mass, dn_rows[exact], pmn_pos, pmn_mass, G, softening, max_force,
+            )
+        return acceleration
+
+    def error_report(self, nodes, G, softening, max_force):
+        # 📊 Field vs exact kernel for the DNs currently in the store
+        kind = nodes.kind[:nodes.count]
+        dn_rows = np.flatnonzero(kind == KIND_DN)
+        pmn_rows = np.flatnonzero(kind == KIND_PMN)
+        args = (nodes.position, nodes.mass, dn_rows, nodes.position[pmn_rows], nodes.mass[pmn_rows],
+                G, softening, max_force)
+        field = self.accelerations(*args)
+        exact = ga_accelerations(*args)
+
+        report = {"cell_size": self.cell_size, "dns": len(dn_rows), "builds": self.builds, "updates": self.updates}
+        if len(dn_rows) == 0 or len(pmn_rows) == 0:
+            return report
+        exact_fallback = len(dn_rows)
+        if self.active:
+            exact_fallback = int(np.count_nonzero(self.sample(nodes.position[dn_rows])[2]))
+        error = np.hypot(*(field - exact).T)
+        scale = np.hypot(*exact.T)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = np.where(scale > 0, error / scale, 0.0)
+        report.update({
+            "exact_fallback": exact_fallback,
+            "max_abs": float(error.max()),
+            "p95_abs": float(np.percentile(error, 95)),
+            "median_rel": float(np.median(relative)),
+            "p95_rel": float(np.percentile(relative, 95)),
+            "max_rel": float(relative.max()),
+        })
+        return report
+
+
+def benchmark(num_dns, num_pmns, cell_sizes, repeats=5, seed=0):
+    # ⏱️ Exact kernel vs the field at every cell size, on one random scenario
+    from core.simulation_controller import SimulationController
+
+    controller = SimulationController(num_dns=num_dns, num_pmns=num_pmns, seed=seed)
+    nodes, calculator = controller.nodes, controller.force_calculator
+    params = {name: getattr(calculator, name) for name in ("G", "softening", "max_force")}
+
+    def seconds(run):
+        run()
+        run()  # Warm-up (the field is built on the second call, once the PMNs are known to be at rest)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            run()
+        return (time.perf_counter() - start) / repeats
+
+    calculator.use_field(None)
+    results = [{"mode": "exact", "ms": round(seconds(lambda: calculator.accelerations(nodes)) * 1000, 3)}]
+    for cell_size in cell_sizes:
+        field = ForceField(controller.world_size, cell_size)
+        calculator.use_field(field)
+        ms = seconds(lambda: calculator.accelerations(nodes)) * 1000
+        start = time.perf_counter()
+        field.build(*field._key)
+        build_ms = (time.perf_counter() - start) * 1000
+        results.append({
+            "mode": "field",
+            "ms": round(ms, 3),
+            "build_ms": round(build_ms, 3),
+            **field.error_report(nodes, **params),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and check the cached PMN force field against the exact kernel.")
+    parser.add_argument("--dns", type=int, default=20000)
+    parser.add_argument("--pmns", type=int, default=64)
+    parser.add_argument("--cell-size", type=float, nargs="+", default=[2.0, DEFAULT_CELL_SIZE, 8.0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for row in benchmark(args.dns, args.pmns, args.cell_size, args.repeats, args.seed):
+        print(json.dumps(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
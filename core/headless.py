@@ -0,0 +1,154 @@
+# core/headless.py
+#
+# Render-less batch runner: python -m core.headless --steps 5000 --dns 20000
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from core.motion_integrator import SCHEMES, EulerScheme, DEFAULT_DT, WORLD_SIZE
+from core.node_store import KIND_DN, KIND_PMN
+from core.simulation_controller import SimulationController
+
+
+def summary_stats(controller):
+    # 📊 One compact record per report: counts, merges and PMN masses
+    nodes = controller.nodes
+    kind = nodes.kind[:nodes.count]
+    return {
+        "frame": controller.frame,
+        "time": round(controller.time, 6),
+        "dn_count": int(np.count_nonzero(kind == KIND_DN)),
+        "pmn_count": int(np.count_nonzero(kind == KIND_PMN)),
+        "merges": controller.merge_count,
+        "pmn_masses": nodes.mass[:nodes.count][kind == KIND_PMN].round(3).tolist(),
+        "events": controller.events.counts(totals=True),
+    }
+
+
+def build_controller(args):
+    controller = SimulationController(
+        num_dns=args.dns, num_pmns=args.pmns, seed=args.seed, integrator=args.integrator, dt=args.dt,
+        world_size=args.world,
+    )
+    controller.enable_dn_collisions = args.dn_collisions
+    controller.enable_mutual_gravity = args.mutual_gravity
+    controller.mutual_gravity.theta = args.theta
+    if args.workers:
+        from core.parallel_forces import ParallelForceBackend
+
+        backend = ParallelForceBackend(workers=args.workers, min_dns=args.parallel_min_dns)
+        controller.force_calculator.use_backend(backend, controller.nodes)
+    if args.force_field:
+        from core.force_field import ForceField
+
+        controller.force_calculator.use_field(ForceField(controller.world_size, args.force_field))
+    return controller
+
+
+def run(controller, steps, stats_every=0, stats_out=None, profile_every=0, profile_out=None):
+    # ▶️ Step as fast as possible, streaming a stats line every `stats_every` frames
+    # (and the per-phase profile every `profile_every` frames)
+    profiling = profile_out is not None and profile_every > 0
+    controller.profiler.enabled = profiling or controller.profiler.enabled
+
+    start = time.perf_counter()
+    for step in range(1, steps + 1):
+        controller.update()
+        if stats_out is not None and stats_every and step % stats_every == 0:
+            stats_out.write(json.dumps(summary_stats(controller)) + "\n")
+        if profiling and step % profile_every == 0:
+            controller.profiler.write_json_line(profile_out, frame=controller.frame)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "steps": steps,
+        "seconds": round(elapsed, 6),
+        "steps_per_sec": round(steps / elapsed, 3) if elapsed > 0 else None,
+        "substeps": controller.motion_integrator.total_substeps,
+        **summary_stats(controller),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the gravity simulation without a UI.")
+    parser.add_argument("--steps", type=int, default=1000, help="number of frames to simulate")
+    parser.add_argument("--dns", type=int, default=50, help="initial Dynamic Node count")
+    parser.add_argument("--pmns", type=int, default=3, help="initial Primary Mass Node count")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the scenario")
+    parser.add_argument("--world", type=float, nargs=2, default=WORLD_SIZE, metavar=("W", "H"), help="world size")
+    parser.add_argument("--dn-collisions", action="store_true", help="enable DN-DN collisions")
+    parser.add_argument("--mutual-gravity", action="store_true", help="enable Barnes-Hut DN-DN gravity")
+    parser.add_argument("--integrator", choices=sorted(SCHEMES), default="euler", help="integration scheme")
+    parser.add_argument("--dt", type=float, default=DEFAULT_DT, help="step length (adaptive splits it into substeps)")
+    parser.add_argument("--theta", type=float, default=0.5, help="Barnes-Hut opening angle")
+    parser.add_argument("--workers", type=int, default=0, help="force-pass worker processes (0 = in-process)")
+    parser.add_argument("--parallel-min-dns", type=int, default=20000, help="DN count below which forces stay in-process")
+    parser.add_argument("--force-field", type=float, default=0, metavar="CELL",
+                        help="sample PMN forces from a cached grid with this cell size (0 = exact kernel)")
+    parser.add_argument("--stats-every", type=int, default=100, help="frames between stats lines (0 disables)")
+    parser.add_argument("--stats-out", default="-", help="stats JSON-lines file, '-' for stdout")
+    parser.add_argument("--record", metavar="PATH", help="record every frame to PATH.frames / PATH.index")
+    parser.add_argument("--publish", metavar="NAME", help="publish every step to shared memory NAME for other processes")
+    parser.add_argument("--event-log", metavar="PATH", help="collision / merge / particle events as JSON lines, '-' for stdout")
+    parser.add_argument("--profile-out", metavar="PATH", help="per-phase timing JSON-lines file, '-' for stdout")
+    parser.add_argument("--profile-every", type=int, default=100, help="frames between profile lines")
+    args = parser.parse_args(argv)
+    # The pool only runs the fused Euler force pass: Verlet schemes and the cached field compute GA in-process
+    if args.workers and SCHEMES[args.integrator] is not EulerScheme:
+        parser.error(f"--workers needs --integrator euler (--integrator {args.integrator} computes forces in-process)")
+    if args.workers and args.force_field:
+        parser.error("--workers and --force-field cannot be combined (the cached field is sampled in-process)")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    controller = build_controller(args)
+    if args.record:
+        from core.recorder import TrajectoryRecorder
+
+        controller.use_recorder(TrajectoryRecorder(args.record))
+    if args.publish:
+        from core.shared_state import StatePublisher
+
+        controller.publisher = StatePublisher(args.publish)
+
+    stats_out = sys.stdout if args.stats_out == "-" else open(args.stats_out, "w")
+    profile_out = None
+    if args.profile_out:
+        profile_out = sys.stdout if args.profile_out == "-" else open(args.profile_out, "w")
+    event_log = None
+    if args.event_log:
+        from core.events import EventLogSink
+
+        event_log = sys.stdout if args.event_log == "-" else open(args.event_log, "w")
+        controller.events.subscribe(EventLogSink(event_log))
+    try:
+        result = run(controller, args.steps, args.stats_every, stats_out, args.profile_every, profile_out)
+    finally:
+        for stream in (stats_out, profile_out, event_log):
+            if stream is not None and stream is not sys.stdout:
+                stream.close()
+        if controller.recorder is not None:
+            controller.recorder.close()
+        if controller.publisher is not None:
+            controller.publisher.close()
+        if controller.force_calculator.backend is not None:
+            controller.force_calculator.use_backend(None, controller.nodes)
+
+    field = controller.force_calculator.field
+    if field is not None:
+        calculator = controller.force_calculator
+        result["force_field"] = field.error_report(
+            controller.nodes, calculator.G, calculator.softening, calculator.max_force,
+        )
+    print(json.dumps({"summary": result}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,195 @@
-from core.node import DynamicNode, PrimaryMassNode  # ✅ Fix: Import the node classes
+from core.node_store import KIND_DN, KIND_DEAD
 import numpy as np
 
+# Default step length (one frame of the original fixed-step simulation)
+DEFAULT_DT = 1.0
+
+# Default world (walls) size: the original 800x600 window
+WORLD_SIZE = (800, 600)
+
+
+class EulerScheme:
+    # ✅ The original scheme: kick with the forces at x, then drift (semi-implicit Euler)
+    name = "euler"
+
+    def step(self, integrator, system, dt):
+        nodes, profiler = system.nodes, system.profiler
+        with profiler.phase("forces"):
+            system.force_calculator.apply_forces(nodes, dt)
+        # 🌀 DN↔DN mutual gravity only if enabled
+        if system.enable_mutual_gravity:
+            with profiler.phase("mutual_gravity"):
+                system.mutual_gravity.apply(nodes, dt)
+        resolve_collisions(system)
+        with profiler.phase("integration"):
+            integrator.update_positions(nodes, dt)
+        return dt
+
+
+def resolve_collisions(system):
+    # ✅ PMN collisions always, DN collisions only if enabled
+    profiler, handler = system.profiler, system.collision_handler
+    with profiler.phase("pmn_collisions"):
+        handler.resolve_pmn_collisions(system.nodes)
+    if system.enable_dn_collisions:
+        with profiler.phase("dn_collisions"):
+            handler.resolve_dn_collisions(system.nodes)
+
+
+class VerletScheme:
+    # 🪐 Velocity Verlet / leapfrog (kick-drift-kick): the accelerations at the end of a step are
+    # reused for the next step's first half-kick, so it is still one force evaluation per step
+    name = "verlet"
+
+    def __init__(self):
+        self._cache = None  # (node ids, masses, mutual gravity on?, dn_rows, acceleration)
+
+    def accelerations(self, system):
+        nodes, profiler = system.nodes, system.profiler
+        with profiler.phase("forces"):
+            dn_rows, acceleration = system.force_calculator.accelerations(nodes)
+        if system.enable_mutual_gravity:
+            with profiler.phase("mutual_gravity"):
+                acceleration += system.mutual_gravity.accelerations(nodes)[1]
+        return self._remember(system, dn_rows, acceleration)
+
+    def _remember(self, system, dn_rows, acceleration):
+        nodes = system.nodes
+        self._cache = (
+            nodes.node_id[:nodes.count].copy(), nodes.mass[:nodes.count].copy(),
+            system.enable_mutual_gravity, dn_rows, acceleration,
+        )
+        return dn_rows, acceleration
+
+    def cached_accelerations(self, system):
+        # Reuse last step's accelerations unless merges, new nodes or mass edits changed the system since
+        nodes = system.nodes
+        if self._cache is not None:
+            node_ids, masses, mutual_gravity, dn_rows, acceleration = self._cache
+            if (
+                mutual_gravity == system.enable_mutual_gravity
+                and np.array_equal(node_ids, nodes.node_id[:nodes.count])
+                and np.array_equal(masses, nodes.mass[:nodes.count])
+            ):
+                return dn_rows, acceleration
+        return self.accelerations(system)
+
+    def step(self, integrator, system, dt, trails=True):
+        nodes, profiler = system.nodes, system.profiler
+        dn_rows, acceleration = self.cached_accelerations(system)
+
+        # First half-kick, collisions, drift
+        with profiler.phase("integration"):
+            nodes.velocity[dn_rows] += acceleration * (dt / 2)
+        resolve_collisions(system)
+        with profiler.phase("integration"):
+            integrator.update_positions(nodes, dt, trails)
+
+        # Second half-kick from the new positions, with the per-step nudge, noise, clamp and damping
+        dn_rows, acceleration = self.accelerations(system)
+        with profiler.phase("forces"):
+            system.force_calculator.apply_forces(nodes, dt, acceleration=acceleration / 2)
+        return dt
+
+
+class AdaptiveVerletScheme(VerletScheme):
+    # ⏱️ Verlet that splits each step of the configured dt into equal substeps, as many as the DNs'
+    # speeds, accelerations and closest PMN approaches need (never fewer than one, never a longer step)
+    name = "adaptive"
+
+    def __init__(self, dt_min=0.05, safety=0.5, percentile=1.0):
+        super().__init__()
+        self.dt_min = dt_min  # Shortest substep, which bounds the substeps per step
+        self.safety = safety  # Fraction of the closest approach a DN may cover in one substep
+        self.percentile = percentile  # Percent of DNs allowed past that bound, so a few outliers don't set everyone's dt
+        self.substeps = 1  # Substeps taken by the last step
+
+    def step(self, integrator, system, dt):
+        # ▶️ The substep count is chosen once per step; trails get one point per step, as with the other schemes
+        acceleration = self.cached_accelerations(system)[1]
+        substep = self.choose_dt(system, acceleration, dt)
+        self.substeps = int(round(dt / substep))
+        for i in range(self.substeps):
+            super().step(integrator, system, substep, trails=i == self.substeps - 1)
+        return dt
+
+    def choose_dt(self, system, acceleration, dt):
+        # Substep length: dt divided into the fewest equal parts that are short enough
+        nodes = system.nodes
+        dn_rows = nodes.rows_of_kind(KIND_DN)
+        if len(dn_rows) == 0:
+            return dt
+
+        # Closest approach per DN from the last nearest-PMN pass, never below the force softening length
+        index = system.nearest_pmn
+        if np.array_equal(index.dn_rows, dn_rows):
+            closest = np.maximum(index.distance, system.force_calculator.softening)
+        else:
+            closest = np.full(len(dn_rows), np.inf)  # Nodes were added since; take the configured dt this step
+        reach = self.safety * closest
+
+        # Each DN may cover at most `reach` in one substep, from its speed and from its acceleration
+        velocity = nodes.velocity[dn_rows]
+        speed = np.hypot(velocity[:, 0], velocity[:, 1])
+        magnitude = np.hypot(acceleration[:, 0], acceleration[:, 1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            by_speed = np.where(speed > 0, reach / speed, np.inf)
+            by_acceleration = np.where(magnitude > 0, np.sqrt(2 * reach / magnitude), np.inf)
+            needed = float(np.percentile(np.minimum(by_speed, by_acceleration), self.percentile))  # NaN if all unbounded
+        if not needed < dt:
+            return dt
+        max_substeps = int(np.ceil(dt / self.dt_min))
+        substeps = max_substeps if needed <= 0 else min(int(np.ceil(dt / needed)), max_substeps)
+        return dt / substeps
+
+
+SCHEMES = {
+    "euler": EulerScheme,
+    "verlet": VerletScheme,
+    "leapfrog": VerletScheme,  # Kick-drift-kick leapfrog is velocity Verlet
+    "adaptive": AdaptiveVerletScheme,
+}
+
+
 class MotionIntegrator:
-    def update_positions(self, nodes):
-        for node in nodes:
-            node.position += node.velocity
-
-            # 🌀 Update trail for Dynamic Nodes
-            if isinstance(node, DynamicNode):
-                node.trail.append(node.position.copy())
-                if len(node.trail) > 15:
-                    node.trail.pop(0)
-
-                # 💥 Remove burst particles after lifetime expires
-                if hasattr(node, 'lifetime'):
-                    node.lifetime -= 1
-                    if node.lifetime <= 0:
-                        nodes.remove(node)
-
-            # ✅ Wall boundaries (assuming window size is 800x600)
-            window_width, window_height = 800, 600
-            size = 10 if node.mass == 1 else 30  # DynamicNode vs PMN
-
-            # Left and Right Walls
-            if node.position[0] - size / 2 <= 0 or node.position[0] + size / 2 >= window_width:
-                node.velocity[0] *= -1  # ✅ Reverse X velocity
-
-            # Top and Bottom Walls
-            if node.position[1] - size / 2 <= 0 or node.position[1] + size / 2 >= window_height:
-                node.velocity[1] *= -1  # ✅ Reverse Y velocity
+    def __init__(self, scheme="euler", dt=DEFAULT_DT, world_size=WORLD_SIZE):
+        self.dt = dt  # Step length (upper/lower bounds come from the scheme for adaptive steps)
+        self.last_dt = dt
+        self.last_substeps = 1  # Force passes per step (more than one only for adaptive steps)
+        self.total_substeps = 0
+        self.world_size = tuple(world_size)  # 🧱 Walls at 0 and (width, height)
+        self.use_scheme(scheme)
+
+    def use_scheme(self, scheme):
+        # A scheme name from SCHEMES or any object with step(integrator, system, dt) -> dt
+        self.scheme = SCHEMES[scheme]() if isinstance(scheme, str) else scheme
+
+    def step(self, system):
+        # ▶️ Forces, collisions and motion for one step of `system` (a SimulationController)
+        self.last_dt = self.scheme.step(self, system, self.dt)
+        self.last_substeps = getattr(self.scheme, "substeps", 1)
+        self.total_substeps += self.last_substeps
+        return self.last_dt
+
+    def update_positions(self, nodes, dt=DEFAULT_DT, trails=True):
+        count = nodes.count
+        alive = nodes.kind[:count] != KIND_DEAD
+        position = nodes.position[:count]
+        velocity = nodes.velocity[:count]
+        position[alive] += velocity[alive] * dt
+
+        # 🌀 Update trail for Dynamic Nodes (ring buffer in the store, no per-frame allocation)
+        if trails:
+            nodes.push_trails(np.flatnonzero(nodes.kind[:count] == KIND_DN))
+
+        # ✅ Wall boundaries of the configured world
+        window_width, window_height = self.world_size
+        size = np.where(nodes.mass[:count] == 1, 10, 30)  # DynamicNode vs PMN
+
+        # Left and Right Walls
+        hit_x = alive & ((position[:, 0] - size / 2 <= 0) | (position[:, 0] + size / 2 >= window_width))
+        velocity[hit_x, 0] *= -1  # ✅ Reverse X velocity
+
+        # Top and Bottom Walls
+        hit_y = alive & ((position[:, 1] - size / 2 <= 0) | (position[:, 1] + size / 2 >= window_height))
+        velocity[hit_y, 1] *= -1  # ✅ Reverse Y velocity
@@ -0,0 +1,76 @@
+# core/nearest_pmn.py
+
+import numpy as np
+from core.node_store import KIND_DN, KIND_PMN
+
+# 🌲 KD-tree is optional: scipy when installed, otherwise a chunked brute-force argmin
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# PMN count from which the KD-tree beats the (N_dn × N_pmn) argmin
+KD_TREE_MIN_PMNS = 64
+
+# Number of DN×PMN distances evaluated per chunk of the brute-force path
+PAIR_CHUNK_ELEMENTS = 1 << 20
+
+
+def nearest_points(points, targets):
+    # For every point: index of the closest target and the distance to it
+    if cKDTree is not None and len(targets) >= KD_TREE_MIN_PMNS:
+        distance, nearest = cKDTree(targets).query(points)
+        return nearest.astype(np.int64), distance
+
+    nearest = np.empty(len(points), dtype=np.int64)
+    distance = np.empty(len(points))
+    chunk = max(1, PAIR_CHUNK_ELEMENTS // len(targets))
+    for start in range(0, len(points), chunk):
+        rows = slice(start, start + chunk)
+        r_vector = targets[None, :, :] - points[rows, None, :]
+        squared = np.einsum("nmk,nmk->nm", r_vector, r_vector)
+        nearest[rows] = squared.argmin(axis=1)
+        distance[rows] = np.sqrt(squared[np.arange(len(squared)), nearest[rows]])
+    return nearest, distance
+
+
+class NearestPMNIndex:
+    # 🧭 Nearest-PMN assignment for every DN, computed once per step and shared by
+    # the merge check, the filament renderer and any per-frame analytics
+    def __init__(self):
+        self.frame = None
+        self.dn_rows = np.zeros(0, dtype=np.int64)
+        self.pmn_rows = np.zeros(0, dtype=np.int64)  # -1 when there is no PMN at all
+        self.distance = np.zeros(0)
+
+    def update(self, nodes, frame=None):
+        kind = nodes.kind[:nodes.count]
+        self.dn_rows = np.flatnonzero(kind == KIND_DN)
+        pmn_rows = np.flatnonzero(kind == KIND_PMN)
+        self.frame = frame
+
+        if len(pmn_rows) == 0 or len(self.dn_rows) == 0:
+            self.pmn_rows = np.full(len(self.dn_rows), -1, dtype=np.int64)
+            self.distance = np.full(len(self.dn_rows), np.inf)
+            return self
+
+        nearest, self.distance = nearest_points(nodes.position[self.dn_rows], nodes.position[pmn_rows])
+        self.pmn_rows = pmn_rows[nearest]
+        return self
+
+    def remap(self, old_to_new):
+        # Follow a store compaction: drop removed DNs, renumber the surviving rows
+        dn_rows = old_to_new[self.dn_rows]
+        pmn_rows = np.where(self.pmn_rows >= 0, old_to_new[np.maximum(self.pmn_rows, 0)], -1)
+        kept = dn_rows >= 0
+        self.dn_rows = dn_rows[kept]
+        self.pmn_rows = pmn_rows[kept]
+        self.distance = np.where(self.pmn_rows >= 0, self.distance[kept], np.inf)
+        return self
+
+    def lookup(self, dn_row):
+        # Nearest PMN row and distance for one DN row, or (None, inf) if unknown
+        slot = np.searchsorted(self.dn_rows, dn_row)
+        if slot == len(self.dn_rows) or self.dn_rows[slot] != dn_row or self.pmn_rows[slot] < 0:
+            return None, np.inf
+        return int(self.pmn_rows[slot]), float(self.distance[slot])
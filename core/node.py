@@ -1,42 +1,125 @@
 import numpy as np
 import random
+from core.node_store import NodeStore, KIND_DN, KIND_PMN, KIND_NODE
+from core.rng import resolve_rng
 
 class Node:
+    KIND = KIND_NODE
+
     def __init__(self, x=0, y=0, mass=1, velocity=None):
-        self.position = np.array([x, y], dtype=float)
-        self.velocity = np.array(velocity, dtype=float) if velocity is not None else np.zeros(2)
-        self.mass = mass
+        # 🧱 A freshly built node owns a one-row store until it joins a simulation store
+        velocity = np.array(velocity, dtype=float) if velocity is not None else np.zeros(2)
+        store = NodeStore(capacity=1)
+        self._bind(store, store.add_row(self.KIND, (x, y), velocity, mass))
+
+    @classmethod
+    def _view(cls, store, row):
+        node = cls.__new__(cls)
+        node._bind(store, row)
+        return node
+
+    def _bind(self, store, row):
+        # 🪪 Views hold the stable (id, generation) handle, never a raw row
+        self._store = store
+        self.node_id = int(store.node_id[row])
+        self.generation = int(store.generation[self.node_id])
+
+    @property
+    def _index(self):
+        # ⚠️ A freed id can be handed to a new node: a view from before that must not alias it
+        store = self._store
+        if store.generation[self.node_id] != self.generation:
+            raise ValueError(f"stale view: node {self.node_id} was removed from its store")
+        return store.id_to_row[self.node_id]
+
+    def _attach(self, store):
+        values = self._store.row_values(self._index)
+        self._bind(store, store.add_row(**values))
+
+    def _detach(self):
+        values = self._store.row_values(self._index)
+        store = NodeStore(capacity=1)
+        self._bind(store, store.add_row(**values))
+
+    # ✅ Views into the store rows (in-place ops like `position += v` write straight through)
+    @property
+    def position(self):
+        return self._store.position[self._index]
+
+    @position.setter
+    def position(self, value):
+        self._store.position[self._index] = value
+
+    @property
+    def velocity(self):
+        return self._store.velocity[self._index]
+
+    @velocity.setter
+    def velocity(self, value):
+        self._store.velocity[self._index] = value
+
+    @property
+    def mass(self):
+        return float(self._store.mass[self._index])
+
+    @mass.setter
+    def mass(self, value):
+        self._store.mass[self._index] = value
 
 class DynamicNode(Node):
-    def __init__(self, mass=None, position=None, velocity=None):
+    KIND = KIND_DN
+
+    def __init__(self, mass=None, position=None, velocity=None, rng=None):
+        rng = resolve_rng(rng)
         if position is None:
-            position = np.random.uniform([100, 100], [700, 500])
+            position = rng.uniform([100, 100], [700, 500])
 
         # 🌍 Balanced mass range for DNs
         if mass is None:
-            mass = np.random.uniform(2.0, 8.0)  # Balanced range
+            mass = rng.uniform(2.0, 8.0)  # Balanced range
 
         if velocity is None:
-            velocity = np.random.uniform(-0.5, 0.5, size=2)
+            velocity = rng.uniform(-0.5, 0.5, size=2)
 
         super().__init__(position[0], position[1], mass, velocity)
 
         self.priority = 1 / self.mass
-        self.trail = []
 
-        # ✅ FIX: Initialize the proximity timer for merging behavior
-        self.proximity_timer = 0
+    # 🌀 Trail from oldest to newest, read from the store's ring buffer
+    @property
+    def trail(self):
+        return self._store.trail_points(self._index)
+
+    @property
+    def priority(self):
+        return float(self._store.priority[self._index])
+
+    @priority.setter
+    def priority(self, value):
+        self._store.priority[self._index] = value
+
+    # ✅ FIX: Proximity timer for merging behavior lives in the store as well
+    @property
+    def proximity_timer(self):
+        return int(self._store.proximity_timer[self._index])
+
+    @proximity_timer.setter
+    def proximity_timer(self, value):
+        self._store.proximity_timer[self._index] = value
 
 class PrimaryMassNode(Node):
-    def __init__(self, x=None, y=None, mass=None, position=None, velocity=None):
+    KIND = KIND_PMN
+
+    def __init__(self, x=None, y=None, mass=None, position=None, velocity=None, rng=None):
+        rng = resolve_rng(rng)
         if position is not None:
             x, y = position
         elif x is None or y is None:
-            x, y = np.random.uniform(100, 700), np.random.uniform(100, 500)
+            x, y = rng.uniform([100, 100], [700, 500])
 
         # 🌌 Heavier but balanced PMNs
         if mass is None:
-            mass = np.random.uniform(20.0, 40.0)
+            mass = rng.uniform(20.0, 40.0)
 
         if velocity is None:
             velocity = np.zeros(2)
@@ -0,0 +1,257 @@
+# core/node_store.py
+
+import numpy as np
+
+# Node kinds stored in NodeStore.kind
+KIND_DN = 0
+KIND_PMN = 1
+KIND_NODE = 2
+KIND_DEAD = -1  # 🪦 Tombstone: removed this step, dropped by the next compact()
+
+# Default number of past positions kept per DN trail
+TRAIL_LENGTH = 15
+
+
+class NodeStore:
+    # 🧱 Structure-of-arrays storage: every field is one contiguous array, row i is node i
+    FIELDS = {
+        "position": ((2,), np.float64),
+        "velocity": ((2,), np.float64),
+        "mass": ((), np.float64),
+        "kind": ((), np.int8),
+        "priority": ((), np.float64),
+        "proximity_timer": ((), np.int64),
+        "node_id": ((), np.int64),
+    }
+
+    def __init__(self, capacity=64, allocator=None, trail_length=TRAIL_LENGTH):
+        # 🌀 Trails: one (capacity × trail_length × 2) ring buffer with a head index per row
+        self.trail_length = max(1, int(trail_length))
+        self.fields = dict(self.FIELDS)
+        self.fields.update({
+            "trail": ((self.trail_length, 2), np.float64),
+            "trail_head": ((), np.int32),  # Slot the next position is written to
+            "trail_count": ((), np.int32),  # Number of valid slots
+        })
+
+        self.count = 0
+        self.capacity = 0
+        self.dead_count = 0
+        self.nodes = []  # Node views, parallel to the rows (None for tombstoned rows)
+        self.allocator = allocator  # allocator(field, shape, dtype) -> zeroed array, e.g. shared memory
+
+        # 🪪 Stable ids: id -> row, a generation per id (bumped on free) and a free-list for reuse
+        self.id_to_row = np.full(max(1, capacity), -1, dtype=np.int64)
+        self.generation = np.zeros(max(1, capacity), dtype=np.int64)
+        self.free_ids = []
+        self.next_id = 0
+
+        self._grow(max(1, capacity))
+
+    def set_allocator(self, allocator):
+        # Move every field into arrays from `allocator` (None means plain NumPy arrays)
+        self.allocator = allocator
+        self._grow(self.capacity)
+
+    def _grow(self, capacity):
+        for name, (shape, dtype) in self.fields.items():
+            if self.allocator is None:
+                array = np.zeros((capacity,) + shape, dtype=dtype)
+            else:
+                array = self.allocator(name, (capacity,) + shape, dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                array[:self.count] = old[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def _reserve(self, needed):
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            self._grow(capacity)
+
+    def _allocate_ids(self, count):
+        # Reuse freed ids first, then hand out fresh ones
+        reused = min(count, len(self.free_ids))
+        ids = np.empty(count, dtype=np.int64)
+        if reused:
+            ids[:reused] = self.free_ids[-reused:]
+            del self.free_ids[-reused:]
+        ids[reused:] = np.arange(self.next_id, self.next_id + count - reused)
+        self.next_id += count - reused
+
+        if self.next_id > len(self.id_to_row):
+            size = len(self.id_to_row)
+            while size < self.next_id:
+                size *= 2
+            extra = size - len(self.id_to_row)
+            self.id_to_row = np.concatenate((self.id_to_row, np.full(extra, -1, dtype=np.int64)))
+            self.generation = np.concatenate((self.generation, np.zeros(extra, dtype=np.int64)))
+        return ids
+
+    def add_row(self, kind, position, velocity, mass, priority=0.0, proximity_timer=0):
+        self._reserve(self.count + 1)
+
+        row = self.count
+        self.position[row] = position
+        self.velocity[row] = velocity
+        self.mass[row] = mass
+        self.kind[row] = kind
+        self.priority[row] = priority
+        self.proximity_timer[row] = proximity_timer
+        self.trail_head[row] = 0
+        self.trail_count[row] = 0
+        self.node_id[row] = self._allocate_ids(1)[0]
+        self.id_to_row[self.node_id[row]] = row
+        self.nodes.append(None)
+        self.count += 1
+        return row
+
+    def add_rows(self, kind, positions, velocities, masses):
+        # ✅ Bulk insert without going through per-node constructors
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        count = len(positions)
+        needed = self.count + count
+        self._reserve(needed)
+
+        rows = slice(self.count, needed)
+        self.position[rows] = positions
+        self.velocity[rows] = velocities
+        self.mass[rows] = masses
+        self.kind[rows] = kind
+        self.priority[rows] = 1 / self.mass[rows] if kind == KIND_DN else 0.0
+        self.proximity_timer[rows] = 0
+        self.trail_head[rows] = 0
+        self.trail_count[rows] = 0
+        self.node_id[rows] = self._allocate_ids(count)
+        self.id_to_row[self.node_id[rows]] = np.arange(rows.start, rows.stop)
+        self.nodes.extend([None] * count)
+        self.count = needed
+        return np.arange(rows.start, rows.stop)
+
+    def row_values(self, row):
+        # Everything but the id (assigned by the receiving store) and the trail (starts empty)
+        return {name: np.copy(getattr(self, name)[row]) for name in self.FIELDS if name != "node_id"}
+
+    # --- Trails ------------------------------------------------------------
+
+    def push_trails(self, rows):
+        # ✅ Record the current position of every given row in its ring buffer
+        head = self.trail_head[rows]
+        self.trail[rows, head] = self.position[rows]
+        self.trail_head[rows] = (head + 1) % self.trail_length
+        self.trail_count[rows] = np.minimum(self.trail_count[rows] + 1, self.trail_length)
+
+    def trail_segments(self, row):
+        # Zero-copy (older, newer) views; together they are the trail from oldest to newest
+        ring = self.trail[row]
+        head, count = int(self.trail_head[row]), int(self.trail_count[row])
+        if count < self.trail_length:
+            return ring[:0], ring[:count]
+        return ring[head:], ring[:head]
+
+    def trail_points(self, row):
+        # Trail from oldest to newest as one (count × 2) array (a copy once the ring has wrapped)
+        older, newer = self.trail_segments(row)
+        return np.concatenate((older, newer)) if len(older) else newer
+
+    # --- Ids and tombstones -----------------------------------------------
+
+    def row_of(self, node_id):
+        return int(self.id_to_row[node_id])
+
+    def is_alive(self, node_id, generation):
+        return (
+            0 <= node_id < self.next_id
+            and self.generation[node_id] == generation
+            and self.id_to_row[node_id] >= 0
+            and self.kind[self.id_to_row[node_id]] != KIND_DEAD
+        )
+
+    def kill_rows(self, rows):
+        # 🪦 Mark rows dead for this step; their views are detached with a copy of their state
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[self.kind[rows] != KIND_DEAD]
+        for row in rows:
+            node = self.nodes[row]
+            if node is not None:
+                node._detach()
+                self.nodes[row] = None
+        self.kind[rows] = KIND_DEAD
+        self.dead_count += len(rows)
+
+    def compact(self):
+        # ✅ Drop every tombstoned row in one pass; returns old row -> new row (-1 if dropped)
+        count = self.count
+        if self.dead_count == 0:
+            return np.arange(count)
+
+        keep = self.kind[:count] != KIND_DEAD
+        kept = int(keep.sum())
+        old_to_new = np.full(count, -1, dtype=np.int64)
+        old_to_new[keep] = np.arange(kept)
+
+        dead_ids = self.node_id[:count][~keep]
+        self.generation[dead_ids] += 1
+        self.id_to_row[dead_ids] = -1
+        self.free_ids.extend(dead_ids.tolist())
+
+        for name in self.fields:
+            array = getattr(self, name)
+            array[:kept] = array[:count][keep]
+        self.id_to_row[self.node_id[:kept]] = np.arange(kept)
+
+        self.nodes = [node for node, alive in zip(self.nodes, keep) if alive]
+        self.count = kept
+        self.dead_count = 0
+        return old_to_new
+
+    # --- List-like interface over the node views ---------------------------
+
+    def view(self, row):
+        return self.nodes[row]
+
+    def extend_views(self, cls, rows):
+        views = [cls._view(self, row) for row in rows]
+        for row, node in zip(rows, views):
+            self.nodes[row] = node
+        return views
+
+    def append(self, node):
+        node._attach(self)
+        self.nodes[node._index] = node
+
+    def extend(self, nodes):
+        for node in nodes:
+            self.append(node)
+
+    def remove(self, node):
+        if node._store is not self:
+            raise ValueError("node is not in this store")
+        self.kill_rows([node._index])
+
+    def __iter__(self):
+        # Tombstoned rows are skipped, so removing while iterating never skips a live node
+        return (node for node in self.nodes if node is not None)
+
+    def __len__(self):
+        return self.count - self.dead_count
+
+    def __getitem__(self, item):
+        # Integer items are rows; slices give the live nodes in that row range
+        if isinstance(item, slice):
+            return [node for node in self.nodes[item] if node is not None]
+        return self.view(item)
+
+    def __contains__(self, node):
+        return getattr(node, "_store", None) is self and self.is_alive(node.node_id, node.generation)
+
+    # --- Row masks ---------------------------------------------------------
+
+    def rows_of_kind(self, kind):
+        return np.flatnonzero(self.kind[:self.count] == kind)
+
+    def alive_rows(self):
+        return np.flatnonzero(self.kind[:self.count] != KIND_DEAD)
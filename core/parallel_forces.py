@@ -0,0 +1,239 @@
+# core/parallel_forces.py
+#
+# Multi-core force evaluation: node arrays live in shared memory, a persistent
+# worker pool updates DN velocities chunk by chunk.
+#
+#   python -m core.parallel_forces --dns 100000 --workers 1 2 4 8
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import weakref
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.force_calculator import update_dn_velocities
+from core.node_store import NodeStore, KIND_DN, KIND_PMN
+
+# Below this many DNs the pool round-trip costs more than it saves
+DEFAULT_MIN_DNS = 20000
+
+# Per-row noise scratch: [tangent_nudge, perturbation_x, perturbation_y]
+NOISE_SHAPE = (3,)
+
+TIMING_HISTORY = 1000  # Most recent force passes kept in ParallelForceBackend.timings
+
+
+class SharedArrayAllocator:
+    # 🧠 Hands out zeroed arrays backed by named shared-memory segments, one per field
+    def __init__(self):
+        self.segments = {}
+        self._arrays = {}  # field -> weakref to the array handed out for its current segment
+        self._retired = []  # (segment, array weakref): unlinked, mapped until close_retired() sees the array gone
+
+    def __call__(self, field, shape, dtype):
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        segment = shared_memory.SharedMemory(create=True, size=size)
+        array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        array[...] = 0
+
+        previous = self.segments.pop(field, None)
+        if previous is not None:
+            self._retire(previous, self._arrays.pop(field))
+        self.segments[field] = segment
+        self._arrays[field] = weakref.ref(array)
+        return array
+
+    def names(self):
+        return {field: segment.name for field, segment in self.segments.items()}
+
+    def _retire(self, segment, array):
+        # The name goes now (workers only attach current names); the mapping stays while the old
+        # array may still be read, e.g. by NodeStore._grow copying it into the replacement
+        segment.unlink()
+        self._retired.append((segment, array))
+
+    def close_retired(self):
+        # ⚠️ close() unmaps even under a live NumPy view (no BufferError, a segfault on the next
+        # access), so only close segments whose array, and every view of it, is gone
+        still_viewed = []
+        for segment, array in self._retired:
+            if array() is None:
+                segment.close()
+            else:
+                still_viewed.append((segment, array))
+        self._retired = still_viewed
+
+    def close(self):
+        for field, segment in self.segments.items():
+            self._retire(segment, self._arrays[field])
+        self.segments = {}
+        self._arrays = {}
+        self.close_retired()
+
+
+# --- Worker side -------------------------------------------------------------
+
+_attached = {}
+
+
+def _shared_array(name, shape, dtype):
+    segment = _attached.get(name)
+    if segment is None:
+        segment = shared_memory.SharedMemory(name=name)
+        _attached[name] = segment
+    return np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+
+def _forget_stale(names):
+    # Drop attachments to segments the store has since replaced
+    for name in list(_attached):
+        if name not in names:
+            _attached.pop(name).close()
+
+
+def _force_chunk(task):
+    names, capacity, count, lo, hi, params = task
+    started = time.perf_counter()
+    _forget_stale(set(names.values()))
+
+    fields = {
+        field: _shared_array(names[field], (capacity,) + shape, dtype)
+        for field, (shape, dtype) in NodeStore.FIELDS.items()
+    }
+    noise = _shared_array(names["noise"], (capacity,) + NOISE_SHAPE, np.float64)
+
+    kind = fields["kind"]
+    dn_rows = lo + np.flatnonzero(kind[lo:hi] == KIND_DN)
+    pmn_rows = np.flatnonzero(kind[:count] == KIND_PMN)
+    if len(dn_rows):
+        update_dn_velocities(
+            fields["position"], fields["velocity"], fields["mass"], dn_rows,
+            fields["position"][pmn_rows], fields["mass"][pmn_rows],
+            noise[dn_rows, 0], noise[dn_rows, 1:], **params,
+        )
+
+    del fields, noise, kind
+    return time.perf_counter() - started
+
+
+# --- Main process side ------------------------------------------------------
+
+class ParallelForceBackend:
+    def __init__(self, workers=None, min_dns=DEFAULT_MIN_DNS, chunks_per_worker=1):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_dns = min_dns
+        self.chunks_per_worker = chunks_per_worker
+        self.allocator = SharedArrayAllocator()
+        self.noise = None
+        self.timings = deque(maxlen=TIMING_HISTORY)  # Recent steps' {"dns", "workers", "seconds", "worker_seconds"}
+        self._pool = None
+
+    def attach(self, nodes):
+        # 🧠 Move the store into shared memory once; later growth stays in shared memory
+        nodes.set_allocator(self.allocator)
+
+    def release(self, nodes):
+        nodes.set_allocator(None)
+        self.close()
+
+    def handles(self, dn_count):
+        return dn_count >= self.min_dns
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            self._pool = context.Pool(self.workers)
+        return self._pool
+
+    def _ensure_noise(self, capacity):
+        if self.noise is None or len(self.noise) != capacity:
+            self.noise = self.allocator("noise", (capacity,) + NOISE_SHAPE, np.float64)
+        return self.noise
+
+    def apply_forces(self, nodes, dn_rows, tangent_nudge, perturbation, params):
+        started = time.perf_counter()
+        pool = self._ensure_pool()
+
+        # Noise is drawn once in this process, so results do not depend on the chunking
+        noise = self._ensure_noise(nodes.capacity)
+        noise[dn_rows, 0] = tangent_nudge
+        noise[dn_rows, 1:] = perturbation
+
+        # ✅ Split the row range so each chunk holds about the same number of DNs
+        chunks = min(len(dn_rows), self.workers * self.chunks_per_worker)
+        cuts = dn_rows[np.linspace(0, len(dn_rows), chunks + 1).astype(int)[1:-1]]
+        bounds = np.concatenate(([0], cuts, [nodes.count]))
+
+        names = self.allocator.names()
+        tasks = [
+            (names, nodes.capacity, nodes.count, int(lo), int(hi), params)
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+        worker_seconds = pool.map(_force_chunk, tasks)
+        self.allocator.close_retired()  # Every worker has moved on to the current segments
+
+        self.timings.append({
+            "dns": len(dn_rows),
+            "workers": self.workers,
+            "seconds": time.perf_counter() - started,
+            "worker_seconds": max(worker_seconds),
+        })
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self.noise = None
+        self.allocator.close()
+
+
+def scaling_curve(dns, pmns, worker_counts, steps, seed=0):
+    # 📈 Median seconds per force pass for the in-process path and each worker count
+    from core.simulation_controller import SimulationController
+
+    curve = []
+    for workers in [0] + list(worker_counts):
+        controller = SimulationController(num_dns=dns, num_pmns=pmns, seed=seed)
+        calculator = controller.force_calculator
+        if workers:
+            calculator.use_backend(ParallelForceBackend(workers=workers, min_dns=0), controller.nodes)
+
+        calculator.apply_forces(controller.nodes)  # warm-up (starts the pool)
+        samples = []
+        for _ in range(steps):
+            started = time.perf_counter()
+            calculator.apply_forces(controller.nodes)
+            samples.append(time.perf_counter() - started)
+
+        if workers:
+            calculator.use_backend(None, controller.nodes)
+        curve.append({"workers": workers, "seconds": float(np.median(samples))})
+
+    baseline = curve[0]["seconds"]
+    for point in curve:
+        point["speedup"] = baseline / point["seconds"]
+    return curve
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure force-pass scaling across worker counts.")
+    parser.add_argument("--dns", type=int, default=100000)
+    parser.add_argument("--pmns", type=int, default=3)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for point in scaling_curve(args.dns, args.pmns, args.workers, args.steps):
+        label = "in-process" if point["workers"] == 0 else f"{point['workers']} workers"
+        print(f"{label:<12} {point['seconds'] * 1e3:9.2f} ms/step  x{point['speedup']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
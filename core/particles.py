@@ -0,0 +1,61 @@
+# core/particles.py
+
+import numpy as np
+from core.rng import resolve_rng
+from core.events import EVENT_BURST, EVENT_EXPIRY
+
+# Pool size and burst shape
+PARTICLE_CAPACITY = 4096
+BURST_SIZE = 10  # Particles per merge
+PARTICLE_LIFETIME = 15  # Frames before a particle disappears
+
+
+class ParticleEmitter:
+    # 💥 Fixed-capacity particle pool for visual bursts, kept outside the N-body node store
+    def __init__(self, capacity=PARTICLE_CAPACITY, rng=None, events=None):
+        self.capacity = capacity
+        self.rng = resolve_rng(rng)
+        self.events = events  # 📣 Optional EventBus for burst and expiry events
+        self.position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.lifetime = np.zeros(capacity, dtype=np.int64)  # 0 means the slot is free
+        self.cursor = 0
+
+    def emit(self, origins, count=BURST_SIZE, lifetime=PARTICLE_LIFETIME):
+        # ✅ One burst of `count` particles flying outward from every origin
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        total = min(len(origins) * count, self.capacity)
+        if total == 0:
+            return
+
+        angle = self.rng.uniform(0, 2 * np.pi, size=total)
+        speed = self.rng.uniform(0.5, 2.0, size=total)
+
+        # Slots are handed out round-robin, so a full pool recycles its oldest particles first
+        slots = (self.cursor + np.arange(total)) % self.capacity
+        self.cursor = int((self.cursor + total) % self.capacity)
+
+        self.position[slots] = np.repeat(origins, count, axis=0)[:total]
+        self.velocity[slots, 0] = np.cos(angle) * speed
+        self.velocity[slots, 1] = np.sin(angle) * speed
+        self.lifetime[slots] = lifetime
+
+        if self.events is not None:
+            first = slots[::count]
+            self.events.emit(EVENT_BURST, first, np.minimum(count, total - np.arange(len(first)) * count))
+
+    def step(self):
+        # Ballistic update for every live particle at once
+        alive = self.lifetime > 0
+        self.position[alive] += self.velocity[alive]
+        self.lifetime[alive] -= 1
+        if self.events is not None:
+            self.events.emit(EVENT_EXPIRY, np.flatnonzero(alive & (self.lifetime == 0)))
+
+    def active(self):
+        # Positions and remaining lifetimes of the live particles
+        alive = self.lifetime > 0
+        return self.position[alive], self.lifetime[alive]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.lifetime))
@@ -0,0 +1,96 @@
+# core/profiler.py
+
+import json
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+DEFAULT_WINDOW = 240  # Samples kept per phase for the rolling percentiles
+
+_DISABLED = nullcontext()
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.started)
+
+
+class PhaseProfiler:
+    # ⏱️ Rolling per-phase timings (p50 / p95 / max), counters and a rate, in fixed-size ring buffers.
+    # Disabled, phase() hands back one shared no-op context, so the hot path pays a single call.
+    def __init__(self, window=DEFAULT_WINDOW, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        self.samples = {}  # phase -> [ring buffer, samples written]
+        self.pending = {}  # phase -> seconds accumulated since the last tick
+        self.counters = {}  # e.g. node counts for the latest step
+        self._ticks = np.zeros(window)
+        self._tick_count = 0
+
+    def phase(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return _Timer(self, name)
+
+    def add(self, name, seconds):
+        # A phase may run several times per step; its sample is the total at the next tick
+        self.pending[name] = self.pending.get(name, 0.0) + seconds
+
+    def tick(self, **counters):
+        # One completed step (or frame): commits one sample per phase, feeds the rate, replaces the counters
+        if not self.enabled:
+            return
+        pending, self.pending = self.pending, {}
+        for name, seconds in pending.items():
+            entry = self.samples.get(name)
+            if entry is None:
+                entry = self.samples[name] = [np.zeros(self.window), 0]
+            entry[0][entry[1] % self.window] = seconds
+            entry[1] += 1
+
+        self._ticks[self._tick_count % self.window] = time.perf_counter()
+        self._tick_count += 1
+        self.counters.update(counters)
+
+    def rate(self):
+        # Ticks per second over the window
+        filled = min(self._tick_count, self.window)
+        if filled < 2:
+            return 0.0
+        newest = self._ticks[(self._tick_count - 1) % self.window]
+        oldest = self._ticks[(self._tick_count - filled) % self.window]
+        return (filled - 1) / (newest - oldest) if newest > oldest else 0.0
+
+    def reset(self):
+        # Fresh dicts, never cleared in place: a report() on another thread may still be reading the old ones
+        self.samples = {}
+        self.pending = {}
+        self.counters = {}
+        self._tick_count = 0
+
+    def report(self):
+        # 📊 Milliseconds per phase over the window, plus the rate and counters
+        phases = {}
+        for name, (ring, written) in list(self.samples.items()):
+            values = ring[:min(written, self.window)] * 1000
+            p50, p95 = np.percentile(values, [50, 95])
+            phases[name] = {
+                "p50_ms": round(float(p50), 4),
+                "p95_ms": round(float(p95), 4),
+                "max_ms": round(float(values.max()), 4),
+                "samples": int(written),
+            }
+        return {"rate": round(self.rate(), 3), "counters": dict(self.counters), "phases": phases}
+
+    def write_json_line(self, stream, **extra):
+        stream.write(json.dumps({**extra, **self.report()}) + "\n")
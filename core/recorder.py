@@ -0,0 +1,271 @@
+# core/recorder.py
+#
+# Trajectory files: <path>.frames holds the per-frame records back to back (append-only),
+# <path>.index holds one fixed-size entry per frame so frame i is found in O(1).
+
+import mmap
+import os
+import time
+
+import numpy as np
+
+from core.events import EVENT_DTYPE
+from core.motion_integrator import DEFAULT_DT
+from core.simulation_worker import DEFAULT_STEP_RATE
+from core.snapshot import Snapshot
+
+MAGIC = b"GRVTRAJ3"
+
+# Index file header: the run's world size, so replays and renders need not be told it
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("world", "<f8", (2,))])
+HEADER_BYTES = HEADER_DTYPE.itemsize
+
+# One index entry per recorded frame; `time` is the simulated time after the frame's step
+INDEX_DTYPE = np.dtype([
+    ("frame", "<i8"), ("offset", "<i8"), ("nodes", "<i8"), ("merges", "<i8"), ("time", "<f8"), ("events", "<i8"),
+])
+
+# Recorded time played per wall-clock second at speed 1: the pace of the live simulation
+PLAYBACK_TIME_RATE = DEFAULT_STEP_RATE * DEFAULT_DT
+
+# 💥 Merge events: which DN was absorbed by which PMN, and the PMN mass afterwards
+MERGE_DTYPE = np.dtype([("dn_id", "<i8"), ("pmn_id", "<i8"), ("pmn_mass", "<f8")])
+
+DEFAULT_CHUNK_FRAMES = 64  # Frames buffered in memory before one write to disk
+
+
+def _padded(size):
+    return -(-size // 8) * 8
+
+
+def frame_layout(nodes, merges, events=0):
+    # Byte offset of every section of a frame record, all 8-byte aligned
+    layout = {}
+    offset = 0
+    for name, size in (
+        ("position", nodes * 16),
+        ("velocity", nodes * 16),
+        ("mass", nodes * 8),
+        ("node_id", nodes * 8),
+        ("kind", nodes),
+        ("merges", merges * MERGE_DTYPE.itemsize),
+        ("events", events * EVENT_DTYPE.itemsize),
+    ):
+        layout[name] = offset
+        offset += _padded(size)
+    return layout, offset
+
+
+class TrajectoryRecorder:
+    # 🎞️ Streams every completed step to disk; memory use is bounded by one chunk.
+    # Subscribed to the controller's EventBus (SimulationController.use_recorder), it also
+    # stores every step's events with the frame
+    def __init__(self, path, chunk_frames=DEFAULT_CHUNK_FRAMES):
+        self.path = path
+        self.chunk_frames = max(1, int(chunk_frames))
+        self._data = open(path + ".frames", "wb")
+        self._index = open(path + ".index", "wb")  # Header written with the first frame
+        self._offset = 0
+        self._pending = []
+        self._entries = []
+        self._events = []  # Event batches delivered since the last recorded frame
+        self.frames = 0
+
+    def __call__(self, records, bus):
+        # 📣 EventBus subscriber: hold the step's events until its frame is recorded
+        if len(records):
+            self._events.append(records)
+
+    def record(self, controller, merges=()):
+        # Live rows only: call after the step's compaction (and its events' publish)
+        nodes = controller.nodes
+        count = nodes.count
+        merges = np.asarray(merges, dtype=MERGE_DTYPE).reshape(-1)
+        events = np.concatenate(self._events) if self._events else np.zeros(0, dtype=EVENT_DTYPE)
+        self._events.clear()
+        if self.frames == 0:
+            header = np.zeros((), dtype=HEADER_DTYPE)
+            header["magic"] = MAGIC
+            header["world"] = controller.world_size
+            self._index.write(header.tobytes())
+        layout, size = frame_layout(count, len(merges), len(events))
+
+        record = bytearray(size)
+        for name, values in (
+            ("position", nodes.position[:count]),
+            ("velocity", nodes.velocity[:count]),
+            ("mass", nodes.mass[:count]),
+            ("node_id", nodes.node_id[:count]),
+            ("kind", nodes.kind[:count]),
+            ("merges", merges),
+            ("events", events),
+        ):
+            raw = np.ascontiguousarray(values).tobytes()
+            record[layout[name]:layout[name] + len(raw)] = raw
+
+        self._pending.append(bytes(record))
+        self._entries.append((controller.frame, self._offset, count, len(merges), controller.time, len(events)))
+        self._offset += size
+        self.frames += 1
+        if len(self._pending) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        # ✅ Data first, then the index, so an index entry never points past the data
+        if not self._pending:
+            return
+        self._data.write(b"".join(self._pending))
+        self._data.flush()
+        self._index.write(np.array(self._entries, dtype=INDEX_DTYPE).tobytes())
+        self._index.flush()
+        self._pending.clear()
+        self._entries.clear()
+
+    def close(self):
+        if self._data.closed:
+            return
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryFrame:
+    # Zero-copy, read-only views of one recorded frame
+    def __init__(self, entry, buffer):
+        self.frame = int(entry["frame"])
+        self.time = float(entry["time"])
+        count, merges, events = int(entry["nodes"]), int(entry["merges"]), int(entry["events"])
+        layout, _ = frame_layout(count, merges, events)
+        base = int(entry["offset"])
+
+        def section(name, dtype, length, shape=None):
+            array = np.frombuffer(buffer, dtype=dtype, count=length, offset=base + layout[name])
+            return array if shape is None else array.reshape(shape)
+
+        self.position = section("position", "<f8", count * 2, (count, 2))
+        self.velocity = section("velocity", "<f8", count * 2, (count, 2))
+        self.mass = section("mass", "<f8", count)
+        self.node_id = section("node_id", "<i8", count)
+        self.kind = section("kind", np.int8, count)
+        self.merges = section("merges", MERGE_DTYPE, merges)
+        self.events = section("events", EVENT_DTYPE, events)  # EventBus records of this frame's step
+
+
+class TrajectoryReader:
+    # 📼 Memory-maps a trajectory: frames are paged in on demand, so RAM stays bounded
+    def __init__(self, path):
+        self.path = path
+        self._data_file = open(path + ".frames", "rb")
+        self._index_file = open(path + ".index", "rb")
+        header = np.frombuffer(self._index_file.read(HEADER_BYTES), dtype=HEADER_DTYPE)
+        if len(header) == 0 or header[0]["magic"] != MAGIC:
+            raise ValueError(f"{path}.index is not a trajectory index (or was written by an older version)")
+        self.world_size = tuple(float(v) for v in header[0]["world"])
+        self._data = None
+        self._index_map = None
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self.refresh()
+
+    def refresh(self):
+        # Re-map to pick up frames appended since the last call (e.g. a run still recording)
+        self.close_maps()
+        index_size = os.fstat(self._index_file.fileno()).st_size - HEADER_BYTES
+        entries = max(0, index_size) // INDEX_DTYPE.itemsize
+        if entries == 0:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+            return self
+
+        self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = np.frombuffer(self._index_map, dtype=INDEX_DTYPE, count=entries, offset=HEADER_BYTES)
+        self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        # ⏩ O(1) seek: the index entry gives the record's offset and sizes directly
+        if i < 0:
+            i += len(self.index)
+        if not 0 <= i < len(self.index):
+            raise IndexError(i)
+        return TrajectoryFrame(self.index[i], self._data)
+
+    def merges(self, start=0, stop=None):
+        # All merge events in frames [start, stop), tagged with their frame number
+        events = []
+        for i in np.flatnonzero(self.index["merges"][start:stop]) + start:
+            frame = self[int(i)]
+            events.extend((frame.frame, event) for event in frame.merges)
+        return events
+
+    def events(self, start=0, stop=None, kinds=None):
+        # Every recorded EventBus record in frames [start, stop), oldest first (only `kinds`, if given)
+        batches = [self[int(i)].events for i in np.flatnonzero(self.index["events"][start:stop]) + start]
+        records = np.concatenate(batches) if batches else np.zeros(0, dtype=EVENT_DTYPE)
+        return records if kinds is None else records[np.isin(records["kind"], kinds)]
+
+    def close_maps(self):
+        # Views into the old maps must be gone before they can close
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        for mapped in (self._index_map, self._data):
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass  # Still referenced by a frame someone holds; the GC unmaps it later
+        self._index_map = None
+        self._data = None
+
+    def close(self):
+        self.close_maps()
+        self._data_file.close()
+        self._index_file.close()
+
+
+class TrajectoryPlayer:
+    # ⏯️ Replay cursor over a TrajectoryReader; latest() makes it a drop-in snapshot source for the view.
+    # Playback follows the recorded times against the wall clock, so its speed does not depend on
+    # how often tick() is called
+    def __init__(self, reader, speed=1.0, time_rate=PLAYBACK_TIME_RATE, clock=time.monotonic):
+        self.reader = reader
+        self.speed = speed  # Multiple of real time
+        self.time_rate = time_rate  # Recorded time per wall-clock second at speed 1
+        self.clock = clock
+        self.position = 0
+        self.time = float(reader.index["time"][0]) if len(reader) else 0.0  # Recorded time being shown
+        self.playing = True
+        self._last_tick = None
+        self._cached = None
+
+    def __len__(self):
+        return len(self.reader)
+
+    def seek(self, position):
+        self.position = int(min(max(position, 0), max(len(self.reader) - 1, 0)))
+        if len(self.reader):
+            self.time = float(self.reader.index["time"][self.position])
+
+    def tick(self):
+        # ⏩ Advance by the wall time since the last tick: the last frame recorded at or before the cursor
+        now = self.clock()
+        elapsed = 0.0 if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+        if not self.playing or not len(self.reader):
+            return
+        times = self.reader.index["time"]
+        self.time = min(self.time + elapsed * self.speed * self.time_rate, float(times[-1]))
+        self.position = int(max(np.searchsorted(times, self.time, side="right") - 1, 0))
+
+    def latest(self):
+        if not len(self.reader):
+            return None
+        if self._cached is None or self._cached[0] != self.position:
+            self._cached = (self.position, Snapshot.from_frame(self.reader[self.position]))
+        return self._cached[1]
@@ -0,0 +1,22 @@
+# core/rng.py
+
+import numpy as np
+
+_shared = None
+
+
+def make_rng(seed=None):
+    # 🎲 One Generator per simulation; a Generator passes through, anything else seeds a new one
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def resolve_rng(rng=None):
+    # Fallback for components built without a simulation: one shared, unseeded Generator
+    global _shared
+    if rng is not None:
+        return rng
+    if _shared is None:
+        _shared = np.random.default_rng()
+    return _shared
@@ -0,0 +1,307 @@
+# core/shared_state.py
+#
+# Live state for other local processes: every completed step is copied into named shared
+# memory behind a seqlock, so any number of readers can map it and read consistent frames.
+#
+#   python -m core.headless --steps 100000 --dns 5000 --publish gravitas
+#   python -m core.shared_state gravitas --interval 1
+
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from core.nearest_pmn import nearest_points
+from core.node_store import KIND_DN, KIND_PMN
+
+MAGIC = b"GRVSTAT1"
+
+# Fixed header segment <name>: the seqlock and where the data lives. `sequence` is odd while a
+# step is being written; the node arrays sit in <name>-g<generation>, replaced when they outgrow it
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"), ("sequence", "<u8"), ("frame", "<i8"), ("count", "<i8"), ("capacity", "<i8"),
+    ("generation", "<i8"), ("closed", "<i8"), ("time", "<f8"), ("world", "<f8", (2,)),
+])
+HEADER_BYTES = 128
+
+# Published per node row: (field, trailing shape, dtype)
+FIELDS = (
+    ("position", (2,), "<f8"),
+    ("velocity", (2,), "<f8"),
+    ("mass", (), "<f8"),
+    ("node_id", (), "<i8"),
+    ("kind", (), "i1"),
+)
+
+MIN_CAPACITY = 4096  # Rows reserved up front; the data segment doubles when a step needs more
+
+
+def data_name(name, generation):
+    return f"{name}-g{generation}"
+
+
+def data_layout(capacity):
+    # Byte offset of every field in a data segment of `capacity` rows, all 8-byte aligned
+    layout = {}
+    offset = 0
+    for field, shape, dtype in FIELDS:
+        layout[field] = offset
+        offset += -(-capacity * int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+    return layout, max(offset, 8)
+
+
+def data_views(buffer, capacity):
+    layout, _ = data_layout(capacity)
+    return {
+        field: np.ndarray((capacity,) + shape, dtype=dtype, buffer=buffer, offset=layout[field])
+        for field, shape, dtype in FIELDS
+    }
+
+
+def attach(name):
+    # 🔗 Map an existing segment without handing it to this process's resource tracker, which
+    # would otherwise unlink the publisher's memory when the reader exits
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+
+    # Older Pythons register on attach; skip the registration rather than undo it afterwards, since
+    # a reader started from the publisher's process tree shares its tracker and would drop its entry
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class StatePublisher:
+    # 📡 Writer side, fed by SimulationController after every step (one memcpy per field, no pickling)
+    def __init__(self, name=None, capacity=MIN_CAPACITY):
+        self.name = name or f"gravitas-{os.getpid()}"
+        self._header_segment = shared_memory.SharedMemory(name=self.name, create=True, size=HEADER_BYTES)
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self._header_segment.buf)
+        self.header[()] = np.zeros((), dtype=HEADER_DTYPE)
+        self.header["magic"] = MAGIC
+        self.header["generation"] = -1
+        self._data_segment = None
+        self.arrays = None
+        self.initial_capacity = max(1, int(capacity))
+        self.frames = 0
+
+    def _grow(self, count):
+        # Called inside the write section: readers retry until the new generation is complete
+        capacity = max(self.initial_capacity, int(self.header["capacity"]) * 2, count)
+        generation = int(self.header["generation"]) + 1
+        segment = shared_memory.SharedMemory(
+            name=data_name(self.name, generation), create=True, size=data_layout(capacity)[1],
+        )
+        self._retire_data()
+        self._data_segment = segment
+        self.arrays = data_views(segment.buf, capacity)
+        self.header["capacity"] = capacity
+        self.header["generation"] = generation
+
+    def _retire_data(self):
+        # Readers still mapping the old generation keep it until they move on; the name goes now
+        if self._data_segment is None:
+            return
+        self.arrays = None
+        self._data_segment.close()
+        self._data_segment.unlink()
+        self._data_segment = None
+
+    def publish(self, controller):
+        nodes = controller.nodes
+        count = nodes.count
+        header = self.header
+
+        # ✍️ Seqlock: odd while writing, even (and bumped) once the step is complete
+        header["sequence"] += 1
+        if self.arrays is None or count > header["capacity"]:
+            self._grow(count)
+        for field, _, _ in FIELDS:
+            self.arrays[field][:count] = getattr(nodes, field)[:count]
+        header["frame"] = controller.frame
+        header["count"] = count
+        header["time"] = controller.time
+        header["world"] = controller.world_size
+        header["sequence"] += 1
+        self.frames += 1
+
+    def close(self):
+        if self._header_segment is None:
+            return
+        self.header["closed"] = 1
+        self._retire_data()
+        self.header = None
+        self._header_segment.close()
+        self._header_segment.unlink()
+        self._header_segment = None
+
+
+class SharedFrame:
+    # One published step: views into shared memory (valid only while `sequence` is current) or copies
+    def __init__(self, sequence, frame, time, world, arrays):
+        self.sequence = sequence
+        self.frame = frame
+        self.time = time
+        self.world = world
+        for field, values in arrays.items():
+            setattr(self, field, values)
+
+
+class StateReader:
+    # 👀 Reader side: map the publisher's segments and read consistent frames
+    def __init__(self, name):
+        self.name = name
+        self._header_segment = attach(name)
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self._header_segment.buf)
+        if self.header["magic"].item() != MAGIC:
+            raise ValueError(f"{name} is not a published simulation state")
+        self._data_segment = None
+        self._generation = None
+        self._arrays = None
+
+    @property
+    def closed(self):
+        return self.header is None or bool(self.header["closed"])
+
+    def _map(self, generation, capacity):
+        if generation == self._generation:
+            return True
+        self._unmap()
+        try:
+            self._data_segment = attach(data_name(self.name, generation))
+        except FileNotFoundError:
+            return False  # Replaced again before we got to it; retry from the header
+        try:
+            self._arrays = data_views(self._data_segment.buf, capacity)
+        except TypeError:
+            self._unmap()  # Header read mid-resize (capacity of another generation); retry
+            return False
+        self._generation = generation
+        return True
+
+    def _unmap(self):
+        self._arrays = None
+        if self._data_segment is not None:
+            try:
+                self._data_segment.close()
+            except BufferError:
+                pass  # A zero-copy frame still views it; unmapped once that frame is gone
+            self._data_segment = None
+            self._generation = None
+
+    def read(self, copy=True, timeout=1.0):
+        # 🔒 Latest complete frame, or None if the publisher has not written one (or closed) in time.
+        # copy=False hands out zero-copy views: use them, then check valid(frame) and retry if not
+        header = self.header
+        deadline = time.monotonic() + timeout
+        while not self.closed:
+            sequence = int(header["sequence"])
+            if sequence and sequence % 2 == 0 and self._map(int(header["generation"]), int(header["capacity"])):
+                count = int(header["count"])
+                arrays = {field: values[:count] for field, values in self._arrays.items()}
+                if copy:
+                    arrays = {field: values.copy() for field, values in arrays.items()}
+                frame = SharedFrame(
+                    sequence, int(header["frame"]), float(header["time"]), tuple(header["world"]), arrays,
+                )
+                if int(header["sequence"]) == sequence:
+                    return frame
+            if time.monotonic() > deadline:
+                return None
+            time.sleep(0)
+        return None
+
+    def valid(self, frame):
+        # True while the publisher has not started overwriting `frame`'s step
+        return not self.closed and int(self.header["sequence"]) == frame.sequence
+
+    def wait(self, after_sequence=0, timeout=1.0, poll=0.001):
+        # Block until a step newer than `after_sequence` is published; returns it (copied) or None
+        deadline = time.monotonic() + timeout
+        while not self.closed and time.monotonic() < deadline:
+            if int(self.header["sequence"]) > after_sequence + 1:
+                return self.read(timeout=max(0.0, deadline - time.monotonic()))
+            time.sleep(poll)
+        return None
+
+    def close(self):
+        self._unmap()
+        self.header = None
+        if self._header_segment is not None:
+            self._header_segment.close()
+            self._header_segment = None
+
+
+# --- Example consumer: per-PMN cluster statistics ---------------------------
+
+def cluster_stats(frame):
+    # 📊 Assign every DN to its nearest PMN and summarise each cluster
+    dn = frame.kind == KIND_DN
+    pmn = np.flatnonzero(frame.kind == KIND_PMN)
+    stats = {"frame": frame.frame, "time": round(frame.time, 6), "dns": int(np.count_nonzero(dn)), "clusters": []}
+    if len(pmn) == 0 or not dn.any():
+        return stats
+
+    nearest, distance = nearest_points(frame.position[dn], frame.position[pmn])
+    mass = frame.mass[dn]
+    speed = np.hypot(frame.velocity[dn, 0], frame.velocity[dn, 1])
+    members = np.bincount(nearest, minlength=len(pmn))
+    member_mass = np.bincount(nearest, weights=mass, minlength=len(pmn))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rms_radius = np.sqrt(np.bincount(nearest, weights=distance ** 2, minlength=len(pmn)) / members)
+        mean_speed = np.bincount(nearest, weights=speed, minlength=len(pmn)) / members
+
+    for i, row in enumerate(pmn):
+        stats["clusters"].append({
+            "pmn_id": int(frame.node_id[row]),
+            "pmn_mass": round(float(frame.mass[row]), 3),
+            "members": int(members[i]),
+            "member_mass": round(float(member_mass[i]), 3),
+            "rms_radius": None if members[i] == 0 else round(float(rms_radius[i]), 3),
+            "mean_speed": None if members[i] == 0 else round(float(mean_speed[i]), 4),
+        })
+    return stats
+
+
+def watch(name, interval=1.0, count=0, stream=sys.stdout):
+    # Zero-copy reads: compute on the shared views, keep the result only if the step was not overwritten
+    reader = StateReader(name)
+    written = 0
+    try:
+        while not reader.closed and (count <= 0 or written < count):
+            frame = reader.read(copy=False)
+            if frame is None:
+                continue
+            stats = cluster_stats(frame)
+            if not reader.valid(frame):
+                continue  # Torn by the next step; read again
+            stream.write(json.dumps(stats) + "\n")
+            stream.flush()
+            written += 1
+            time.sleep(interval)
+    finally:
+        reader.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print per-PMN cluster statistics from a published simulation.")
+    parser.add_argument("name", help="shared-memory name given to --publish")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between reports")
+    parser.add_argument("--count", type=int, default=0, help="stop after this many reports (0 = until closed)")
+    args = parser.parse_args(argv)
+    watch(args.name, args.interval, args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,98 +1,210 @@
 # core/simulation_controller.py
 
-from ui.main_window import MainWindow
 from core.force_calculator import ForceCalculator
-from core.motion_integrator import MotionIntegrator
+from core.motion_integrator import MotionIntegrator, DEFAULT_DT, WORLD_SIZE
 from core.collision_handler import CollisionHandler
+from core.barnes_hut import BarnesHutGravity
+from core.nearest_pmn import NearestPMNIndex
+from core.particles import ParticleEmitter
 from core.node import DynamicNode, PrimaryMassNode
-from PyQt5.QtWidgets import QApplication
+from core.node_store import NodeStore, KIND_DN, KIND_PMN, TRAIL_LENGTH
+from core.rng import make_rng
+from core.profiler import PhaseProfiler
+from core.events import EventBus, EVENT_MERGE
 import numpy as np
 import sys
+import threading
 
 # Constants for merging behavior
 PROXIMITY_THRESHOLD = 20  # Distance in pixels for merging
 MERGE_TIME_THRESHOLD = 50  # Frames required to trigger merging
 
+# Default PMN layout: (x, y, mass) in the default 800x600 world, scaled to other world sizes
+DEFAULT_PMN_LAYOUT = [(200, 150, 50), (600, 150, 50), (400, 450, 50)]
+
+
+def spawn_bounds(world_size):
+    # DNs spawn inside the middle of the world: [100, 100] to [700, 500] for 800x600
+    width, height = world_size
+    return (width / 8, height / 6), (width * 7 / 8, height * 5 / 6)
+
 class SimulationController:
-    def __init__(self):
-        self.force_calculator = ForceCalculator()
-        self.motion_integrator = MotionIntegrator()
-        self.collision_handler = CollisionHandler()
-        self.nodes = []
+    def __init__(self, num_dns=50, num_pmns=len(DEFAULT_PMN_LAYOUT), trail_length=TRAIL_LENGTH, seed=None, rng=None,
+                 integrator="euler", dt=DEFAULT_DT, world_size=WORLD_SIZE):
+        # 🎲 One Generator drives every stochastic part of the run; same seed, same run
+        self.rng = make_rng(seed) if rng is None else rng
+        self.force_calculator = ForceCalculator(rng=self.rng)
+        self.world_size = tuple(world_size)  # 🌍 Width and height of the walled world
+        self.motion_integrator = MotionIntegrator(integrator, dt, self.world_size)  # ⏱️ euler / verlet / adaptive
+        self.events = EventBus()  # 📣 Collisions, merges, bursts and expiries, delivered after every step
+        self.collision_handler = CollisionHandler(rng=self.rng, events=self.events)
+        self.mutual_gravity = BarnesHutGravity(self.force_calculator, theta=0.5)  # Shares G, softening, max_force
+        self.nearest_pmn = NearestPMNIndex()  # 🧭 Per-frame nearest-PMN cache
+        self.particles = ParticleEmitter(rng=self.rng, events=self.events)  # 💥 Visual bursts, outside the N-body pipeline
+        self.nodes = NodeStore(trail_length=trail_length)
         self.enable_dn_collisions = False  # ✅ Default: Collisions are ON
-        self.setup_simulation()
-
-    def setup_simulation(self):
+        self.enable_mutual_gravity = False  # 🌀 Opt-in DN↔DN attraction (Barnes–Hut)
+        self.window = None  # 🖥️ Optional UI, only created by run()
+        self.observers = []  # Callbacks notified after every step
+        self.lock = threading.RLock()  # 🔒 Held around update() and any outside mutation of the nodes
+        self.frame = 0
+        self.time = 0.0  # Simulated time (the sum of every step's dt)
+        self.merge_count = 0
+        self.frame_merges = []  # (dn_id, pmn_id, pmn_mass) for every merge of the current step
+        self.recorder = None  # 🎞️ Optional TrajectoryRecorder, fed after every step (see use_recorder)
+        self.publisher = None  # 📡 Optional StatePublisher (shared memory for other processes), fed after every step
+        self.profiler = PhaseProfiler()  # ⏱️ Per-phase timings, off until someone enables it
+        self.setup_simulation(num_dns, num_pmns)
+
+    def setup_simulation(self, num_dns=50, num_pmns=len(DEFAULT_PMN_LAYOUT)):
         # ✅ Initialize multiple PMNs at different positions
-        self.nodes.append(PrimaryMassNode(200, 150, 50))
-        self.nodes.append(PrimaryMassNode(600, 150, 50))
-        self.nodes.append(PrimaryMassNode(400, 450, 50))
-
-        # ✅ Initialize multiple DNs
-        for _ in range(50):
-            self.nodes.append(DynamicNode())
+        for i in range(num_pmns):
+            width, height = self.world_size
+            if i < len(DEFAULT_PMN_LAYOUT):
+                x, y, mass = DEFAULT_PMN_LAYOUT[i]
+                self.nodes.append(PrimaryMassNode(x * width / WORLD_SIZE[0], y * height / WORLD_SIZE[1], mass))
+            else:
+                position = self.rng.uniform(*spawn_bounds(self.world_size))
+                self.nodes.append(PrimaryMassNode(mass=50, position=position))
+
+        # ✅ Initialize multiple DNs in one batch
+        self.add_dynamic_nodes(num_dns)
+
+    def add_dynamic_nodes(self, count):
+        positions = self.rng.uniform(*spawn_bounds(self.world_size), size=(count, 2))
+        masses = self.rng.uniform(2.0, 8.0, size=count)
+        velocities = self.rng.uniform(-0.5, 0.5, size=(count, 2))
+        rows = self.nodes.add_rows(KIND_DN, positions, velocities, masses)
+        return self.nodes.extend_views(DynamicNode, rows)
+
+    def add_observer(self, callback):
+        self.observers.append(callback)
+
+    def remove_observer(self, callback):
+        self.observers.remove(callback)
+
+    def use_recorder(self, recorder):
+        # 🎞️ Record every step from now on, events included; None stops recording
+        if self.recorder is not None:
+            self.events.unsubscribe(self.recorder)
+        self.recorder = recorder
+        if recorder is not None:
+            self.events.subscribe(recorder)
 
     def update(self):
-        # ✅ Apply forces and update positions
-        self.force_calculator.apply_forces(self.nodes)
-        # ✅ Check for PMN collisions
-        self.force_calculator.resolve_pmn_collisions(self.nodes)
-        # ✅ Apply DN collisions only if enabled
-        if self.enable_dn_collisions:
-            self.force_calculator.resolve_dn_collisions(self.nodes)
-            
-        self.motion_integrator.update_positions(self.nodes)
+        profiler = self.profiler
+        with profiler.phase("step"):
+            self._step(profiler)
+        with profiler.phase("events"):
+            self.events.publish()
+
+        # The recorder is an event subscriber: the step's events reached it in the publish above
+        if self.recorder is not None:
+            with profiler.phase("record"):
+                self.recorder.record(self, self.frame_merges)
+
+        if profiler.enabled:
+            kind = self.nodes.kind[:self.nodes.count]
+            profiler.tick(
+                dns=int(np.count_nonzero(kind == KIND_DN)),
+                pmns=int(np.count_nonzero(kind == KIND_PMN)),
+                particles=len(self.particles),
+                substeps=self.motion_integrator.last_substeps,
+                **self.events.counts(),
+            )
+
+        # ✅ Notify observers (called on whichever thread steps the simulation)
+        for callback in self.observers:
+            callback()
+
+    def _step(self, profiler):
+        self.frame_merges = []
+        self.events.begin_frame(self.frame + 1)  # Events carry the frame this step produces, as recorded
+
+        # ✅ Apply forces, resolve collisions and update positions (the integrator's scheme decides the order)
+        self.time += self.motion_integrator.step(self)
+        with profiler.phase("particles"):
+            self.particles.step()
+
+        # 🧭 Nearest PMN for every DN, shared by the merge check and the renderer
+        with profiler.phase("nearest_pmn"):
+            self.nearest_pmn.update(self.nodes, self.frame)
 
         # ✅ Check for merging behavior
-        self.check_proximity_and_merge()
+        with profiler.phase("merge"):
+            self.check_proximity_and_merge()
+
+        # 🪦 Drop this step's removals in one pass and keep the nearest-PMN cache in step
+        if self.nodes.dead_count:
+            with profiler.phase("compact"):
+                self.nearest_pmn.remap(self.nodes.compact())
+
+        self.frame += 1
 
-        # ✅ Refresh the UI
-        if self.window and hasattr(self.window, 'simulation_view'):
-            self.window.simulation_view.update()
+        if self.publisher is not None:
+            with profiler.phase("publish"):
+                self.publisher.publish(self)
 
     def check_proximity_and_merge(self):
-        for node in self.nodes[:]:
-            if isinstance(node, DynamicNode):
-                closest_pmn = self.find_closest_pmn(node)
-                if closest_pmn:
-                    distance = np.linalg.norm(closest_pmn.position - node.position)
-
-                    if distance < PROXIMITY_THRESHOLD:
-                        node.proximity_timer += 1
-
-                        if node.proximity_timer >= MERGE_TIME_THRESHOLD:
-                            # 💥 Trigger particle burst on absorption
-                            self.trigger_particle_burst(closest_pmn.position)
-
-                            # 💥 Merge: Add DN mass to PMN
-                            closest_pmn.mass += node.mass
-                            self.nodes.remove(node)
-                            print(f"[Merge] DN merged into PMN. PMN mass: {closest_pmn.mass}")
-                    else:
-                        node.proximity_timer = 0
-
-    def trigger_particle_burst(self, position):
-        # 💥 Simple burst: Spawn small particles flying outward
-        for _ in range(10):
-            angle = np.random.uniform(0, 2 * np.pi)
-            speed = np.random.uniform(0.5, 2.0)
-            velocity = np.array([np.cos(angle), np.sin(angle)]) * speed
-
-            # Create a small, fast-moving node as a particle effect
-            burst_particle = DynamicNode(mass=0.1, position=position, velocity=velocity)
-            burst_particle.lifetime = 15  # Particles disappear after a short time
-            self.nodes.append(burst_particle)
+        # 🧭 One nearest-PMN pass per frame, reused by the renderer afterwards
+        if self.nearest_pmn.frame != self.frame:
+            self.nearest_pmn.update(self.nodes, self.frame)
+
+        index = self.nearest_pmn
+        has_pmn = index.pmn_rows >= 0
+        close = has_pmn & (index.distance < PROXIMITY_THRESHOLD)
+
+        timer = self.nodes.proximity_timer
+        timer[index.dn_rows[close]] += 1
+        timer[index.dn_rows[has_pmn & ~close]] = 0
+
+        merging = close & (timer[index.dn_rows] >= MERGE_TIME_THRESHOLD) & (self.nodes.kind[index.dn_rows] == KIND_DN)
+        if not merging.any():
+            return
+
+        # 💥 Trigger particle bursts on absorption
+        self.trigger_particle_burst(self.nodes.position[index.pmn_rows[merging]])
+
+        dn_rows, pmn_rows = index.dn_rows[merging], index.pmn_rows[merging]
+        dn_ids, pmn_ids = self.nodes.node_id[dn_rows], self.nodes.node_id[pmn_rows]
+        dn_masses = self.nodes.mass[dn_rows]
+        pmn_masses = []
+        for dn_row, pmn_row in zip(dn_rows, pmn_rows):
+            # 💥 Merge: Add DN mass to PMN, in row order so a PMN absorbing several DNs reports each new mass
+            self.nodes.mass[pmn_row] += self.nodes.mass[dn_row]
+            pmn_masses.append(self.nodes.mass[pmn_row])
+            self.frame_merges.append((self.nodes.node_id[dn_row], self.nodes.node_id[pmn_row], self.nodes.mass[pmn_row]))
+        # 🪦 The merged DN rows are tombstoned together, compacted at the end of the step
+        self.nodes.kill_rows(dn_rows)
+        self.merge_count += len(dn_rows)
+        self.events.emit(EVENT_MERGE, dn_ids, pmn_ids, dn_masses, pmn_masses)
+
+    def trigger_particle_burst(self, positions):
+        # 💥 Simple burst: small particles flying outward from each position (pooled, never N-body nodes)
+        self.particles.emit(positions)
 
     def find_closest_pmn(self, dynamic_node):
-        # ✅ Find the closest PMN to a given DN
-        pmns = [n for n in self.nodes if isinstance(n, PrimaryMassNode)]
-        if not pmns:
+        # ✅ Find the closest PMN to a given DN (from the per-frame cache when it has the node)
+        if dynamic_node._store is not self.nodes:
             return None
+        pmn_row, _ = self.nearest_pmn.lookup(dynamic_node._index)
+        if pmn_row is None:
+            pmn_row, _ = NearestPMNIndex().update(self.nodes).lookup(dynamic_node._index)
+        return None if pmn_row is None else self.nodes[pmn_row]
 
-        return min(pmns, key=lambda pmn: np.linalg.norm(pmn.position - dynamic_node.position))
+    def run(self, player=None, max_filaments=None):
+        # 🖥️ Qt is only imported when a window is actually wanted
+        from PyQt5.QtWidgets import QApplication
+        from ui.main_window import MainWindow
 
-    def run(self):
         app = QApplication(sys.argv)
-        self.window = MainWindow(self)
+        # The window steps us on its own worker thread and repaints from snapshots
+        # (or, with a TrajectoryPlayer, only replays recorded frames)
+        self.window = MainWindow(self, player=player, max_filaments=max_filaments)
         self.window.show()
-        sys.exit(app.exec_())
+        code = app.exec_()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.publisher is not None:
+            self.publisher.close()
+        sys.exit(code)
@@ -0,0 +1,53 @@
+# core/simulation_worker.py
+
+import threading
+import time
+from collections import deque
+
+from core.snapshot import Snapshot, SnapshotBuffer
+
+DEFAULT_STEP_RATE = 20  # Steps per second (the old 50 ms UI timer)
+
+
+class SimulationWorker(threading.Thread):
+    # 🧵 Steps the controller at its own fixed rate, off the GUI thread, and publishes snapshots
+    def __init__(self, controller, step_rate=DEFAULT_STEP_RATE, substeps=1, buffer=None):
+        super().__init__(name="simulation-worker", daemon=True)
+        self.controller = controller
+        self.step_rate = step_rate  # 0 or None runs as fast as possible
+        self.substeps = max(1, int(substeps))  # Physics steps per published snapshot
+        self.buffer = buffer if buffer is not None else SnapshotBuffer()
+        self._stop_event = threading.Event()
+        self._step_times = deque(maxlen=120)
+
+    def run(self):
+        next_tick = time.perf_counter()
+        while not self._stop_event.is_set():
+            with self.controller.lock:
+                for _ in range(self.substeps):
+                    self.controller.update()
+                snapshot = Snapshot.capture(self.controller)
+            self.buffer.publish(snapshot)
+            self._step_times.append(time.perf_counter())
+
+            # ⏱️ Fixed rate: sleep until the next tick, or carry on at once if we are behind
+            if self.step_rate:
+                next_tick += self.substeps / self.step_rate
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+                else:
+                    next_tick = time.perf_counter()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    @property
+    def steps_per_sec(self):
+        # Simulation throughput over the recent window
+        if len(self._step_times) < 2:
+            return 0.0
+        elapsed = self._step_times[-1] - self._step_times[0]
+        return (len(self._step_times) - 1) * self.substeps / elapsed if elapsed > 0 else 0.0
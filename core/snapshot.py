@@ -0,0 +1,108 @@
+# core/snapshot.py
+
+import threading
+import time
+
+import numpy as np
+
+from core.nearest_pmn import nearest_points
+from core.spatial_hash import SpatialHash
+from core.node_store import KIND_DN, KIND_PMN
+
+
+def _frozen(array):
+    array.setflags(write=False)
+    return array
+
+
+class Snapshot:
+    # 📸 Immutable copy of everything the renderer needs from one completed step
+    def __init__(self, frame, positions, kinds, masses, node_ids,
+                 nearest_dn, nearest_pmn, nearest_distance, particles):
+        self.frame = frame
+        self.timestamp = time.perf_counter()
+        self.positions = _frozen(positions)
+        self.kinds = _frozen(kinds)
+        self.masses = _frozen(masses)
+        self.node_ids = _frozen(node_ids)
+
+        # Nearest PMN per DN, as row indices into the arrays above
+        self.nearest_dn = _frozen(nearest_dn)
+        self.nearest_pmn = _frozen(nearest_pmn)
+        self.nearest_distance = _frozen(nearest_distance)
+
+        self.particles = _frozen(particles)
+        self._spatial_index = None  # Built on the first visible_rows() call
+
+    def visible_rows(self, lo, hi):
+        # 🔍 Rows with finite positions inside the world box [lo, hi], via a spatial hash built once per snapshot
+        if self._spatial_index is None:
+            finite = np.flatnonzero(np.isfinite(self.positions).all(axis=1))
+            points = self.positions[finite]
+            extent = np.ptp(points, axis=0).max() if len(points) else 1.0
+            cell_size = max(2 * extent / np.sqrt(max(len(points), 1)), 1e-3)  # About 4 points per cell
+            self._spatial_index = (finite, SpatialHash(points, cell_size))
+        finite, index = self._spatial_index
+        return np.sort(finite[index.query_box(lo, hi)])
+
+    @classmethod
+    def capture(cls, controller):
+        # Copy the live state; call between steps (e.g. under controller.lock)
+        nodes = controller.nodes
+        count = nodes.count
+        index = controller.nearest_pmn
+        valid = (index.pmn_rows >= 0) & (index.dn_rows < count) & (index.pmn_rows < count)
+        particles, _ = controller.particles.active()
+
+        return cls(
+            frame=controller.frame,
+            positions=nodes.position[:count].copy(),
+            kinds=nodes.kind[:count].copy(),
+            masses=nodes.mass[:count].copy(),
+            node_ids=nodes.node_id[:count].copy(),
+            nearest_dn=index.dn_rows[valid],
+            nearest_pmn=index.pmn_rows[valid],
+            nearest_distance=index.distance[valid],
+            particles=particles,
+        )
+
+    @classmethod
+    def from_frame(cls, frame):
+        # 📼 Snapshot of a recorded TrajectoryFrame; the nearest-PMN pairs are recomputed (no physics)
+        dn_rows = np.flatnonzero(frame.kind == KIND_DN)
+        pmn_rows = np.flatnonzero(frame.kind == KIND_PMN)
+        if len(dn_rows) and len(pmn_rows):
+            nearest, distance = nearest_points(frame.position[dn_rows], frame.position[pmn_rows])
+            nearest_pmn = pmn_rows[nearest]
+        else:
+            dn_rows, nearest_pmn, distance = dn_rows[:0], pmn_rows[:0], np.zeros(0)
+
+        return cls(
+            frame=frame.frame,
+            positions=frame.position,
+            kinds=frame.kind,
+            masses=frame.mass,
+            node_ids=frame.node_id,
+            nearest_dn=dn_rows,
+            nearest_pmn=nearest_pmn,
+            nearest_distance=distance,
+            particles=np.zeros((0, 2)),
+        )
+
+
+class SnapshotBuffer:
+    # 🔁 Double buffer: the writer fills the back slot, then flips which slot is the front
+    def __init__(self):
+        self._slots = [None, None]
+        self._front = 0
+        self._swap_lock = threading.Lock()
+
+    def publish(self, snapshot):
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        with self._swap_lock:
+            self._front = back
+
+    def latest(self):
+        with self._swap_lock:
+            return self._slots[self._front]
@@ -0,0 +1,87 @@
+# core/spatial_hash.py
+
+import numpy as np
+
+# Keep cell coordinates small enough that the packed int64 keys never overflow
+MAX_CELL_COORD = 1 << 30
+
+# Half of the 3x3 neighbourhood (plus the home cell) so every pair is found once
+HALF_NEIGHBOURHOOD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class SpatialHash:
+    # 🗺️ Uniform grid over a set of points: points sorted by cell key, cells found with searchsorted
+    def __init__(self, positions, cell_size):
+        self.cell_size = float(cell_size)
+        self.positions = positions
+        self.origin = np.floor(positions.min(axis=0) / self.cell_size) if len(positions) else np.zeros(2)
+
+        cells = np.floor(positions / self.cell_size) - self.origin
+        self.cells = np.clip(cells, 0, MAX_CELL_COORD).astype(np.int64) + 1
+        self.height = int(self.cells[:, 1].max()) + 2 if len(positions) else 2
+
+        self.keys = self.cells[:, 0] * self.height + self.cells[:, 1]
+        self.order = np.argsort(self.keys, kind="stable")
+        self.sorted_keys = self.keys[self.order]
+        self.rank = np.empty_like(self.order)
+        self.rank[self.order] = np.arange(len(self.order))
+
+    def cell_ranges(self, keys):
+        return (
+            np.searchsorted(self.sorted_keys, keys, side="left"),
+            np.searchsorted(self.sorted_keys, keys, side="right"),
+        )
+
+    def candidate_pairs(self):
+        # ✅ Every pair of points sharing a cell or sitting in neighbouring cells, as (i, j) index arrays
+        first, second = [], []
+        for dx, dy in HALF_NEIGHBOURHOOD:
+            if dx == 0 and dy == 0:
+                lo = self.rank + 1
+                _, hi = self.cell_ranges(self.keys)
+            else:
+                lo, hi = self.cell_ranges(self.keys + dx * self.height + dy)
+
+            i, slots = expand_ranges(lo, hi)
+            first.append(i)
+            second.append(self.order[slots])
+
+        return np.concatenate(first), np.concatenate(second)
+
+    def query_box(self, lo, hi):
+        # 🔍 Indices of every point inside the axis-aligned box [lo, hi], visiting only the cells it covers
+        if len(self.keys) == 0:
+            return np.zeros(0, dtype=np.int64)
+        cell_lo = np.floor(np.asarray(lo, dtype=float) / self.cell_size) - self.origin + 1
+        cell_hi = np.floor(np.asarray(hi, dtype=float) / self.cell_size) - self.origin + 1
+        x_max = int(self.cells[:, 0].max())
+
+        x0, x1 = int(max(cell_lo[0], 1)), int(min(cell_hi[0], x_max))
+        y0, y1 = int(max(cell_lo[1], 1)), int(min(cell_hi[1], self.height - 2))
+        if x0 > x1 or y0 > y1:
+            return np.zeros(0, dtype=np.int64)
+
+        # One contiguous key range per grid column
+        columns = np.arange(x0, x1 + 1) * self.height
+        start = np.searchsorted(self.sorted_keys, columns + y0, side="left")
+        stop = np.searchsorted(self.sorted_keys, columns + y1, side="right")
+        _, slots = expand_ranges(start, stop)
+        candidates = self.order[slots]
+
+        # Border cells stick out of the box, so finish with the exact test
+        points = self.positions[candidates]
+        inside = np.all((points >= lo) & (points <= hi), axis=1)
+        return candidates[inside]
+
+
+def expand_ranges(lo, hi):
+    # Turn per-row [lo, hi) ranges into flat (row, slot) arrays
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    rows = np.repeat(np.arange(len(lo)), counts)
+    if total == 0:
+        return rows, np.zeros(0, dtype=np.int64)
+
+    starts = np.cumsum(counts) - counts
+    slots = np.arange(total) - np.repeat(starts, counts) + np.repeat(lo, counts)
+    return rows, slots
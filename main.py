@@ -1,9 +1,39 @@
 # main.py
+import argparse
+
 from core.simulation_controller import SimulationController
+from core.motion_integrator import WORLD_SIZE
 
 def main():
-    simulation = SimulationController()
-    simulation.run()
+    parser = argparse.ArgumentParser(description="SoL Gravitas simulation")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the scenario")
+    parser.add_argument("--dns", type=int, default=50, help="initial Dynamic Node count")
+    parser.add_argument("--world", type=float, nargs=2, default=WORLD_SIZE, metavar=("W", "H"), help="world size (a replay uses the recorded one)")
+    parser.add_argument("--record", metavar="PATH", help="record the run to PATH.frames / PATH.index")
+    parser.add_argument("--publish", metavar="NAME", help="publish every step to shared memory NAME (see core/shared_state.py)")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded run instead of simulating")
+    parser.add_argument("--max-filaments", type=int, default=None, metavar="N", help="draw at most N filaments (evenly decimated)")
+    args = parser.parse_args()
+
+    if args.replay:
+        # 📼 Replay: an empty controller, every frame comes from the memory-mapped recording
+        from core.recorder import TrajectoryReader, TrajectoryPlayer
+
+        reader = TrajectoryReader(args.replay)
+        simulation = SimulationController(num_dns=0, num_pmns=0, world_size=reader.world_size)
+        simulation.run(player=TrajectoryPlayer(reader), max_filaments=args.max_filaments)
+        return
+
+    simulation = SimulationController(num_dns=args.dns, seed=args.seed, world_size=args.world)
+    if args.record:
+        from core.recorder import TrajectoryRecorder
+
+        simulation.use_recorder(TrajectoryRecorder(args.record))
+    if args.publish:
+        from core.shared_state import StatePublisher
+
+        simulation.publisher = StatePublisher(args.publish)
+    simulation.run(max_filaments=args.max_filaments)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,87 @@
+# tests/test_barnes_hut.py
+#
+# The quadtree walk against the direct O(n²) sum, the opening angle, and the shared force parameters.
+
+import numpy as np
+import pytest
+
+from core.barnes_hut import BarnesHutGravity
+from core.force_calculator import ForceCalculator, FORCE_SCALE
+from core.node_store import NodeStore, KIND_DN, KIND_PMN
+
+
+def bodies(count=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(100, 700, (count, 2)), rng.uniform(2, 8, count)
+
+
+def direct_sum(positions, masses, G, softening):
+    # Every pair, self excluded: summed pull and Σ m / d weight with the ga_forces kernel
+    r_vector = positions[None, :, :] - positions[:, None, :]
+    distance = np.hypot(r_vector[..., 0], r_vector[..., 1]) + softening
+    strength = G * masses[:, None] * masses[None, :] / distance ** 1.9
+    weight = masses[None, :] / distance
+    np.fill_diagonal(strength, 0)
+    np.fill_diagonal(weight, 0)
+    return np.einsum("ij,ijk->ik", strength, r_vector), weight.sum(axis=1)
+
+
+def relative_error(actual, expected):
+    return np.hypot(*(actual - expected).T) / np.hypot(*expected.T)
+
+
+def test_theta_zero_is_the_direct_sum():
+    positions, masses = bodies()
+    force, weight = BarnesHutGravity(theta=0).forces(positions, masses)
+    expected_force, expected_weight = direct_sum(positions, masses, 1.2, 5)
+    np.testing.assert_allclose(force, expected_force, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(weight, expected_weight, rtol=1e-12)
+
+
+@pytest.mark.parametrize("theta, median_bound, p95_bound", [(0.3, 0.003, 0.006), (0.5, 0.01, 0.02), (1.0, 0.05, 0.1)])
+def test_averaged_force_error_bounds(theta, median_bound, p95_bound):
+    positions, masses = bodies()
+    force, weight = BarnesHutGravity(theta=theta).forces(positions, masses)
+    expected_force, expected_weight = direct_sum(positions, masses, 1.2, 5)
+    error = relative_error(force / weight[:, None], expected_force / expected_weight[:, None])
+    assert np.median(error) < median_bound
+    assert np.percentile(error, 95) < p95_bound
+
+
+def test_larger_theta_is_coarser():
+    positions, masses = bodies()
+    expected_force, expected_weight = direct_sum(positions, masses, 1.2, 5)
+    errors = []
+    for theta in (0.2, 0.5, 0.8, 1.2):
+        force, weight = BarnesHutGravity(theta=theta).forces(positions, masses)
+        errors.append(np.median(relative_error(force / weight[:, None], expected_force / expected_weight[:, None])))
+    assert errors == sorted(errors)
+
+
+def test_parameters_follow_the_force_calculator():
+    positions, masses = bodies(200)
+    calculator = ForceCalculator()
+    gravity = BarnesHutGravity(calculator, theta=0)
+    calculator.G, calculator.softening = 2.0, 3.0
+    force, weight = gravity.forces(positions, masses)
+    expected_force, expected_weight = direct_sum(positions, masses, 2.0, 3.0)
+    np.testing.assert_allclose(force, expected_force, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(weight, expected_weight, rtol=1e-12)
+
+
+@pytest.mark.parametrize("max_force", [15, 0.5])
+def test_accelerations_are_averaged_then_clamped(max_force):
+    positions, masses = bodies(200)
+    nodes = NodeStore()
+    nodes.add_rows(KIND_PMN, [[400, 300]], 0, 50)  # Not part of the DN↔DN pass
+    nodes.add_rows(KIND_DN, positions, 0, masses)
+    calculator = ForceCalculator(max_force=max_force)
+
+    dn_rows, acceleration = BarnesHutGravity(calculator, theta=0).accelerations(nodes)
+
+    expected_force, expected_weight = direct_sum(positions, masses, calculator.G, calculator.softening)
+    averaged = expected_force / expected_weight[:, None]
+    magnitude = np.hypot(*averaged.T)
+    averaged *= np.minimum(1, max_force / magnitude)[:, None]
+    np.testing.assert_array_equal(dn_rows, np.arange(1, 201))
+    np.testing.assert_allclose(acceleration, averaged / masses[:, None] * FORCE_SCALE, rtol=1e-9, atol=1e-12)
@@ -0,0 +1,56 @@
+# tests/test_collision_handler.py
+#
+# Broadphase contacts against brute force, and the batched impulse against the per-pair formula.
+
+import numpy as np
+import pytest
+
+from core.collision_handler import CollisionHandler
+from core.node_store import NodeStore, KIND_DN
+
+
+@pytest.mark.parametrize("dns", [10, 500, 3000])
+def test_collision_contacts_match_brute_force(dns):
+    rng = np.random.default_rng(dns)
+    store = NodeStore()
+    store.add_rows(KIND_DN, rng.uniform(0, 200, (dns, 2)), rng.normal(0, 1, (dns, 2)), rng.uniform(0.5, 8, dns))
+    rows = store.rows_of_kind(KIND_DN)
+
+    a, b = CollisionHandler().find_contacts(store, rows, 1.5)
+
+    position, radius = store.position[rows], store.mass[rows] ** (1 / 3)
+    distance = np.linalg.norm(position[:, None] - position[None], axis=-1)
+    touching = distance < 1.5 * (radius[:, None] + radius[None])
+    upper = np.triu_indices(dns, 1)
+    expected = set(zip(rows[upper[0]][touching[upper]], rows[upper[1]][touching[upper]]))
+    assert set(zip(a.tolist(), b.tolist())) == expected
+
+
+def reference_elastic_collision(pa, va, ma, pb, vb, mb, restitution=0.9, damping=0.98):
+    # The original per-pair elastic_collision: push apart by mass, then exchange the impulse
+    normal = pb - pa
+    distance = np.linalg.norm(normal)
+    normal = normal / distance
+    overlap = 0.5 * (ma ** (1 / 3) + mb ** (1 / 3)) - distance
+    if overlap > 0:
+        correction = normal * overlap
+        pa = pa - correction * (mb / (ma + mb))
+        pb = pb + correction * (ma / (ma + mb))
+    along_normal = (va - vb) @ normal
+    if along_normal > 0:
+        return pa, va, pb, vb
+    impulse = -(1 + restitution) * along_normal / (1 / ma + 1 / mb) * normal
+    return pa, (va + impulse / ma) * damping, pb, (vb - impulse / mb) * damping
+
+
+@pytest.mark.parametrize("velocity_b", [(-1.0, 0.2), (2.0, 0.0)])
+def test_pair_resolution_matches_elastic_collision(velocity_b):
+    store = NodeStore()
+    store.add_rows(KIND_DN, [[0.0, 0.0], [1.5, 0.5]], [[1.0, 0.0], velocity_b], [3.0, 5.0])
+    expected = reference_elastic_collision(
+        np.array([0.0, 0.0]), np.array([1.0, 0.0]), 3.0, np.array([1.5, 0.5]), np.array(velocity_b), 5.0,
+    )
+
+    CollisionHandler().resolve(store)
+    for actual, want in zip((store.position[0], store.velocity[0], store.position[1], store.velocity[1]), expected):
+        np.testing.assert_allclose(actual, want, rtol=0, atol=1e-12)
@@ -0,0 +1,28 @@
+# tests/test_ensemble.py
+#
+# A single-universe ensemble against the controller it batches.
+
+import numpy as np
+
+from core.ensemble import Ensemble
+from core.node_store import KIND_PMN
+from core.simulation_controller import SimulationController
+
+
+def test_single_universe_ensemble_matches_controller():
+    seed = np.random.SeedSequence(7).spawn(1)[0]
+    ensemble = Ensemble(1, seeds=[seed])
+    controller = SimulationController(rng=np.random.default_rng(seed))
+    pmns = len(controller.nodes.rows_of_kind(KIND_PMN))
+
+    # Bit-identical through the first merge (after it the controller's bursts draw from its rng too);
+    # the ensemble keeps merged DNs as dead slots where the controller compacts them away
+    for _ in range(400):
+        ensemble.step()
+        controller.update()
+        alive = ensemble.alive[0]
+        np.testing.assert_array_equal(ensemble.position[0][alive], controller.nodes.position[pmns:controller.nodes.count])
+        assert ensemble.merge_count[0] == controller.merge_count
+        if controller.merge_count:
+            break
+    assert controller.merge_count > 0
@@ -0,0 +1,93 @@
+# tests/test_events.py
+#
+# The event ring buffer, subscriber delivery and the JSON-lines sink.
+
+import io
+import json
+
+import numpy as np
+
+from core.events import EventBus, EventLogSink, EVENT_DN_COLLISION, EVENT_MERGE, EVENT_BURST, EVENT_NAMES
+
+
+class Collect:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, records, bus):
+        self.batches.append(records)
+
+
+def test_records_written_only_while_subscribed():
+    bus = EventBus(capacity=8)
+    bus.begin_frame(1)
+    bus.emit(EVENT_DN_COLLISION, [1, 2, 3], [4, 5, 6])
+    bus.publish()
+    assert bus.written == 0 and bus.counts()["dn_collision"] == 3  # Counted, not recorded
+
+    collect = bus.subscribe(Collect())
+    bus.begin_frame(2)
+    bus.emit(EVENT_MERGE, 7, 8, 5.0, 55.0)
+    bus.publish()
+    assert bus.written == 1
+    (batch,) = collect.batches
+    assert batch[["frame", "kind", "a", "b"]].tolist() == [(2, EVENT_MERGE, 7, 8)]
+    assert batch["mass_b"].tolist() == [55.0]
+
+    bus.unsubscribe(collect)
+    bus.begin_frame(3)
+    bus.emit(EVENT_MERGE, 9, 8, 5.0, 60.0)
+    bus.publish()
+    assert bus.written == 1 and len(collect.batches) == 1
+    assert bus.counts(totals=True) == {**dict.fromkeys(EVENT_NAMES, 0), "dn_collision": 3, "merge": 2}
+
+
+def test_ring_wraps_and_counts_dropped_records():
+    bus = EventBus(capacity=8)
+    collect = bus.subscribe(Collect())
+    for frame in range(1, 4):
+        bus.begin_frame(frame)
+        bus.emit(EVENT_DN_COLLISION, np.arange(5) + 10 * frame, -1)
+        bus.publish()
+    assert [batch["a"].tolist() for batch in collect.batches] == [
+        [10, 11, 12, 13, 14], [20, 21, 22, 23, 24], [30, 31, 32, 33, 34],
+    ]
+    assert bus.dropped == 0
+
+    # 13 records between two publishes: the oldest 5 are overwritten, the newest 8 delivered in order
+    bus.begin_frame(4)
+    bus.emit(EVENT_DN_COLLISION, np.arange(13) + 100, -1)
+    bus.publish()
+    assert collect.batches[-1]["a"].tolist() == list(range(105, 113))
+    assert bus.dropped == 5
+    assert bus.counts()["dn_collision"] == 13
+
+
+def test_subscribers_receive_only_their_kinds():
+    bus = EventBus(capacity=16)
+    merges = bus.subscribe(Collect(), kinds=[EVENT_MERGE])
+    everything = bus.subscribe(Collect())
+    bus.begin_frame(1)
+    bus.emit(EVENT_DN_COLLISION, [1, 2], [3, 4])
+    bus.emit(EVENT_MERGE, [5], [6], 2.0, 52.0)
+    bus.emit(EVENT_BURST, [0], [12])
+    bus.publish()
+    assert merges.batches[0]["a"].tolist() == [5]
+    assert everything.batches[0]["kind"].tolist() == [EVENT_DN_COLLISION, EVENT_DN_COLLISION, EVENT_MERGE, EVENT_BURST]
+
+
+def test_event_log_sink_writes_json_lines():
+    stream = io.StringIO()
+    bus = EventBus(capacity=16)
+    bus.subscribe(EventLogSink(stream))
+    bus.begin_frame(7)
+    bus.emit(EVENT_MERGE, [11, 12], [3, 3], [2.5, 4.0], [52.5, 56.5])
+    bus.publish()
+    bus.begin_frame(8)
+    bus.publish()  # Nothing emitted: nothing written
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines == [
+        {"frame": 7, "event": "merge", "a": 11, "b": 3, "mass_a": 2.5, "mass_b": 52.5},
+        {"frame": 7, "event": "merge", "a": 12, "b": 3, "mass_a": 4.0, "mass_b": 56.5},
+    ]
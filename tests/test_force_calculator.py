@@ -0,0 +1,59 @@
+# tests/test_force_calculator.py
+#
+# The vectorized force pass against the original per-node loop.
+
+import numpy as np
+
+from core.force_calculator import ForceCalculator
+from core.node_store import NodeStore, KIND_DN, KIND_PMN
+
+
+def random_store(rng, dns, pmns):
+    store = NodeStore()
+    store.add_rows(KIND_PMN, rng.uniform(0, 800, (pmns, 2)), 0, rng.uniform(20, 4000, pmns))
+    store.add_rows(KIND_DN, rng.uniform(0, 800, (dns, 2)), rng.uniform(-30, 30, (dns, 2)), rng.uniform(0.5, 8, dns))
+    return store
+
+
+def reference_apply_forces(position, velocity, mass, kind, tangent_nudge, perturbation, calculator):
+    # The original loop: every DN against every PMN, one node at a time
+    velocity = velocity.copy()
+    pmns = np.flatnonzero(kind == KIND_PMN)
+    for k, i in enumerate(np.flatnonzero(kind == KIND_DN)):
+        total_force = np.zeros(2)
+        total_mass_weight = 0.0
+        for j in pmns:
+            r_vector = position[j] - position[i]
+            distance = np.linalg.norm(r_vector) + calculator.softening
+            total_force += (calculator.G * mass[i] * mass[j]) * r_vector / (distance ** 1.9)
+            total_mass_weight += mass[j] / distance
+        if total_mass_weight > 0:
+            averaged_force = total_force / total_mass_weight
+            magnitude = np.linalg.norm(averaged_force)
+            if magnitude > calculator.max_force:
+                averaged_force = averaged_force / magnitude * calculator.max_force
+            velocity[i] += (averaged_force / mass[i]) * 0.5
+
+        tangent = np.array([-velocity[i, 1], velocity[i, 0]])
+        if np.linalg.norm(tangent) != 0:
+            velocity[i] += tangent / np.linalg.norm(tangent) * tangent_nudge[k]
+        velocity[i] += (perturbation[k] - 0.5) * 0.2
+        speed = np.linalg.norm(velocity[i])
+        if speed > calculator.max_velocity:
+            velocity[i] = velocity[i] / speed * calculator.max_velocity
+        velocity[i] *= calculator.damping
+    return velocity
+
+
+def test_apply_forces_matches_per_node_loop():
+    store = random_store(np.random.default_rng(1), dns=300, pmns=5)
+    count = store.count
+    calculator = ForceCalculator(rng=np.random.default_rng(2))
+    tangent_nudge, perturbation = ForceCalculator(rng=np.random.default_rng(2)).draw_noise(300)
+
+    expected = reference_apply_forces(
+        store.position[:count], store.velocity[:count], store.mass[:count], store.kind[:count],
+        tangent_nudge, perturbation, calculator,
+    )
+    calculator.apply_forces(store)
+    np.testing.assert_allclose(store.velocity[:count], expected, rtol=0, atol=1e-12)
@@ -0,0 +1,100 @@
+# tests/test_force_field.py
+#
+# The cached PMN field picks up merges, mass edits and moved PMNs on its own, and stays
+# within its error bound against the exact kernel.
+
+import numpy as np
+
+from core.force_field import ForceField
+from core.node_store import KIND_DN, KIND_PMN
+from core.simulation_controller import SimulationController, PROXIMITY_THRESHOLD, MERGE_TIME_THRESHOLD
+
+
+def field_controller(num_dns=2000, seed=6):
+    controller = SimulationController(num_dns=num_dns, seed=seed)
+    field = ForceField(controller.world_size, cell_size=4)
+    controller.force_calculator.use_field(field)
+    return controller, field
+
+
+def accelerations(controller):
+    return controller.force_calculator.accelerations(controller.nodes)[1]
+
+
+def exact_accelerations(controller):
+    calculator = controller.force_calculator
+    field, calculator.field = calculator.field, None
+    try:
+        return accelerations(controller)
+    finally:
+        calculator.field = field
+
+
+def assert_within_bound(controller, field):
+    calculator = controller.force_calculator
+    report = field.error_report(controller.nodes, calculator.G, calculator.softening, calculator.max_force)
+    assert report["median_rel"] < 1e-3
+    assert report["p95_rel"] < 1e-2
+
+
+def test_built_once_pmns_hold_still():
+    controller, field = field_controller()
+    accelerations(controller)
+    assert (field.active, field.builds) == (False, 0)  # New PMNs: exact kernel until they hold still
+    accelerations(controller)
+    accelerations(controller)
+    assert (field.active, field.builds, field.updates) == (True, 1, 0)
+    assert_within_bound(controller, field)
+
+
+def test_merge_updates_the_field():
+    controller, field = field_controller()
+    accelerations(controller)
+    accelerations(controller)
+
+    # A DN sitting on a PMN, one step short of merging
+    nodes = controller.nodes
+    pmn_row = nodes.rows_of_kind(KIND_PMN)[0]
+    row = nodes.add_rows(KIND_DN, nodes.position[[pmn_row]] + PROXIMITY_THRESHOLD / 4, 0, 6.0)[0]
+    nodes.proximity_timer[row] = MERGE_TIME_THRESHOLD - 1
+    controller.check_proximity_and_merge()
+    nodes.compact()
+    assert controller.merge_count == 1
+
+    field_acceleration = accelerations(controller)
+    assert (field.active, field.builds, field.updates) == (True, 1, 1)
+    sampled = ~field.sample(nodes.position[nodes.rows_of_kind(KIND_DN)])[2]
+    np.testing.assert_allclose(field_acceleration[~sampled], exact_accelerations(controller)[~sampled], rtol=1e-12)
+    assert_within_bound(controller, field)
+
+
+def test_mass_update_matches_a_fresh_build():
+    controller, field = field_controller()
+    accelerations(controller)
+    accelerations(controller)
+
+    nodes = controller.nodes
+    pmn_rows = nodes.rows_of_kind(KIND_PMN)
+    nodes.mass[pmn_rows[[0, 2]]] *= [2.5, 0.4]
+    accelerations(controller)
+    assert (field.builds, field.updates) == (1, 1)
+
+    fresh = ForceField(controller.world_size, cell_size=4)
+    fresh.build(nodes.position[pmn_rows], nodes.mass[pmn_rows], controller.force_calculator.softening)
+    np.testing.assert_allclose(field.force, fresh.force, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(field.weight, fresh.weight, rtol=1e-9, atol=1e-12)
+    assert_within_bound(controller, field)
+
+
+def test_moved_pmn_falls_back_then_rebuilds():
+    controller, field = field_controller()
+    accelerations(controller)
+    accelerations(controller)
+
+    nodes = controller.nodes
+    nodes.position[nodes.rows_of_kind(KIND_PMN)[0]] += [30, -20]
+    np.testing.assert_array_equal(accelerations(controller), exact_accelerations(controller))
+    assert (field.active, field.builds) == (False, 1)
+    accelerations(controller)
+    assert (field.active, field.builds) == (True, 2)
+    assert_within_bound(controller, field)
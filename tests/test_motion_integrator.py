@@ -0,0 +1,120 @@
+# tests/test_motion_integrator.py
+#
+# Step-length scaling of the schemes, the Verlet acceleration cache, and the adaptive substep cap.
+
+import numpy as np
+import pytest
+
+from core.motion_integrator import MotionIntegrator, AdaptiveVerletScheme
+from core.node_store import KIND_DN, KIND_PMN
+from core.simulation_controller import SimulationController, PROXIMITY_THRESHOLD, MERGE_TIME_THRESHOLD
+
+
+def noiseless_run(scheme, dt, duration=8, seed=1):
+    # No nudge and zero-mean perturbation, so runs at different dt follow the same smooth trajectory
+    controller = SimulationController(num_dns=20, seed=seed, integrator=scheme, dt=dt)
+    controller.force_calculator.draw_noise = lambda count: (np.zeros(count), np.full((count, 2), 0.5))
+    for _ in range(int(round(duration / dt))):
+        controller.update()
+    assert controller.merge_count == 0 and controller.time == pytest.approx(duration)
+    return controller.nodes.position[:controller.nodes.count].copy()
+
+
+def count_force_passes(controller):
+    calculator = controller.force_calculator
+    accelerations = calculator.accelerations
+    calls = []
+
+    def counted(nodes):
+        calls.append(nodes.count)
+        return accelerations(nodes)
+
+    calculator.accelerations = counted
+    return calls
+
+
+@pytest.mark.parametrize("scheme, order", [("euler", 1), ("verlet", 2)])
+def test_error_shrinks_with_dt_at_the_scheme_order(scheme, order):
+    positions = [noiseless_run(scheme, dt) for dt in (1, 0.5, 0.25, 0.125)]
+    differences = [np.abs(a - b).max() for a, b in zip(positions, positions[1:])]
+    ratios = np.divide(differences[:-1], differences[1:])
+    assert np.all(ratios > 2 ** order * 0.85)
+
+
+def test_update_positions_scales_with_dt():
+    controller = SimulationController(num_dns=50, seed=2)
+    nodes = controller.nodes
+    before = nodes.position[:nodes.count].copy()
+    velocity = nodes.velocity[:nodes.count].copy()
+    MotionIntegrator(dt=0.25).update_positions(nodes, 0.25, trails=False)
+    np.testing.assert_allclose(nodes.position[:nodes.count], before + velocity * 0.25)
+
+
+def test_verlet_reuses_accelerations_until_the_system_changes():
+    controller = SimulationController(num_dns=200, seed=4, integrator="verlet")
+    calls = count_force_passes(controller)
+    controller.update()
+    assert len(calls) == 2  # Nothing cached yet: start and end of the step
+    controller.update()
+    assert len(calls) == 3  # Start of the step reuses the end of the last one
+
+    nodes = controller.nodes
+    nodes.mass[nodes.rows_of_kind(KIND_PMN)[0]] += 10  # Mass edit
+    controller.update()
+    assert len(calls) == 5
+
+    # A DN one step short of merging into a PMN
+    pmn_row = nodes.rows_of_kind(KIND_PMN)[1]
+    row = nodes.add_rows(KIND_DN, nodes.position[[pmn_row]] + PROXIMITY_THRESHOLD / 4, 0, 5.0)[0]
+    nodes.proximity_timer[row] = MERGE_TIME_THRESHOLD
+    controller.check_proximity_and_merge()
+    nodes.compact()
+    assert controller.merge_count == 1
+    controller.update()
+    assert len(calls) == 7
+
+    controller.update()
+    assert len(calls) == 8
+
+
+def test_verlet_cache_follows_mutual_gravity():
+    controller = SimulationController(num_dns=100, seed=4, integrator="verlet")
+    calls = count_force_passes(controller)
+    controller.update()
+    controller.enable_mutual_gravity = True
+    controller.update()
+    assert len(calls) == 4
+
+
+@pytest.mark.parametrize("dt, dt_min", [(1.0, 0.05), (2.0, 0.3)])
+def test_adaptive_substeps_are_capped(dt, dt_min):
+    controller = SimulationController(num_dns=200, seed=8, integrator="adaptive", dt=dt)
+    scheme = AdaptiveVerletScheme(dt_min=dt_min)
+    controller.motion_integrator.use_scheme(scheme)
+    controller.update()  # Fills the nearest-PMN index choose_dt reads
+
+    # Fast enough that every DN would need a much shorter substep than dt_min
+    nodes = controller.nodes
+    nodes.velocity[nodes.rows_of_kind(KIND_DN)] *= 1e4
+    start = controller.time
+    controller.update()
+
+    cap = int(np.ceil(dt / dt_min))
+    assert scheme.substeps == controller.motion_integrator.last_substeps == cap
+    assert controller.time == pytest.approx(start + dt)
+
+
+def test_adaptive_never_exceeds_the_configured_dt():
+    controller = SimulationController(num_dns=200, seed=8, integrator="adaptive", dt=0.5)
+    scheme = controller.motion_integrator.scheme
+    controller.update()
+
+    nodes = controller.nodes
+    nodes.velocity[nodes.rows_of_kind(KIND_DN)] = 0  # Standing still: nothing asks for a shorter step
+    acceleration = np.zeros((len(nodes.rows_of_kind(KIND_DN)), 2))
+    assert scheme.choose_dt(controller, acceleration, 0.5) == 0.5
+    for _ in range(20):
+        substeps_before = controller.motion_integrator.total_substeps
+        controller.update()
+        assert 1 <= controller.motion_integrator.total_substeps - substeps_before <= np.ceil(0.5 / scheme.dt_min)
+    assert controller.time == pytest.approx(0.5 * 21)
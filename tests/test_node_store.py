@@ -0,0 +1,45 @@
+# tests/test_node_store.py
+#
+# Tombstoned removal, compaction and stable node ids.
+
+import numpy as np
+import pytest
+
+from core.node import DynamicNode
+from core.node_store import NodeStore, KIND_DN
+
+
+def test_compaction_keeps_ids_and_views():
+    rng = np.random.default_rng(4)
+    store = NodeStore(capacity=4)
+    rows = store.add_rows(KIND_DN, rng.uniform(0, 800, (50, 2)), 0, rng.uniform(2, 8, 50))
+    views = store.extend_views(DynamicNode, rows)
+    before = {view.node_id: view.position.copy() for view in views}
+
+    dead = rng.choice(50, 17, replace=False)
+    dead_ids = [views[i].node_id for i in dead]
+    for i in dead:
+        store.remove(views[i])
+    assert len(store) == 33 and store.count == 50  # Tombstoned until compact()
+    store.compact()
+
+    # Survivors keep their ids and order, and their views follow them to the new rows
+    alive = [view for i, view in enumerate(views) if i not in set(dead)]
+    assert store.count == 33
+    assert store.node_id[:store.count].tolist() == [view.node_id for view in alive]
+    for view in alive:
+        assert view in store
+        np.testing.assert_array_equal(view.position, before[view.node_id])
+        assert store.id_to_row[view.node_id] == view._index
+
+    # Removed views were detached with their state; their ids come back with a new generation
+    for i, dead_id in zip(dead, dead_ids):
+        assert views[i] not in store
+        np.testing.assert_array_equal(views[i].position, before[dead_id])
+    stale = DynamicNode._view(store, 0)
+    store.remove(store[0])
+    store.compact()
+    new_rows = store.add_rows(KIND_DN, np.zeros((18, 2)), 0, 1.0)
+    assert set(store.node_id[new_rows].tolist()) == set(dead_ids) | {stale.node_id}
+    with pytest.raises(ValueError):
+        stale.position
@@ -0,0 +1,70 @@
+# tests/test_recorder.py
+#
+# Recording a run to disk and reading every frame back.
+
+import numpy as np
+
+from core.events import EVENT_MERGE
+from core.recorder import TrajectoryRecorder, TrajectoryReader
+from core.simulation_controller import SimulationController
+
+
+def test_recorder_round_trip(tmp_path):
+    controller = SimulationController(num_dns=200, seed=5, world_size=(1000, 700))
+    path = str(tmp_path / "run")
+    controller.use_recorder(TrajectoryRecorder(path, chunk_frames=7))
+    expected = []
+    for _ in range(150):
+        controller.update()
+        count = controller.nodes.count
+        expected.append({
+            "frame": controller.frame,
+            "time": controller.time,
+            "position": controller.nodes.position[:count].copy(),
+            "velocity": controller.nodes.velocity[:count].copy(),
+            "node_id": controller.nodes.node_id[:count].copy(),
+            "merges": len(controller.frame_merges),
+        })
+    controller.recorder.close()
+
+    reader = TrajectoryReader(path)
+    try:
+        assert len(reader) == len(expected)
+        assert reader.world_size == (1000.0, 700.0)
+        for i, want in enumerate(expected):
+            frame = reader[i]
+            assert (frame.frame, frame.time, len(frame.merges)) == (want["frame"], want["time"], want["merges"])
+            np.testing.assert_array_equal(frame.position, want["position"])
+            np.testing.assert_array_equal(frame.velocity, want["velocity"])
+            np.testing.assert_array_equal(frame.node_id, want["node_id"])
+        assert len(reader.merges()) == controller.merge_count
+    finally:
+        reader.close()
+
+
+def test_recorder_stores_the_event_stream(tmp_path):
+    controller = SimulationController(num_dns=300, seed=5)
+    controller.enable_dn_collisions = True
+    published = []
+    controller.events.subscribe(lambda records, bus: published.append(records))
+    path = str(tmp_path / "run")
+    recorder = TrajectoryRecorder(path, chunk_frames=5)
+    controller.use_recorder(recorder)
+    for _ in range(120):
+        controller.update()
+    controller.use_recorder(None)  # Unsubscribes: later steps are neither recorded nor buffered
+    controller.update()
+    recorder.close()
+
+    expected = np.concatenate(published[:-1])
+    reader = TrajectoryReader(path)
+    try:
+        events = reader.events()
+        assert len(events) == len(expected) > 0
+        np.testing.assert_array_equal(events, expected)
+        for i in np.flatnonzero(reader.index["events"]):
+            assert np.all(reader[int(i)].events["frame"] == reader[int(i)].frame)
+        merges = reader.events(kinds=[EVENT_MERGE])
+        assert merges["a"].tolist() == [int(merge["dn_id"]) for _, merge in reader.merges()]
+    finally:
+        reader.close()
@@ -0,0 +1,107 @@
+# tests/test_shared_state.py
+#
+# Publishing to shared memory: round trip, consistent seqlock reads against a concurrent
+# publisher (growing its data segment on the way), and cleanup on close().
+
+import multiprocessing
+import os
+import types
+
+import numpy as np
+import pytest
+
+from core.shared_state import StatePublisher, StateReader, attach, data_name
+from core.simulation_controller import SimulationController
+
+
+def segment_name(tag):
+    return f"gravitas-test-{tag}-{os.getpid()}"
+
+
+def frame_state(frame, max_count):
+    # Every field of every row holds the frame number (kind modulo int8), and the row count
+    # changes from frame to frame, so a torn read shows up as mixed values or a wrong count
+    count = 100 * (1 + frame % (max_count // 100))
+    return count, {
+        "position": np.full((count, 2), float(frame)),
+        "velocity": np.full((count, 2), -float(frame)),
+        "mass": np.full(count, float(frame)),
+        "node_id": np.full(count, frame, dtype=np.int64),
+        "kind": np.full(count, frame % 100, dtype=np.int8),
+    }
+
+
+def publish_frames(name, frames, max_count, ready):
+    publisher = StatePublisher(name, capacity=100)
+    ready.set()
+    try:
+        for frame in range(1, frames + 1):
+            count, fields = frame_state(frame, max_count)
+            nodes = types.SimpleNamespace(count=count, **fields)
+            publisher.publish(types.SimpleNamespace(nodes=nodes, frame=frame, time=frame * 0.5, world_size=(800, 600)))
+    finally:
+        publisher.close()
+
+
+def test_published_step_round_trips():
+    controller = SimulationController(num_dns=300, seed=12)
+    controller.update()
+    publisher = StatePublisher(segment_name("round-trip"))
+    reader = None
+    try:
+        publisher.publish(controller)
+        reader = StateReader(publisher.name)
+        frame = reader.read()
+        count = controller.nodes.count
+        assert (frame.frame, frame.time, frame.world) == (controller.frame, controller.time, (800.0, 600.0))
+        for field in ("position", "velocity", "mass", "node_id", "kind"):
+            np.testing.assert_array_equal(getattr(frame, field), getattr(controller.nodes, field)[:count])
+    finally:
+        if reader is not None:
+            reader.close()
+        publisher.close()
+
+
+def test_reads_are_consistent_while_publishing():
+    name, max_count = segment_name("seqlock"), 8000
+    ready = multiprocessing.Event()
+    writer = multiprocessing.Process(target=publish_frames, args=(name, 3000, max_count, ready))
+    writer.start()
+    try:
+        assert ready.wait(10)
+        reader = StateReader(name)
+        try:
+            seen = set()
+            while not reader.closed:
+                frame = reader.read(timeout=0.1)
+                if frame is None:
+                    continue
+                count, fields = frame_state(frame.frame, max_count)
+                assert len(frame.mass) == count
+                for field, expected in fields.items():
+                    np.testing.assert_array_equal(getattr(frame, field), expected)
+                assert frame.time == frame.frame * 0.5
+                seen.add(frame.frame)
+            assert len(seen) > 1
+        finally:
+            reader.close()
+    finally:
+        writer.join(30)
+    assert writer.exitcode == 0
+
+
+def test_close_removes_the_segments():
+    publisher = StatePublisher(segment_name("close"), capacity=10)
+    controller = SimulationController(num_dns=50, seed=1)
+    publisher.publish(controller)
+    generation = int(publisher.header["generation"])
+    reader = StateReader(publisher.name)
+    assert reader.read() is not None
+
+    publisher.close()
+    assert reader.closed and reader.read(timeout=0.01) is None
+    reader.close()
+    for name in (publisher.name, data_name(publisher.name, generation)):
+        with pytest.raises(FileNotFoundError):
+            attach(name)
+    publisher.close()  # Idempotent
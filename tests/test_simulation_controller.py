@@ -0,0 +1,45 @@
+# tests/test_simulation_controller.py
+#
+# The controller's merge pass against a straightforward per-DN reference loop.
+
+import numpy as np
+
+from core.node_store import KIND_DN, KIND_PMN
+from core.simulation_controller import SimulationController, PROXIMITY_THRESHOLD, MERGE_TIME_THRESHOLD
+
+
+def test_merges_match_per_dn_loop():
+    rng = np.random.default_rng(3)
+    controller = SimulationController(num_dns=0, seed=3)
+    nodes = controller.nodes
+    pmn_rows = nodes.rows_of_kind(KIND_PMN)
+
+    # DNs scattered around the PMNs, some about to reach the merge time
+    around = nodes.position[rng.choice(pmn_rows, 200)] + rng.uniform(-2, 2, (200, 2)) * PROXIMITY_THRESHOLD
+    rows = nodes.add_rows(KIND_DN, around, 0, rng.uniform(2, 8, 200))
+    nodes.proximity_timer[rows] = rng.integers(MERGE_TIME_THRESHOLD - 3, MERGE_TIME_THRESHOLD, 200)
+
+    # Reference: every DN in row order against its closest PMN
+    ids = nodes.node_id[:nodes.count].copy()
+    position, mass = nodes.position[:nodes.count].copy(), nodes.mass[:nodes.count].copy()
+    timer = nodes.proximity_timer[:nodes.count].copy()
+    merged = []
+    for row in rows:
+        distances = np.linalg.norm(position[pmn_rows] - position[row], axis=1)
+        closest = pmn_rows[np.argmin(distances)]
+        if distances.min() < PROXIMITY_THRESHOLD:
+            timer[row] += 1
+            if timer[row] >= MERGE_TIME_THRESHOLD:
+                mass[closest] += mass[row]
+                merged.append(int(ids[row]))
+        else:
+            timer[row] = 0
+    survivors = ~np.isin(ids, merged)
+
+    controller.check_proximity_and_merge()
+    nodes.compact()
+
+    assert merged and [int(dn_id) for dn_id, _, _ in controller.frame_merges] == merged
+    np.testing.assert_array_equal(nodes.node_id[:nodes.count], ids[survivors])
+    np.testing.assert_array_equal(nodes.proximity_timer[:nodes.count], timer[survivors])
+    np.testing.assert_allclose(nodes.mass[:nodes.count], mass[survivors], rtol=0, atol=1e-12)
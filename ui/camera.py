@@ -0,0 +1,53 @@
+# ui/camera.py
+
+import numpy as np
+
+MIN_ZOOM = 0.02
+MAX_ZOOM = 20.0
+
+
+class Camera:
+    # 🎥 Pan/zoom mapping between world coordinates and widget pixels: screen = (world - center) * zoom + half view
+    def __init__(self, world_size=(800, 600)):
+        self.world_size = tuple(world_size)
+        self.center = np.array(self.world_size, dtype=float) / 2
+        self.zoom = 1.0
+        self.view_size = (1, 1)
+        self.user_moved = False  # Until the user pans or zooms, the camera keeps the whole world in view
+
+    def resize(self, width, height):
+        self.view_size = (max(1, width), max(1, height))
+        if not self.user_moved:
+            self.fit()
+
+    def fit(self):
+        # Whole world in view, centred
+        self.center = np.array(self.world_size, dtype=float) / 2
+        self.zoom = min(self.view_size[0] / self.world_size[0], self.view_size[1] / self.world_size[1])
+        self.user_moved = False
+
+    def world_to_screen(self, points):
+        half_view = np.array(self.view_size, dtype=float) / 2
+        return (np.asarray(points, dtype=float) - self.center) * self.zoom + half_view
+
+    def screen_to_world(self, points):
+        half_view = np.array(self.view_size, dtype=float) / 2
+        return (np.asarray(points, dtype=float) - half_view) / self.zoom + self.center
+
+    def visible_box(self, margin=0.0):
+        # World-space (lo, hi) corners of the viewport, grown by `margin` screen pixels on every side
+        lo = self.screen_to_world((-margin, -margin))
+        hi = self.screen_to_world((self.view_size[0] + margin, self.view_size[1] + margin))
+        return lo, hi
+
+    def pan(self, dx, dy):
+        # Drag by (dx, dy) screen pixels
+        self.center = self.center - np.array((dx, dy), dtype=float) / self.zoom
+        self.user_moved = True
+
+    def zoom_at(self, factor, screen_point):
+        # Zoom by `factor`, keeping the world point under `screen_point` fixed
+        anchor = self.screen_to_world(screen_point)
+        self.zoom = float(np.clip(self.zoom * factor, MIN_ZOOM, MAX_ZOOM))
+        self.center = anchor - (np.asarray(screen_point, dtype=float) - np.array(self.view_size) / 2) / self.zoom
+        self.user_moved = True
@@ -1,11 +1,69 @@
 # ui/main_window.py
 
 from PyQt5.QtWidgets import QWidget, QMainWindow, QVBoxLayout, QPushButton, QSlider, QLabel, QHBoxLayout, QCheckBox
-from PyQt5.QtGui import QPainter, QColor, QPen, QRadialGradient, QPixmap
-from PyQt5.QtCore import QTimer, Qt, QTime
+from PyQt5.QtGui import QPainter, QColor, QPen, QPixmap, QPolygonF, QFont
+from PyQt5.QtCore import QTimer, Qt, QTime, QPointF, QLineF, QRectF
 from core.node import DynamicNode, PrimaryMassNode
+from core.node_store import KIND_DN, KIND_PMN
+from core.snapshot import Snapshot
+from core.simulation_worker import SimulationWorker
+from core.profiler import PhaseProfiler
+from ui.sprite_cache import SpriteCache, MIN_DN_SIZE, MAX_DN_SIZE, PMN_SIZE, MIN_PMN_SIZE, MAX_PMN_SIZE
+from ui.camera import Camera
 import numpy as np
 import math
+import time
+from collections import deque
+
+# Filament colours: distances beyond this are fully "cold"; colours are quantized into bins
+HEATMAP_MAX_DISTANCE = 400
+FILAMENT_COLOR_BINS = 32
+
+RENDER_INTERVAL_MS = 16  # ~60 FPS repaint, independent of the simulation step rate
+
+# Culling: anything further than this many pixels outside the viewport is skipped (covers the widest glow)
+CULL_MARGIN = 128
+
+# 🌫️ Level of detail: past this zoom-out, or with more visible DNs than the budget, crowded screen cells
+# of LOD_CELL_PIXELS are drawn as one density-shaded square instead of individual glows
+LOD_MAX_ZOOM = 0.5
+LOD_NODE_BUDGET = 4000
+LOD_CELL_PIXELS = 16
+LOD_MIN_CELL_COUNT = 6
+LOD_ALPHA_BINS = 8
+
+
+def lod_cell_keys(screen):
+    # One int64 key per LOD_CELL_PIXELS screen cell (x in the high 32 bits, y in the low 32)
+    cells = np.floor(screen / LOD_CELL_PIXELS).astype(np.int64)
+    return (cells[:, 0] << 32) + (cells[:, 1] & 0xFFFFFFFF)
+
+
+def aggregate_filaments(start_screen, end_screen, pmn_rows, distance):
+    # Filaments starting in a crowded cell become one line per (cell, PMN) from the mean start point,
+    # coloured by the mean distance; the rest pass through unchanged
+    _, cell, cell_counts = np.unique(lod_cell_keys(start_screen), return_inverse=True, return_counts=True)
+    crowded = cell_counts[cell] >= LOD_MIN_CELL_COUNT
+    if not crowded.any():
+        return start_screen, end_screen, distance
+
+    _, group, group_counts = np.unique(
+        np.column_stack((cell[crowded], pmn_rows[crowded])), axis=0, return_inverse=True, return_counts=True,
+    )
+    group = group.reshape(-1)
+    mean_start = np.column_stack([
+        np.bincount(group, weights=start_screen[crowded, axis]) / group_counts for axis in (0, 1)
+    ])
+    mean_distance = np.bincount(group, weights=distance[crowded]) / group_counts
+    first = np.zeros(len(group_counts), dtype=np.int64)
+    first[group[::-1]] = np.flatnonzero(crowded)[::-1]  # Any member's end point: they share the PMN
+
+    sparse = ~crowded
+    return (
+        np.concatenate((start_screen[sparse], mean_start)),
+        np.concatenate((end_screen[sparse], end_screen[first])),
+        np.concatenate((distance[sparse], mean_distance)),
+    )
 
 
 class SimulationView(QWidget):
@@ -13,88 +71,305 @@ class SimulationView(QWidget):
         super().__init__()
         self.controller = controller
         self.background = QPixmap("assets/icons/nebula_background_resized.png")
+        self.scaled_background = None
+        self.sprites = SpriteCache()
+        self.camera = Camera(controller.world_size)  # 🎥 Drag to pan, wheel to zoom, double-click / Home to fit
+        self._drag_origin = None
+        self.draw_stats = {}  # What the last paint actually drew (visible nodes, LOD cells, filaments)
+        self.max_filaments = None  # Cap on drawn filaments (evenly decimated), None draws all
+        self.snapshots = None  # 📸 SnapshotBuffer from the simulation worker, once it runs
+        self.clock = None  # Milliseconds driving the pulse animations; None follows the wall clock
+        self._paint_times = deque(maxlen=120)
+
+        # ⏱️ Paint-phase timings and the profiler overlay (F3); both profilers only run while it is shown
+        self.profiler = PhaseProfiler()
+        self.show_hud = False
+        self.hud_font = QFont("Monospace", 9)
+        self.hud_font.setStyleHint(QFont.TypeWriter)
+        self.setFocusPolicy(Qt.StrongFocus)
+
+        # 🔥 Heatmap colour at the centre of every filament colour bin
+        self.filament_palette = [
+            self.get_heatmap_gradient_color((1 - (color_bin + 0.5) / FILAMENT_COLOR_BINS) * HEATMAP_MAX_DISTANCE)
+            for color_bin in range(FILAMENT_COLOR_BINS)
+        ]
+
+    def current_snapshot(self):
+        # Latest published state, or a direct capture before the worker has published anything
+        snapshot = self.snapshots.latest() if self.snapshots is not None else None
+        if snapshot is None:
+            with self.controller.lock:
+                snapshot = Snapshot.capture(self.controller)
+        return snapshot
+
+    def animation_ms(self):
+        return QTime.currentTime().msecsSinceStartOfDay() if self.clock is None else self.clock
+
+    @property
+    def render_fps(self):
+        if len(self._paint_times) < 2:
+            return 0.0
+        elapsed = self._paint_times[-1] - self._paint_times[0]
+        return (len(self._paint_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def set_hud_visible(self, visible):
+        self.show_hud = visible
+        self.profiler.enabled = visible
+        if not visible:
+            self.profiler.reset()
+        # 🔒 The simulation profiler is ticked by the worker thread: switch it between steps
+        with self.controller.lock:
+            self.controller.profiler.enabled = visible
+            if not visible:
+                self.controller.profiler.reset()
+        self.update()
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_F3:
+            self.set_hud_visible(not self.show_hud)
+        elif event.key() == Qt.Key_Home:
+            self.camera.fit()
+            self.update()
+        else:
+            super().keyPressEvent(event)
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-
-        self.draw_background(painter)
-        self.draw_filaments(painter)
-        self.draw_nodes(painter)
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_origin = event.pos()
 
-    def draw_background(self, painter):
-        painter.drawPixmap(self.rect(), self.background)
+    def mouseMoveEvent(self, event):
+        if self._drag_origin is not None:
+            delta = event.pos() - self._drag_origin
+            self._drag_origin = event.pos()
+            self.camera.pan(delta.x(), delta.y())
+            self.update()
 
-    def draw_nodes(self, painter):
-        pulse_factor = (math.sin(QTime.currentTime().msecsSinceStartOfDay() / 500.0) + 1) / 2
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_origin = None
 
-        for node in self.controller.nodes:
-            # ✅ Skip nodes with invalid (NaN) positions
-            if np.isnan(node.position).any():
-                continue
+    def mouseDoubleClickEvent(self, event):
+        self.camera.fit()
+        self.update()
 
-            if isinstance(node, DynamicNode):
-                size = max(5, node.mass * 4)
-                
-                glow_gradient = QRadialGradient(node.position[0], node.position[1], size * 4)
-                glow_gradient.setColorAt(0.0, QColor(0, 150, 255, int((150 + pulse_factor * 50) * 0.33)))
-                glow_gradient.setColorAt(1.0, QColor(0, 150, 255, 0))
-
-                painter.setBrush(glow_gradient)
-                painter.setPen(Qt.NoPen)
-                painter.drawEllipse(
-                    int(node.position[0] - size * 2),
-                    int(node.position[1] - size * 2),
-                    size * 4, size * 4
-                )
-
-                painter.setBrush(QColor(0, 150, 255))
-                painter.drawEllipse(int(node.position[0] - size / 2), int(node.position[1] - size / 2), size, size)
+    def wheelEvent(self, event):
+        factor = 1.15 ** (event.angleDelta().y() / 120)
+        self.camera.zoom_at(factor, (event.pos().x(), event.pos().y()))
+        self.update()
 
-            elif isinstance(node, PrimaryMassNode):
-                size = 40
-                glow_gradient = QRadialGradient(node.position[0], node.position[1], size * 6)
-                glow_gradient.setColorAt(0.0, QColor(255, 255, 150, int((180 + pulse_factor * 75) * 0.33)))
-                glow_gradient.setColorAt(1.0, QColor(255, 255, 150, 0))
-
-                painter.setBrush(glow_gradient)
-                painter.setPen(Qt.NoPen)
-                painter.drawEllipse(
-                    int(node.position[0] - size * 3),
-                    int(node.position[1] - size * 3),
-                    size * 6, size * 6
-                )
-
-                painter.setBrush(QColor(255, 255, 150))
-                painter.drawEllipse(int(node.position[0] - size / 2), int(node.position[1] - size / 2), size, size)
-
-    def draw_filaments(self, painter):
-        for node in self.controller.nodes:
-            if isinstance(node, DynamicNode):
-                closest_pmn = self.find_closest_pmn(node)
-                if closest_pmn:
-                    r_vector = closest_pmn.position - node.position
-                    distance = np.linalg.norm(r_vector)
-
-                    # ✅ Clamp positions to prevent overflow
-                    node_x = np.clip(int(node.position[0]), -2000, 2000)
-                    node_y = np.clip(int(node.position[1]), -2000, 2000)
-                    pmn_x = np.clip(int(closest_pmn.position[0]), -2000, 2000)
-                    pmn_y = np.clip(int(closest_pmn.position[1]), -2000, 2000)
-
-                    # 🔥 Heatmap gradient based on distance
-                    color = self.get_heatmap_gradient_color(distance)
-
-                    pulse_opacity = int(150 + 100 * np.sin(QTime.currentTime().msecsSinceStartOfDay() / 300.0))
+    def paintEvent(self, event):
+        # 🖌️ Paint only reads an immutable snapshot, never the live node store
+        profiler = self.profiler
+        with profiler.phase("paint"):
+            snapshot = self.current_snapshot()
+            painter = QPainter(self)
+            self.paint_snapshot(painter, snapshot)
+            if self.show_hud:
+                self.draw_hud(painter)
+        profiler.tick(**self.draw_stats)
+        self._paint_times.append(time.perf_counter())
+
+    def paint_snapshot(self, painter, snapshot):
+        # 🎨 One frame of `snapshot` through the camera, onto any paint device (the widget, or a QImage offline)
+        profiler = self.profiler
+        painter.setRenderHint(QPainter.Antialiasing)
+        with profiler.phase("cull"):
+            self.prepare_frame(snapshot)
+        with profiler.phase("background"):
+            self.draw_background(painter)
+        with profiler.phase("filaments"):
+            self.draw_filaments(painter, snapshot)
+        with profiler.phase("nodes"):
+            self.draw_nodes(painter, snapshot)
+        with profiler.phase("particles"):
+            self.draw_particles(painter, snapshot)
+
+    def resizeEvent(self, event):
+        # 🖼️ Scale the nebula once per resize instead of every frame
+        self.scaled_background = None
+        self.camera.resize(self.width(), self.height())
+        super().resizeEvent(event)
 
-                    glow_pen = QPen(QColor(color.red(), color.green(), color.blue(), pulse_opacity))
-                    glow_pen.setWidth(3)
-                    painter.setPen(glow_pen)
-                    painter.drawLine(node_x, node_y, pmn_x, pmn_y)
+    def draw_background(self, painter):
+        ratio = self.devicePixelRatioF()
+        if self.scaled_background is None or self.scaled_background.devicePixelRatio() != ratio:
+            self.scaled_background = self.background.scaled(
+                self.size() * ratio, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+            )
+            self.scaled_background.setDevicePixelRatio(ratio)
+        painter.drawPixmap(0, 0, self.scaled_background)
+
+        # 🧱 The world's walls
+        (left, top), (right, bottom) = self.camera.world_to_screen(((0, 0), self.camera.world_size))
+        painter.setPen(QPen(QColor(255, 255, 255, 40), 1))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(QRectF(left, top, right - left, bottom - top))
+
+    def prepare_frame(self, snapshot):
+        # ✂️ Cull once per paint: rows inside the viewport (plus the glow margin; NaN positions never
+        # make it through), their screen positions, and whether crowded cells are aggregated
+        camera = self.camera
+        rows = snapshot.visible_rows(*camera.visible_box(CULL_MARGIN))
+        kind = snapshot.kinds[rows]
+        dn_count = int(np.count_nonzero(kind == KIND_DN))
+        self.frame_view = {
+            "rows": rows,
+            "kind": kind,
+            "screen": camera.world_to_screen(snapshot.positions[rows]),
+            "lod": dn_count > 0 and (camera.zoom < LOD_MAX_ZOOM or dn_count > LOD_NODE_BUDGET),
+        }
+        self.draw_stats = {"visible_dns": dn_count, "lod_cells": 0, "filaments": 0}
+
+    def draw_nodes(self, painter, snapshot):
+        pulse_factor = (math.sin(self.animation_ms() / 500.0) + 1) / 2
+        bucket = self.sprites.pulse_bucket(pulse_factor)
+        self.sprites.set_device_pixel_ratio(self.devicePixelRatioF())
+        camera = self.camera
+        rows, kind, screen = self.frame_view["rows"], self.frame_view["kind"], self.frame_view["screen"]
+
+        # 🌌 PMNs first, DNs on top of their glow
+        pmn_size = int(np.clip(round(PMN_SIZE * camera.zoom), MIN_PMN_SIZE, MAX_PMN_SIZE))
+        self.sprites.draw(painter, self.sprites.pmn_sprite(pmn_size, bucket), screen[kind == KIND_PMN])
+
+        dn = kind == KIND_DN
+        dn_screen = screen[dn]
+        dn_mass = snapshot.masses[rows][dn]
+        if self.frame_view["lod"]:
+            sparse = self.draw_density_cells(painter, dn_screen)
+            dn_screen, dn_mass = dn_screen[sparse], dn_mass[sparse]
+
+        dn_size = np.clip(np.rint(np.maximum(5, dn_mass * 4) * camera.zoom), MIN_DN_SIZE, MAX_DN_SIZE)
+        for size in np.unique(dn_size):
+            sprite = self.sprites.dn_sprite(int(size), bucket)
+            self.sprites.draw(painter, sprite, dn_screen[dn_size == size])
+
+    def draw_density_cells(self, painter, screen):
+        # 🌫️ Bin DNs into screen cells; crowded cells become one square shaded by log density.
+        # Returns the mask of DNs left to draw individually.
+        unique_keys, inverse, counts = np.unique(lod_cell_keys(screen), return_inverse=True, return_counts=True)
+        dense = counts >= LOD_MIN_CELL_COUNT
+        self.draw_stats["lod_cells"] = int(dense.sum())
+        if not dense.any():
+            return np.ones(len(screen), dtype=bool)
+
+        dense_keys, dense_counts = unique_keys[dense], counts[dense]
+        cell_x, cell_y = dense_keys >> 32, (dense_keys & 0xFFFFFFFF).astype(np.int32)
+        level = np.log(dense_counts / LOD_MIN_CELL_COUNT) / np.log(max(dense_counts.max() / LOD_MIN_CELL_COUNT, 2))
+        alpha_bin = np.minimum((level * LOD_ALPHA_BINS).astype(int), LOD_ALPHA_BINS - 1)
+
+        # One brush and one drawRects call per alpha bin
+        painter.setPen(Qt.NoPen)
+        for alpha_index in np.unique(alpha_bin):
+            chosen = alpha_bin == alpha_index
+            painter.setBrush(QColor(0, 150, 255, int(40 + 160 * (alpha_index + 1) / LOD_ALPHA_BINS)))
+            painter.drawRects([
+                QRectF(x * LOD_CELL_PIXELS, y * LOD_CELL_PIXELS, LOD_CELL_PIXELS, LOD_CELL_PIXELS)
+                for x, y in zip(cell_x[chosen].tolist(), cell_y[chosen].tolist())
+            ])
+        return ~dense[inverse]
+
+    def draw_particles(self, painter, snapshot):
+        # 💥 Every visible burst particle in one drawPoints call
+        lo, hi = self.camera.visible_box(8)
+        positions = snapshot.particles
+        positions = positions[np.all((positions >= lo) & (positions <= hi), axis=1)]
+        if len(positions) == 0:
+            return
+
+        particle_pen = QPen(QColor(0, 150, 255))
+        particle_pen.setWidth(5)
+        particle_pen.setCapStyle(Qt.RoundCap)
+        painter.setPen(particle_pen)
+        screen = self.camera.world_to_screen(positions)
+        painter.drawPoints(QPolygonF([QPointF(x, y) for x, y in screen]))
+
+    def draw_filaments(self, painter, snapshot):
+        # 🧭 Nearest PMN per DN comes from the controller's per-frame cache, copied into the snapshot
+        dn_rows, pmn_rows, distance = snapshot.nearest_dn, snapshot.nearest_pmn, snapshot.nearest_distance
+        start_points, end_points = snapshot.positions[dn_rows], snapshot.positions[pmn_rows]
+
+        # ✂️ Cull segments whose bounding box misses the viewport
+        lo, hi = self.camera.visible_box(4)
+        visible = (
+            np.all(np.maximum(start_points, end_points) >= lo, axis=1)
+            & np.all(np.minimum(start_points, end_points) <= hi, axis=1)
+        )
+        start_points, end_points = start_points[visible], end_points[visible]
+        pmn_rows, distance = pmn_rows[visible], distance[visible]
+
+        start_screen = self.camera.world_to_screen(start_points)
+        end_screen = self.camera.world_to_screen(end_points)
+
+        # 🌫️ Zoomed out: the filaments of a crowded cell collapse into one per (cell, PMN)
+        if self.frame_view["lod"] and len(distance):
+            start_screen, end_screen, distance = aggregate_filaments(start_screen, end_screen, pmn_rows, distance)
+
+        # ✂️ Decimate evenly when there are more visible filaments than we want to draw
+        if self.max_filaments is not None and len(distance) > self.max_filaments:
+            stride = -(-len(distance) // self.max_filaments)
+            start_screen, end_screen, distance = start_screen[::stride], end_screen[::stride], distance[::stride]
+        self.draw_stats["filaments"] = len(distance)
+        if len(distance) == 0:
+            return
+
+        # ✅ Clamp screen positions to prevent overflow
+        endpoints = np.clip(np.hstack((start_screen, end_screen)), -1e5, 1e5)
+
+        # 🔥 Heatmap gradient based on distance, quantized into a fixed set of colour bins
+        normalized = np.clip(1 - distance / HEATMAP_MAX_DISTANCE, 0, 1)
+        color_bin = np.minimum((normalized * FILAMENT_COLOR_BINS).astype(int), FILAMENT_COLOR_BINS - 1)
+
+        pulse_opacity = int(150 + 100 * np.sin(self.animation_ms() / 300.0))
+
+        # One pen and one drawLines call per colour bin
+        order = np.argsort(color_bin, kind="stable")
+        bins, starts = np.unique(color_bin[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        for color_index, start, end in zip(bins, starts, ends):
+            color = self.filament_palette[color_index]
+            glow_pen = QPen(QColor(color.red(), color.green(), color.blue(), pulse_opacity))
+            glow_pen.setWidth(3)
+            painter.setPen(glow_pen)
+            painter.drawLines([QLineF(*line) for line in endpoints[order[start:end]].tolist()])
+
+    def draw_hud(self, painter):
+        # 📊 Rolling p50 / p95 / max per phase: simulation steps first, then this view's paint phases
+        simulation = self.controller.profiler.report()
+        render = self.profiler.report()
+        counters = simulation["counters"]
+
+        lines = [
+            f"sim {simulation['rate']:.1f} steps/s  DNs {counters.get('dns', 0)}  "
+            f"PMNs {counters.get('pmns', 0)}  particles {counters.get('particles', 0)}",
+            f"events/step  collisions {counters.get('dn_collision', 0) + counters.get('pmn_collision', 0)}  "
+            f"merges {counters.get('merge', 0)}  bursts {counters.get('burst', 0)}  expiries {counters.get('expiry', 0)}",
+            f"{'phase':<16}{'p50':>8}{'p95':>8}{'max':>8}  ms",
+        ]
+        lines += [self._hud_line(name, stats) for name, stats in simulation["phases"].items()]
+        drawn = render["counters"]
+        lines.append(
+            f"render {self.render_fps:.1f} FPS  zoom {self.camera.zoom:.2f}  visible DNs {drawn.get('visible_dns', 0)}  "
+            f"LOD cells {drawn.get('lod_cells', 0)}  filaments {drawn.get('filaments', 0)}"
+        )
+        lines += [self._hud_line(name, stats) for name, stats in render["phases"].items()]
+
+        painter.setFont(self.hud_font)
+        line_height = painter.fontMetrics().height()
+        width = max(painter.fontMetrics().horizontalAdvance(line) for line in lines) + 16
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 170))
+        painter.drawRect(8, 8, width, line_height * len(lines) + 12)
+
+        painter.setPen(QColor(200, 255, 200))
+        for i, line in enumerate(lines):
+            painter.drawText(16, 14 + line_height * (i + 1) - painter.fontMetrics().descent(), line)
+
+    @staticmethod
+    def _hud_line(name, stats):
+        return f"{name:<16}{stats['p50_ms']:>8.2f}{stats['p95_ms']:>8.2f}{stats['max_ms']:>8.2f}"
 
     def get_heatmap_gradient_color(self, distance):
-        max_distance = 400
-        normalized = max(0, min(1, 1 - distance / max_distance))
+        normalized = max(0, min(1, 1 - distance / HEATMAP_MAX_DISTANCE))
 
         if normalized > 0.66:
             r, g, b = 255, int(255 * (1 - normalized) * 3), int(255 * (1 - normalized) * 3)
@@ -105,31 +380,37 @@ class SimulationView(QWidget):
 
         return QColor(r, g, b)
 
-    def find_closest_pmn(self, dynamic_node):
-        pmns = [n for n in self.controller.nodes if isinstance(n, PrimaryMassNode)]
-        if not pmns:
-            return None
-        return min(pmns, key=lambda pmn: np.linalg.norm(pmn.position - dynamic_node.position))
-
 
 class MainWindow(QMainWindow):
-    def __init__(self, controller):
+    def __init__(self, controller, player=None, max_filaments=None):
         super().__init__()
         self.controller = controller
+        self.player = player  # 📼 TrajectoryPlayer in replay mode: frames come from the recording, no physics
         self.setWindowTitle("SoL Gravitas - Multi-PMN Simulation")
         self.setGeometry(100, 100, 800, 600)
 
+        # 🧵 The simulation steps on a worker thread; this timer only repaints
+        self.worker = None
         self.timer = QTimer(self)
-        self.timer.timeout.connect(self.controller.update)
+        self.timer.timeout.connect(self.refresh)
 
         self.apply_dark_theme()
         self.initUI()
+        self.simulation_view.max_filaments = max_filaments  # ✂️ Filament cap (main.py --max-filaments)
+
+        if self.player is not None:
+            self.simulation_view.snapshots = self.player
+            self.timer.start(RENDER_INTERVAL_MS)
         
     def update_node_masses(self):
         # 🎯 Scale slider value for DNs and PMNs differently
         dn_mass = self.mass_slider.value() / 10
         pmn_mass = self.mass_slider.value() * 2
 
+        with self.controller.lock:
+            self._set_node_masses(dn_mass, pmn_mass)
+
+    def _set_node_masses(self, dn_mass, pmn_mass):
         for node in self.controller.nodes:
             if isinstance(node, DynamicNode):
                 node.mass = dn_mass
@@ -143,20 +424,24 @@ class MainWindow(QMainWindow):
                 # 🔒 PMNs usually don't move, so no velocity adjustment needed
 
     def add_dynamic_node(self):
-        mass = np.random.uniform(0.5, 5.0)
-        position = np.random.rand(2) * [self.simulation_view.width(), self.simulation_view.height()]
-        velocity_vector = (np.random.rand(2) - 0.5) * 2
-
-        new_node = DynamicNode(mass=mass, position=position, velocity=velocity_vector)
-        self.controller.nodes.append(new_node)
+        # 🎲 The simulation's Generator is shared with the worker thread, so draw under the lock
+        with self.controller.lock:
+            rng = self.controller.rng
+            mass = rng.uniform(0.5, 5.0)
+            position = rng.random(2) * self.controller.world_size
+            velocity_vector = (rng.random(2) - 0.5) * 2
+
+            new_node = DynamicNode(mass=mass, position=position, velocity=velocity_vector)
+            self.controller.nodes.append(new_node)
         self.simulation_view.update()
 
     def add_primary_mass_node(self):
         mass = self.mass_slider.value() * 5
-        position = np.random.rand(2) * [self.simulation_view.width(), self.simulation_view.height()]
+        with self.controller.lock:
+            position = self.controller.rng.random(2) * self.controller.world_size
 
-        new_node = PrimaryMassNode(mass=mass, position=position, velocity=np.zeros(2))
-        self.controller.nodes.append(new_node)
+            new_node = PrimaryMassNode(mass=mass, position=position, velocity=np.zeros(2))
+            self.controller.nodes.append(new_node)
         self.simulation_view.update()
 
     def apply_dark_theme(self):
@@ -177,6 +462,14 @@ class MainWindow(QMainWindow):
         # ✅ Control Panel Layout (Fixed height)
         control_panel = QWidget()
         control_layout = QHBoxLayout()
+
+        if self.player is not None:
+            self.init_replay_controls(control_layout)
+            control_panel.setLayout(control_layout)
+            main_layout.addWidget(control_panel, stretch=1)
+            container.setLayout(main_layout)
+            self.setCentralWidget(container)
+            return
         
         # ➕ Add Collision Toggle Checkbox
         self.collision_checkbox = QCheckBox("Enable DN Collisions")
@@ -184,6 +477,12 @@ class MainWindow(QMainWindow):
         self.collision_checkbox.stateChanged.connect(self.toggle_dn_collisions)
         control_layout.addWidget(self.collision_checkbox)
 
+        # ➕ Add Mutual Gravity Toggle Checkbox
+        self.mutual_gravity_checkbox = QCheckBox("Enable DN Mutual Gravity")
+        self.mutual_gravity_checkbox.setChecked(False)  # Default: Mutual gravity OFF
+        self.mutual_gravity_checkbox.stateChanged.connect(self.toggle_mutual_gravity)
+        control_layout.addWidget(self.mutual_gravity_checkbox)
+
         # ➕ Add Dynamic Node Button
         add_dn_button = QPushButton("Add Dynamic Node")
         add_dn_button.clicked.connect(self.add_dynamic_node)
@@ -207,6 +506,16 @@ class MainWindow(QMainWindow):
         start_button.clicked.connect(self.start_simulation)
         control_layout.addWidget(start_button)
 
+        # 📊 Profiler overlay (also F3 on the view)
+        self.hud_checkbox = QCheckBox("Profiler HUD")
+        self.hud_checkbox.stateChanged.connect(self.toggle_hud)
+        control_layout.addWidget(self.hud_checkbox)
+
+        # ⏱️ Simulation steps/s and render FPS, measured separately
+        self.rate_label = QLabel("")
+        self.rate_label.setStyleSheet("color: #FFFFFF;")
+        control_layout.addWidget(self.rate_label)
+
         # ✅ Apply layout to the control panel
         control_panel.setLayout(control_layout)
         main_layout.addWidget(control_panel, stretch=1)  # Less space for controls
@@ -218,9 +527,66 @@ class MainWindow(QMainWindow):
         # 🎛️ Connect slider changes to mass update
         self.mass_slider.valueChanged.connect(self.update_node_masses)
 
+    def init_replay_controls(self, control_layout):
+        # ⏯️ Play/pause and a scrub slider over the recorded frames
+        self.play_button = QPushButton("Pause")
+        self.play_button.clicked.connect(self.toggle_playback)
+        control_layout.addWidget(self.play_button)
+
+        self.frame_slider = QSlider(Qt.Horizontal)
+        self.frame_slider.setMinimum(0)
+        self.frame_slider.setMaximum(max(len(self.player) - 1, 0))
+        self.frame_slider.sliderMoved.connect(self.seek_replay)
+        control_layout.addWidget(self.frame_slider, stretch=1)
+
+        self.rate_label = QLabel("")
+        self.rate_label.setStyleSheet("color: #FFFFFF;")
+        control_layout.addWidget(self.rate_label)
+
+    def toggle_playback(self):
+        self.player.playing = not self.player.playing
+        self.play_button.setText("Pause" if self.player.playing else "Play")
+
+    def seek_replay(self, position):
+        self.player.seek(position)
+        self.simulation_view.update()
+
     def start_simulation(self):
-        self.timer.start(50)
+        if self.worker is None:
+            self.worker = SimulationWorker(self.controller)
+            self.simulation_view.snapshots = self.worker.buffer
+            self.worker.start()
+        self.timer.start(RENDER_INTERVAL_MS)
         self.simulation_view.update()
-        
+
+    def refresh(self):
+        if self.player is not None:
+            self.player.tick()
+            self.frame_slider.setValue(self.player.position)
+            snapshot = self.player.latest()
+            self.rate_label.setText(
+                f"Frame {snapshot.frame if snapshot else 0} | Render {self.simulation_view.render_fps:.0f} FPS"
+            )
+        self.simulation_view.update()
+        if self.worker is not None:
+            self.rate_label.setText(
+                f"Sim {self.worker.steps_per_sec:.0f} steps/s | Render {self.simulation_view.render_fps:.0f} FPS"
+            )
+
+    def closeEvent(self, event):
+        # 🛑 Stop stepping before the window (and its snapshot buffer) goes away
+        self.timer.stop()
+        if self.worker is not None:
+            self.worker.stop(timeout=1.0)
+        super().closeEvent(event)
+
     def toggle_dn_collisions(self, state):
-        self.controller.enable_dn_collisions = state == Qt.Checked
+        with self.controller.lock:
+            self.controller.enable_dn_collisions = state == Qt.Checked
+
+    def toggle_hud(self, state):
+        self.simulation_view.set_hud_visible(state == Qt.Checked)
+
+    def toggle_mutual_gravity(self, state):
+        with self.controller.lock:
+            self.controller.enable_mutual_gravity = state == Qt.Checked
@@ -0,0 +1,106 @@
+# ui/sprite_cache.py
+
+import math
+
+from PyQt5.QtGui import QPainter, QColor, QRadialGradient, QPixmap
+from PyQt5.QtCore import Qt, QPointF, QRectF
+
+# Pulse phases are snapped to this many buckets, so each bucket is rendered once
+PULSE_BUCKETS = 16
+
+# DN sprite sizes are whole pixels within these bounds
+MIN_DN_SIZE = 5
+MAX_DN_SIZE = 64
+
+PMN_SIZE = 40
+MIN_PMN_SIZE = 8
+MAX_PMN_SIZE = 160
+
+# Sprites are rendered at sizes snapped to powers of √2 and scaled to the exact size when drawn
+# (by at most 2^¼ either way), so zooming reuses ~10 sizes per kind instead of one per pixel
+SIZE_STEP = math.sqrt(2)
+
+
+class SpriteCache:
+    # ✨ Pre-rendered glow + core sprites keyed by (kind, size step, pulse bucket): at most
+    # PULSE_BUCKETS per size step, whatever the zoom
+    def __init__(self):
+        self.device_pixel_ratio = 1.0
+        self._sprites = {}
+
+    @staticmethod
+    def pulse_bucket(pulse_factor):
+        return int(round(min(max(pulse_factor, 0.0), 1.0) * (PULSE_BUCKETS - 1)))
+
+    @staticmethod
+    def size_step(size):
+        return int(round(math.log(size, SIZE_STEP)))
+
+    def set_device_pixel_ratio(self, device_pixel_ratio):
+        # A DPI change invalidates every sprite
+        if device_pixel_ratio != self.device_pixel_ratio:
+            self.device_pixel_ratio = device_pixel_ratio
+            self._sprites.clear()
+
+    def dn_sprite(self, size, bucket):
+        step = self.size_step(size)
+        key = ("dn", step, bucket)
+        if key not in self._sprites:
+            pulse_factor = bucket / (PULSE_BUCKETS - 1)
+            alpha = int((150 + pulse_factor * 50) * 0.33)
+            self._sprites[key] = self._render(SIZE_STEP ** step, 4, QColor(0, 150, 255), alpha)
+        return self._scaled(self._sprites[key], size)
+
+    def pmn_sprite(self, size, bucket):
+        step = self.size_step(size)
+        key = ("pmn", step, bucket)
+        if key not in self._sprites:
+            pulse_factor = bucket / (PULSE_BUCKETS - 1)
+            alpha = int((180 + pulse_factor * 75) * 0.33)
+            self._sprites[key] = self._render(SIZE_STEP ** step, 6, QColor(255, 255, 150), alpha)
+        return self._scaled(self._sprites[key], size)
+
+    @staticmethod
+    def _scaled(sprite, size):
+        # (pixmap, source rect, scale from the rendered size to `size`)
+        pixmap, source, rendered_size = sprite
+        return pixmap, source, size / rendered_size
+
+    def _render(self, size, glow_scale, color, glow_alpha):
+        # Glow disc `glow_scale * size` wide with a solid core of `size` in the middle
+        ratio = self.device_pixel_ratio
+        extent = size * glow_scale
+        pixels = int(round(extent * ratio))
+
+        pixmap = QPixmap(pixels, pixels)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.scale(ratio, ratio)
+        center = QPointF(extent / 2, extent / 2)
+
+        glow_gradient = QRadialGradient(center, extent)
+        glow_gradient.setColorAt(0.0, QColor(color.red(), color.green(), color.blue(), glow_alpha))
+        glow_gradient.setColorAt(1.0, QColor(color.red(), color.green(), color.blue(), 0))
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(glow_gradient)
+        painter.drawEllipse(center, extent / 2, extent / 2)
+
+        painter.setBrush(color)
+        painter.drawEllipse(center, size / 2, size / 2)
+        painter.end()
+
+        return pixmap, QRectF(0, 0, pixels, pixels), size
+
+    def draw(self, painter, sprite, positions):
+        # 🚀 One drawPixmapFragments call blits (and scales) the sprite at every position
+        if len(positions) == 0:
+            return
+        pixmap, source, scale = sprite
+        scale /= self.device_pixel_ratio
+        fragments = [
+            QPainter.PixmapFragment.create(QPointF(x, y), source, scale, scale)
+            for x, y in positions
+        ]
+        painter.drawPixmapFragments(fragments, pixmap)